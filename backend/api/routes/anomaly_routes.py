@@ -1,18 +1,24 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
-from core.anomaly_engine.autoencoder_model import autoencoder_reconstruction_error
-from core.anomaly_engine.isolation_forest import isolation_forest_scores
+from core.anomaly_engine.streaming_scorer import anomaly_scorer
 from core.services.data_service import data_service
+from core.utils.config import get_settings
+from core.utils.fast_json import FastJSONResponse
+from core.utils.serialization import column_values, isoformat_column, records
 
 
+settings = get_settings()
+
 router = APIRouter()
 
 
@@ -31,6 +37,18 @@ class AnomalyQuery(BaseModel):
     end_time: str
 
 
+class AnomalyBatchRequest(BaseModel):
+    queries: List[AnomalyQuery]
+
+
+class AnomalyBatchResult(BaseModel):
+    building_id: str
+    metric: str
+    start_time: str
+    end_time: str
+    points: List[AnomalyPoint]
+
+
 FEATURE_COLS = [
     "energy",
     "temperature",
@@ -80,78 +98,115 @@ def _augment_time_features(df: pd.DataFrame) -> None:
     df.drop(columns=["hour", "dayofweek"], inplace=True)
 
 
-def _load_feature_frame(query: AnomalyQuery) -> pd.DataFrame:
-    """Load real telemetry (from processed dataset / Influx) or fall back."""
+def _load_feature_frame(query: AnomalyQuery) -> Tuple[pd.DataFrame, bool]:
+    """Load real telemetry (from processed dataset / Influx) or fall back; flags synthetic frames."""
     start = datetime.fromisoformat(query.start_time)
     end = datetime.fromisoformat(query.end_time)
 
     df = data_service.get_data(start_time=start, end_time=end)
     if df.empty:
-        return _build_synthetic_series(query)
+        return _build_synthetic_series(query), True
 
     df = df.sort_values("timestamp").set_index("timestamp")
 
     required = {"energy", "temperature", "humidity"}
     if not required.issubset(df.columns):
-        return _build_synthetic_series(query)
+        return _build_synthetic_series(query), True
 
     _augment_time_features(df)
     df = df[FEATURE_COLS].dropna()
     if df.empty:
-        return _build_synthetic_series(query)
+        return _build_synthetic_series(query), True
 
-    return df
+    return df, False
+
+
+def _score_source(synthetic: bool) -> Optional[str]:
+    # Random synthetic rows must not enter the per-timestamp cache or the score ranges
+    return None if synthetic else "detect"
+
+
+def _to_points(query: AnomalyQuery, df: pd.DataFrame, scores: pd.DataFrame) -> List[Dict[str, Any]]:
+    """AnomalyPoint rows for ``df`` (``scores`` is aligned with ``df`` by position)."""
+    if df.empty:
+        return []
+    value_col = query.metric if query.metric in df.columns else "energy"
+    return records({
+        "timestamp": isoformat_column(df.index),
+        "metric": query.metric,
+        "value": column_values(df[value_col], float),
+        "score": column_values(scores["score"], float),
+        "is_anomaly": column_values(scores["is_anomaly"], bool),
+    }, length=len(df))
 
 
 @router.post("/detect", response_model=List[AnomalyPoint])
-async def detect_anomalies(query: AnomalyQuery) -> List[AnomalyPoint]:
+async def detect_anomalies(query: AnomalyQuery) -> FastJSONResponse:
     """
     Run anomaly detection using both the autoencoder and IsolationForest
     models and return a combined anomaly score per timestamp.
 
+    Raw scores are cached per timestamp (per building, separately from the
+    dashboard feed) so overlapping windows only score the rows not seen
+    before, and normalized with the training calibration when available.
+    Synthetic fallback frames are scored without touching the cache.
+
     NOTE: This implementation currently uses a synthetic time series
     as a stand‑in for real building telemetry.
     """
-    df = _load_feature_frame(query)
+    df, synthetic = await run_in_threadpool(_load_feature_frame, query)
     if df.empty:
         return []
 
-    feature_cols = FEATURE_COLS
+    # Stable normalization; only unseen rows hit the models
+    scores = await run_in_threadpool(anomaly_scorer.score, query.building_id, df, _score_source(synthetic))
+    return FastJSONResponse(_to_points(query, df, scores))
 
-    # Model scores
-    ae_scores = autoencoder_reconstruction_error(df, feature_cols)
-    if_scores = isolation_forest_scores(df, feature_cols)
 
-    # Normalize to 0‑1 for combination
-    def _normalize(s: pd.Series) -> pd.Series:
-        if s.empty:
-            return s
-        lo, hi = float(s.min()), float(s.max())
-        if hi - lo < 1e-8:
-            return pd.Series(0.0, index=s.index)
-        return (s - lo) / (hi - lo)
-
-    ae_n = _normalize(ae_scores)
-    if_n = _normalize(if_scores)
+@router.post("/detect/batch", response_model=List[AnomalyBatchResult])
+async def detect_anomalies_batch(request: AnomalyBatchRequest) -> FastJSONResponse:
+    """
+    Anomaly detection for many (building, window) pairs in one call.
 
-    combined = 0.5 * ae_n + 0.5 * if_n
+    Feature frames are loaded concurrently, then every building's unseen rows
+    are concatenated and scored with one autoencoder and one IsolationForest
+    call (``anomaly_scorer.score_batch``); results are split back per query in
+    request order. Windows of the same building are scored together.
+    """
+    if len(request.queries) > settings.anomaly_batch_max_queries:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch cannot exceed {settings.anomaly_batch_max_queries} queries"
+        )
 
-    # Simple threshold: top 10% of scores are anomalies
-    threshold = float(np.quantile(combined.to_numpy(), 0.9))
+    loaded = await asyncio.gather(
+        *(run_in_threadpool(_load_feature_frame, query) for query in request.queries)
+    )
 
-    points: List[AnomalyPoint] = []
-    value_col = query.metric if query.metric in df.columns else "energy"
+    # Real and synthetic windows are scored separately (see _score_source)
+    groups: Dict[bool, Dict[str, List[pd.DataFrame]]] = {}
+    for query, (df, synthetic) in zip(request.queries, loaded):
+        groups.setdefault(synthetic, {}).setdefault(query.building_id, []).append(df)
 
-    for ts, row in df.iterrows():
-        score = float(combined.loc[ts])
-        points.append(
-            AnomalyPoint(
-                timestamp=ts.isoformat(),
-                metric=query.metric,
-                value=float(row.get(value_col, np.nan)),
-                score=score,
-                is_anomaly=score >= threshold,
-            )
+    scores: Dict[bool, Dict[str, pd.DataFrame]] = {}
+    for synthetic, by_building in groups.items():
+        combined = {b: pd.concat(dfs) for b, dfs in by_building.items()}
+        scores[synthetic] = await run_in_threadpool(
+            anomaly_scorer.score_batch, combined, _score_source(synthetic)
         )
 
-    return points
+    results: List[Dict[str, Any]] = []
+    offsets: Dict[Tuple[bool, str], int] = {}
+    for query, (df, synthetic) in zip(request.queries, loaded):
+        key = (synthetic, query.building_id)
+        start = offsets.get(key, 0)
+        offsets[key] = start + len(df)
+        window_scores = scores[synthetic][query.building_id].iloc[start:start + len(df)]
+        results.append({
+            "building_id": query.building_id,
+            "metric": query.metric,
+            "start_time": query.start_time,
+            "end_time": query.end_time,
+            "points": _to_points(query, df, window_scores),
+        })
+    return FastJSONResponse(results)
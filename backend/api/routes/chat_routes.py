@@ -4,11 +4,19 @@ from typing import List, Optional
 from datetime import datetime
 import os
 import logging
-from huggingface_hub import InferenceClient
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+def _inference_client(api_key: str):
+    """HuggingFace client; the library is imported on first chat request, not at app import."""
+    from huggingface_hub import InferenceClient
+
+    return InferenceClient(
+        token=api_key,
+        base_url="https://router.huggingface.co"
+    )
+
 class ChatMessage(BaseModel):
     role: str
     content: str
@@ -37,10 +45,7 @@ async def chat_completion(request: ChatRequest):
             raise HTTPException(status_code=500, detail="HuggingFace API key not configured")
         
         # Initialize InferenceClient with the new router endpoint
-        client = InferenceClient(
-            token=api_key,
-            base_url="https://router.huggingface.co"
-        )
+        client = _inference_client(api_key)
         
         # Use the model from request or environment variable
         model = request.model or os.getenv("HUGGINGFACE_MODEL", "meta-llama/Llama-3.2-3B-Instruct")
@@ -113,10 +118,7 @@ async def check_health():
             return {"status": "unhealthy", "error": "HUGGINGFACE_API_KEY not set"}
         
         # Initialize client with new router endpoint
-        client = InferenceClient(
-            token=api_key,
-            base_url="https://router.huggingface.co"
-        )
+        client = _inference_client(api_key)
         
         # Test with a simple chat completion
         completion = client.chat.completions.create(
@@ -2,17 +2,27 @@
 API routes for energy consumption and occupancy forecasting.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel
 from typing import List, Optional
 
 from core.services.forecasting_service import (
+    current_hour_bucket,
+    forecast_energy_batch,
     forecast_energy_consumption,
     forecast_occupancy,
 )
+from core.services.action_state_service import action_state_service
+from core.services.dashboard_service import dashboard_snapshots
+from core.services.forecast_scheduler import forecast_precompute
+from core.services.influxdb_service import run_in_influx_executor
+from core.utils.config import get_settings
+from core.utils.fast_json import FastJSONResponse
+from core.utils.http_cache import compute_etag, etag_matches, not_modified, set_etag
 
 
 router = APIRouter()
+settings = get_settings()
 
 
 class ForecastRequest(BaseModel):
@@ -35,6 +45,11 @@ class ForecastResponse(BaseModel):
     horizon_hours: int
 
 
+class EnergyForecastBatchRequest(BaseModel):
+    building_ids: List[str]
+    horizon_hours: Optional[int] = 24
+
+
 class OccupancyForecastRequest(BaseModel):
     building_id: str
     horizon_hours: Optional[int] = 12
@@ -55,12 +70,19 @@ class OccupancyForecastResponse(BaseModel):
 
 
 @router.post("/energy", response_model=ForecastResponse)
-async def forecast_energy(request: ForecastRequest) -> ForecastResponse:
+async def forecast_energy(
+    request: ForecastRequest,
+    http_request: Request,
+    response: Response
+) -> ForecastResponse:
     """
     Forecast energy consumption for the next N hours.
     
     Uses trained LSTM model if available, otherwise generates
-    pattern-based synthetic forecast.
+    pattern-based synthetic forecast. Honors If-None-Match with an ETag
+    derived from the data watermark, actions version, horizon and current
+    hour bucket (forecast timestamps start at the bucket). Synthetic
+    fallback forecasts are random and uncached, so they get no ETag.
     
     Args:
         request: ForecastRequest with building_id and optional horizon_hours
@@ -74,12 +96,28 @@ async def forecast_energy(request: ForecastRequest) -> ForecastResponse:
             detail="horizon_hours must be between 1 and 168 (1 week)"
         )
     
+    horizon_hours = request.horizon_hours or 24
+    forecast_precompute.track(request.building_id)
+    etag = compute_etag(
+        "forecast-energy",
+        request.building_id,
+        dashboard_snapshots.data_watermark(request.building_id).isoformat(),
+        action_state_service.get_version(request.building_id),
+        horizon_hours,
+        current_hour_bucket().isoformat(),
+    )
+    if etag_matches(http_request, etag):
+        return not_modified(etag)
+    
     try:
-        result = forecast_energy_consumption(
+        result = await run_in_influx_executor(
+            forecast_energy_consumption,
             building_id=request.building_id,
-            horizon_hours=request.horizon_hours or 24
+            horizon_hours=horizon_hours
         )
         
+        if result["model_available"]:
+            set_etag(response, etag)
         return ForecastResponse(
             building_id=request.building_id,
             forecast=[
@@ -96,6 +134,61 @@ async def forecast_energy(request: ForecastRequest) -> ForecastResponse:
         )
 
 
+@router.post("/energy/batch", response_model=List[ForecastResponse])
+async def forecast_energy_batch_endpoint(
+    request: EnergyForecastBatchRequest
+) -> FastJSONResponse:
+    """
+    Forecast energy consumption for many buildings in one call.
+    
+    Buildings not already in the forecast cache are predicted together with
+    one batched model rollout (see ``forecast_energy_batch``). Results are
+    returned in request order, one per distinct building.
+    
+    Args:
+        request: EnergyForecastBatchRequest with building_ids and optional horizon_hours
+    
+    Returns:
+        List of ForecastResponse
+    """
+    if request.horizon_hours and (request.horizon_hours < 1 or request.horizon_hours > 168):
+        raise HTTPException(
+            status_code=400,
+            detail="horizon_hours must be between 1 and 168 (1 week)"
+        )
+    if len(request.building_ids) > settings.forecast_batch_max_buildings:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch cannot exceed {settings.forecast_batch_max_buildings} buildings"
+        )
+    
+    horizon_hours = request.horizon_hours or 24
+    for building_id in request.building_ids:
+        forecast_precompute.track(building_id)
+    
+    try:
+        results = await run_in_influx_executor(
+            forecast_energy_batch,
+            building_ids=request.building_ids,
+            horizon_hours=horizon_hours
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate forecasts: {str(e)}"
+        )
+    
+    return FastJSONResponse([
+        {
+            "building_id": building_id,
+            "forecast": result["forecast"],
+            "model_available": result["model_available"],
+            "horizon_hours": result["horizon_hours"],
+        }
+        for building_id, result in results.items()
+    ])
+
+
 @router.post("/occupancy", response_model=OccupancyForecastResponse)
 async def forecast_occupancy_endpoint(
     request: OccupancyForecastRequest
@@ -118,10 +211,14 @@ async def forecast_occupancy_endpoint(
             detail="horizon_hours must be between 1 and 12 for occupancy prediction"
         )
     
+    horizon_hours = request.horizon_hours or 12
+    forecast_precompute.track(request.building_id)
+    
     try:
-        result = forecast_occupancy(
+        result = await run_in_influx_executor(
+            forecast_occupancy,
             building_id=request.building_id,
-            horizon_hours=request.horizon_hours or 12
+            horizon_hours=horizon_hours
         )
         
         return OccupancyForecastResponse(
@@ -1,14 +1,27 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime, timedelta
+import csv
+import io
 import logging
 
+import pandas as pd
+
+from core.services.forecast_scheduler import forecast_precompute
+from core.services.forecasting_service import forecast_cache_stats
 from core.services.timeseries_service import timeseries_service
+from core.services.telemetry_writer import telemetry_writer
+from core.utils.config import get_settings
+from core.utils.fast_json import FastJSONResponse, dumps
+from core.utils.serialization import column_values, isoformat_column, records
 
 logger = logging.getLogger(__name__)
 
 
+settings = get_settings()
+
 router = APIRouter()
 
 
@@ -21,6 +34,13 @@ class HistoricalDataRequest(BaseModel):
     resolution_minutes: int = 15
 
 
+class HistoricalExportRequest(HistoricalDataRequest):
+    format: Literal["ndjson", "csv"] = "ndjson"
+
+
+EXPORT_FIELDS = ["timestamp", "metric", "value", "zone_id"]
+
+
 class MetricPoint(BaseModel):
     timestamp: str
     metric: str
@@ -34,6 +54,22 @@ class HistoricalDataResponse(BaseModel):
     resolution_minutes: int
 
 
+def _metric_points(df: pd.DataFrame, request: HistoricalDataRequest) -> List[dict]:
+    """MetricPoint rows for a long-format frame (timestamp, value, optional metric/zone_id)."""
+    if "zone_id" in df.columns:
+        zones = df["zone_id"].astype(object)
+        zones = column_values(zones.where(zones.notna() & (zones != ""), request.zone_id))
+    else:
+        zones = request.zone_id
+
+    return records({
+        "timestamp": isoformat_column(df["timestamp"]),
+        "metric": column_values(df["metric"]) if "metric" in df.columns else request.metrics[0],
+        "value": column_values(df["value"], float),
+        "zone_id": zones,
+    }, length=len(df))
+
+
 @router.post("/query", response_model=HistoricalDataResponse)
 async def query_historical_data(request: HistoricalDataRequest):
     """Query historical time-series data."""
@@ -53,7 +89,7 @@ async def query_historical_data(request: HistoricalDataRequest):
                 detail=f"Query range cannot exceed {max_range_days} days"
             )
         
-        df = timeseries_service.get_metrics(
+        df = await timeseries_service.get_metrics_async(
             building_id=request.building_id,
             zone_id=request.zone_id,
             metrics=request.metrics,
@@ -62,23 +98,15 @@ async def query_historical_data(request: HistoricalDataRequest):
             resolution_minutes=request.resolution_minutes
         )
         
-        points = []
-        for _, row in df.iterrows():
-            points.append(
-                MetricPoint(
-                    timestamp=row["timestamp"].isoformat() if hasattr(row["timestamp"], "isoformat") else str(row["timestamp"]),
-                    metric=row.get("metric", request.metrics[0]),
-                    value=float(row["value"]),
-                    zone_id=row.get("zone_id") or request.zone_id
-                )
-            )
+        points = _metric_points(df, request) if not df.empty else []
         
         logger.info(f"Returning {len(points)} data points")
-        return HistoricalDataResponse(
-            building_id=request.building_id,
-            points=points,
-            resolution_minutes=request.resolution_minutes
-        )
+        # Rows are built to match HistoricalDataResponse; skip re-validation
+        return FastJSONResponse({
+            "building_id": request.building_id,
+            "points": points,
+            "resolution_minutes": request.resolution_minutes,
+        })
     
     except ValueError as e:
         logger.error(f"Invalid datetime format: {e}")
@@ -88,10 +116,112 @@ async def query_historical_data(request: HistoricalDataRequest):
         raise HTTPException(status_code=500, detail=f"Failed to query data: {str(e)}")
 
 
+def _encode_ndjson(points: List[dict]) -> bytes:
+    return b"".join(dumps(point) + b"\n" for point in points)
+
+
+def _encode_csv(points: List[dict]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(
+        [point[field] for field in EXPORT_FIELDS] for point in points
+    )
+    return buffer.getvalue().encode("utf-8")
+
+
+def _encode_error(export_format: str, message: str) -> bytes:
+    if export_format == "csv":
+        return f"# error: {message}\n".encode("utf-8")
+    return dumps({"error": message, "complete": False}) + b"\n"
+
+
+@router.post("/export")
+async def export_historical_data(request: HistoricalExportRequest) -> StreamingResponse:
+    """
+    Stream historical data as NDJSON (one MetricPoint per line) or CSV.
+
+    Unlike ``/query`` the result is never materialized: InfluxDB is queried in
+    ``historical_export_chunk_hours`` windows and each chunk is encoded and
+    sent as soon as it arrives, so memory stays bounded and ranges up to
+    ``historical_export_max_days`` are allowed.
+
+    Only stored telemetry is exported, never synthetic fallback data: gaps
+    are simply absent. If InfluxDB fails before the first chunk the request
+    fails with 503; if it fails mid-stream the body ends with an error
+    record (NDJSON: ``{"error": ..., "complete": false}``; CSV: a
+    ``# error: ...`` line) so a truncated export cannot pass for a full one.
+    """
+    try:
+        start_time = datetime.fromisoformat(request.start_time.replace("Z", "+00:00"))
+        end_time = datetime.fromisoformat(request.end_time.replace("Z", "+00:00"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid datetime format: {e}")
+
+    if start_time >= end_time:
+        raise HTTPException(status_code=400, detail="start_time must be before end_time")
+    if (end_time - start_time).days > settings.historical_export_max_days:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Export range cannot exceed {settings.historical_export_max_days} days"
+        )
+
+    logger.info(
+        f"📤 Historical export: {request.building_id}, metrics={request.metrics}, "
+        f"{start_time.isoformat()} -> {end_time.isoformat()} as {request.format}"
+    )
+    encode = _encode_csv if request.format == "csv" else _encode_ndjson
+    chunks = timeseries_service.iter_metrics_async(
+        building_id=request.building_id,
+        zone_id=request.zone_id,
+        metrics=request.metrics,
+        start_time=start_time,
+        end_time=end_time,
+        resolution_minutes=request.resolution_minutes,
+        chunk_hours=settings.historical_export_chunk_hours
+    )
+
+    # Fetch the first chunk before committing to a 200
+    try:
+        first: Optional[pd.DataFrame] = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except Exception as e:
+        logger.error(f"❌ Historical export for {request.building_id} failed: {e}")
+        raise HTTPException(status_code=503, detail=f"InfluxDB unavailable: {e}")
+
+    async def body():
+        if request.format == "csv":
+            yield (",".join(EXPORT_FIELDS) + "\n").encode("utf-8")
+        if first is None:
+            return
+        rows = 0
+        df = first
+        while True:
+            points = _metric_points(df, request)
+            rows += len(points)
+            yield encode(points)
+            try:
+                df = await chunks.__anext__()
+            except StopAsyncIteration:
+                break
+            except Exception as e:
+                logger.error(f"❌ Historical export for {request.building_id} aborted after {rows} rows: {e}")
+                yield _encode_error(request.format, str(e))
+                return
+        logger.info(f"✅ Historical export for {request.building_id} finished: {rows} rows")
+
+    extension = "csv" if request.format == "csv" else "ndjson"
+    filename = f"{request.building_id}-{start_time:%Y%m%d}-{end_time:%Y%m%d}.{extension}"
+    return StreamingResponse(
+        body(),
+        media_type="text/csv" if request.format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/latest/{building_id}")
 async def get_latest_metrics(building_id: str, zone_id: Optional[str] = None):
     """Get latest metric values for a building/zone - OPTIMIZED with bulk query."""
-    from core.services.influxdb_service import get_influx_client
+    from core.services.influxdb_service import get_query_api, influx_breaker, run_in_influx_executor
     import os
     
     logger.info(f"Fetching latest metrics for {building_id}/{zone_id}")
@@ -104,7 +234,7 @@ async def get_latest_metrics(building_id: str, zone_id: Optional[str] = None):
     
     try:
         # OPTIMIZED: Single bulk query for ALL zones and metrics
-        client = get_influx_client()
+        query_api = get_query_api()
         bucket = os.getenv("INFLUXDB_BUCKET", "building_telemetry")
         
         # Build filter for all metrics in one query
@@ -124,7 +254,7 @@ async def get_latest_metrics(building_id: str, zone_id: Optional[str] = None):
         '''
         
         logger.info(f"🚀 Executing optimized bulk query for all zones/metrics")
-        tables = client.query_api().query(flux_query)
+        tables = await run_in_influx_executor(influx_breaker.call, query_api.query, flux_query)
         
         # Parse results into structure
         for table in tables:
@@ -169,6 +299,17 @@ async def get_latest_metrics(building_id: str, zone_id: Optional[str] = None):
     }
 
 
+@router.get("/stats")
+async def get_data_layer_stats():
+    """Report query/forecast cache, forecast precompute and telemetry writer counters for this worker."""
+    return {
+        "query_cache": timeseries_service.cache_stats(),
+        "forecast_cache": forecast_cache_stats(),
+        "forecast_precompute": forecast_precompute.stats(),
+        "telemetry_writer": telemetry_writer.stats(),
+    }
+
+
 @router.get("/health")
 async def check_data_health():
     """Check InfluxDB connection status."""
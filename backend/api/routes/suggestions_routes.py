@@ -1,9 +1,12 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 from pydantic import BaseModel
 from typing import List
 
 from core.suggestions_engine.smart_suggestions import suggestion_engine
 from core.services.action_state_service import action_state_service
+from core.services.dashboard_service import dashboard_snapshots
+from core.services.influxdb_service import run_in_influx_executor
+from core.utils.http_cache import compute_etag, etag_matches, not_modified, set_etag
 
 
 router = APIRouter()
@@ -47,12 +50,25 @@ class AppliedActionResponse(BaseModel):
 
 
 @router.post("/recommend", response_model=List[Suggestion])
-async def recommend_actions(query: SuggestionQuery) -> List[Suggestion]:
+async def recommend_actions(query: SuggestionQuery, request: Request, response: Response) -> List[Suggestion]:
     """
     Return intelligent energy optimization recommendations.
     Uses data-driven analysis when available, with rule-based fallbacks.
+    Honors If-None-Match with an ETag derived from the data watermark and
+    actions version (applied/dismissed suggestions bump the version).
     """
-    suggestions_data = suggestion_engine.generate_suggestions(
+    etag = compute_etag(
+        "suggestions",
+        query.building_id,
+        dashboard_snapshots.data_watermark(query.building_id).isoformat(),
+        action_state_service.get_version(query.building_id),
+        query.horizon_hours,
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    suggestions_data = await run_in_influx_executor(
+        suggestion_engine.generate_suggestions,
         building_id=query.building_id,
         horizon_hours=query.horizon_hours
     )
@@ -62,6 +78,7 @@ async def recommend_actions(query: SuggestionQuery) -> List[Suggestion]:
         for s in suggestions_data
         if not action_state_service.should_suppress_suggestion(query.building_id, s)
     ]
+    set_etag(response, etag)
     return [Suggestion(**s) for s in filtered]
 
 
@@ -0,0 +1,52 @@
+"""
+Benchmark autoencoder inference: Keras ``model.predict`` vs the NumPy export.
+
+Scores batches of scaled feature rows with both engines, asserts the
+reconstruction errors agree, and times each. Requires TensorFlow and
+models/anomaly/autoencoder.npz (see scripts/export_numpy_models.py).
+
+Run from the backend directory:
+    python -m benchmarks.bench_autoencoder
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import tensorflow as tf
+
+from benchmarks.common import best_of, fmt_ms, print_table
+from core.utils.model_loader import get_model_path
+from core.utils.numpy_inference import DenseNetwork
+
+
+BATCH_SIZES = [96, 500, 10_000]
+
+
+def reconstruction_error(model, x: np.ndarray) -> np.ndarray:
+    recon = model.predict(x, verbose=0)
+    return np.mean((x - recon) ** 2, axis=1)
+
+
+def main() -> None:
+    keras_model = tf.keras.models.load_model(get_model_path("anomaly", "autoencoder.h5"), compile=False)
+    numpy_model = DenseNetwork.load(get_model_path("anomaly", "autoencoder.npz"))
+    rng = np.random.default_rng(3)
+
+    rows = []
+    for n in BATCH_SIZES:
+        x = rng.standard_normal((n, numpy_model.input_dim)).astype(np.float32)
+
+        expected = reconstruction_error(keras_model, x)
+        actual = reconstruction_error(numpy_model, x)
+        np.testing.assert_allclose(actual, expected, rtol=1e-4, atol=1e-5)
+
+        keras_t = best_of(lambda: reconstruction_error(keras_model, x), repeat=5)
+        numpy_t = best_of(lambda: reconstruction_error(numpy_model, x), repeat=20)
+        max_diff = float(np.max(np.abs(actual - expected)))
+        rows.append([n, fmt_ms(keras_t), fmt_ms(numpy_t), f"{keras_t / numpy_t:.0f}x", f"{max_diff:.1e}"])
+
+    print_table(["rows", "keras", "numpy", "speedup", "max |diff|"], rows)
+
+
+if __name__ == "__main__":
+    main()
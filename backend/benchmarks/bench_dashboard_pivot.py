@@ -0,0 +1,76 @@
+"""
+Benchmark the zone-to-building pivot used by the dashboard loader.
+
+Compares the previous per-timestamp loop against the vectorized
+``pivot_zone_metrics`` helper on 48h, 7-day and 30-day windows at
+15-minute resolution across three zones.
+
+Run from the backend directory:
+    python -m benchmarks.bench_dashboard_pivot
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import best_of, fmt_ms, print_table
+from core.utils.preprocessing import pivot_zone_metrics
+
+
+METRICS = ["energy", "temperature", "humidity", "occupancy"]
+ZONES = ["zone-core", "zone-east", "zone-west"]
+WINDOWS = {"48h": 48, "7d": 7 * 24, "30d": 30 * 24}
+
+
+def make_long_frame(hours: int, resolution_minutes: int = 15, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range(
+        end=pd.Timestamp("2024-01-31", tz="UTC"),
+        periods=hours * 60 // resolution_minutes,
+        freq=f"{resolution_minutes}min",
+    )
+    index = pd.MultiIndex.from_product([ZONES, METRICS, timestamps], names=["zone_id", "metric", "timestamp"])
+    df = index.to_frame(index=False)
+    df["value"] = rng.normal(50, 10, len(df))
+    return df
+
+
+def legacy_pivot(df: pd.DataFrame, metrics: list[str]) -> pd.DataFrame:
+    """The per-timestamp loop previously used by ``_load_data_from_influxdb``."""
+    result_rows = []
+    for timestamp in df["timestamp"].unique():
+        ts_data = df[df["timestamp"] == timestamp]
+        row = {"timestamp": timestamp}
+        for metric in metrics:
+            metric_data = ts_data[ts_data["metric"] == metric]["value"]
+            if len(metric_data) > 0:
+                if metric == "energy":
+                    row[metric] = float(metric_data.sum())
+                else:
+                    row[metric] = float(metric_data.mean())
+            else:
+                row[metric] = 0.0
+        result_rows.append(row)
+    pivot_df = pd.DataFrame(result_rows)
+    return pivot_df.sort_values("timestamp").reset_index(drop=True)
+
+
+def main() -> None:
+    rows = []
+    for label, hours in WINDOWS.items():
+        df = make_long_frame(hours)
+
+        expected = legacy_pivot(df, METRICS)
+        actual = pivot_zone_metrics(df, METRICS)
+        pd.testing.assert_frame_equal(expected, actual, check_dtype=False)
+
+        legacy_t = best_of(lambda: legacy_pivot(df, METRICS), repeat=3)
+        vector_t = best_of(lambda: pivot_zone_metrics(df, METRICS), repeat=5)
+        rows.append([label, len(df), fmt_ms(legacy_t), fmt_ms(vector_t), f"{legacy_t / vector_t:.0f}x"])
+
+    print_table(["window", "rows", "loop", "vectorized", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
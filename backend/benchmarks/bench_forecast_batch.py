@@ -0,0 +1,76 @@
+"""
+Benchmark portfolio energy forecasting: one model rollout per building (the
+``/forecast/energy`` path in a loop) vs one batched rollout over all buildings
+(``/forecast/energy/batch``).
+
+Histories are generated up front and shared by both paths, so the timings
+cover scaling, exogenous projection, the LSTM calls and response building,
+not the history queries. Asserts both paths return the same forecasts (to
+float32 rounding).
+
+Run from the backend directory:
+    python -m benchmarks.bench_forecast_batch
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.common import best_of, fmt_ms, print_table
+from core.services import forecasting_service
+
+
+FLEET_SIZES = [10, 50, 100]
+HORIZONS = [24, 168]
+START = datetime(2024, 1, 8)
+
+
+def _histories(n_buildings: int) -> dict:
+    return {
+        f"building-{i}": forecasting_service._generate_synthetic_history()
+        for i in range(n_buildings)
+    }
+
+
+def _per_building(histories: dict, horizon: int) -> dict:
+    return {
+        b: forecasting_service._compute_energy_forecasts([b], horizon, START, {b: df})[b]
+        for b, df in histories.items()
+    }
+
+
+def _batched(histories: dict, horizon: int) -> dict:
+    return forecasting_service._compute_energy_forecasts(list(histories), horizon, START, histories)
+
+
+def _energy(result: dict) -> np.ndarray:
+    return np.array([p["energy_kwh"] for p in result["forecast"]])
+
+
+def main() -> None:
+    if forecasting_service._load_energy_model() is None or forecasting_service._load_energy_scaler() is None:
+        raise SystemExit("Energy model not available; nothing to benchmark")
+
+    rows = []
+    for n in FLEET_SIZES:
+        histories = _histories(n)
+        for horizon in HORIZONS:
+            expected = _per_building(histories, horizon)
+            actual = _batched(histories, horizon)
+            for b in histories:
+                assert actual[b]["model_available"] and expected[b]["model_available"]
+                # float32 matmuls over different batch shapes round differently
+                np.testing.assert_allclose(_energy(actual[b]), _energy(expected[b]), rtol=1e-3, atol=1e-3)
+
+            repeat = 1 if n >= 100 else 3
+            loop_t = best_of(lambda: _per_building(histories, horizon), repeat=repeat)
+            batch_t = best_of(lambda: _batched(histories, horizon), repeat=repeat)
+            rows.append([n, horizon, fmt_ms(loop_t), fmt_ms(batch_t), f"{loop_t / batch_t:.1f}x"])
+
+    print_table(["buildings", "horizon", "per-building", "batched", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
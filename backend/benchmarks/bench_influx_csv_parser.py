@@ -0,0 +1,123 @@
+"""
+Benchmark the raw-CSV result parser against ``query_data_frame``.
+
+Builds the CSV body InfluxDB returns for a 30-day, 4-metric, 3-zone query at
+15-minute resolution. The legacy body has annotations and every column. The
+new body is plain CSV after ``keep()``. Each body is parsed the way the two
+code paths do it, reporting latency, peak allocation and result size.
+
+Run from the backend directory:
+    python -m benchmarks.bench_influx_csv_parser
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from influxdb_client.client.flux_csv_parser import FluxCsvParser, FluxSerializationMode
+
+from benchmarks.common import best_of, fmt_ms, print_table
+from core.services.influxdb_service import _parse_long_format
+
+
+METRICS = ["energy", "temperature", "humidity", "occupancy"]
+ZONES = ["zone-core", "zone-east", "zone-west"]
+DAYS = 30
+RESOLUTION_MINUTES = 15
+
+
+def _series():
+    rng = np.random.default_rng(11)
+    timestamps = pd.date_range(
+        end=pd.Timestamp("2024-01-31", tz="UTC"),
+        periods=DAYS * 24 * 60 // RESOLUTION_MINUTES,
+        freq=f"{RESOLUTION_MINUTES}min",
+    ).strftime("%Y-%m-%dT%H:%M:%SZ")
+    table = 0
+    for metric in METRICS:
+        for zone in ZONES:
+            yield table, metric, zone, timestamps, rng.normal(50, 10, len(timestamps))
+            table += 1
+
+
+def annotated_csv() -> bytes:
+    """Body for the default dialect, as consumed by ``query_data_frame``."""
+    out = io.StringIO()
+    out.write("#datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,dateTime:RFC3339,double,string,string,string,string\n")
+    out.write("#group,false,false,true,true,false,false,true,true,true,true\n")
+    out.write("#default,mean,,,,,,,,,\n")
+    out.write(",result,table,_start,_stop,_time,_value,_field,_measurement,building_id,zone_id\n")
+    start, stop = "2024-01-01T00:00:00Z", "2024-01-31T00:00:00Z"
+    for table, metric, zone, timestamps, values in _series():
+        for ts, value in zip(timestamps, values):
+            out.write(f",,{table},{start},{stop},{ts},{float(value)!r},value,{metric},demo-building,{zone}\n")
+    return out.getvalue().encode("utf-8")
+
+
+def raw_csv() -> bytes:
+    """Body for the plain dialect after ``keep()``, as consumed by the fast path."""
+    out = io.StringIO()
+    out.write(",result,table,_time,_value,_measurement,zone_id\n")
+    for table, metric, zone, timestamps, values in _series():
+        for ts, value in zip(timestamps, values):
+            out.write(f",mean,{table},{ts},{float(value)!r},{metric},{zone}\n")
+    return out.getvalue().encode("utf-8")
+
+
+def legacy_parse(body: bytes) -> pd.DataFrame:
+    parser = FluxCsvParser(response=io.BytesIO(body), serialization_mode=FluxSerializationMode.dataFrame)
+    frames = list(parser.generator())
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    return df.rename(columns={"_time": "timestamp", "_value": "value", "_measurement": "metric"})
+
+
+def fast_parse(body: bytes) -> pd.DataFrame:
+    return _parse_long_format(csv.reader(codecs.iterdecode(io.BytesIO(body), "utf-8")))
+
+
+def peak_bytes(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    legacy_body = annotated_csv()
+    fast_body = raw_csv()
+
+    legacy_df = legacy_parse(legacy_body)
+    fast_df = fast_parse(fast_body)
+    assert len(legacy_df) == len(fast_df)
+    np.testing.assert_allclose(
+        legacy_df.sort_values(["metric", "zone_id", "timestamp"])["value"].to_numpy(),
+        fast_df.sort_values(["metric", "zone_id", "timestamp"])["value"].to_numpy(),
+    )
+
+    rows = []
+    for label, body, fn, df in (
+        ("query_data_frame", legacy_body, legacy_parse, legacy_df),
+        ("raw csv parser", fast_body, fast_parse, fast_df),
+    ):
+        rows.append([
+            label,
+            f"{len(body) / 1e6:.2f} MB",
+            fmt_ms(best_of(lambda: fn(body), repeat=3)),
+            f"{peak_bytes(lambda: fn(body)) / 1e6:.1f} MB",
+            f"{df.memory_usage(deep=True).sum() / 1e6:.1f} MB",
+            len(df.columns),
+        ])
+
+    print(f"{len(fast_df)} rows ({DAYS} days x {len(METRICS)} metrics x {len(ZONES)} zones)")
+    print_table(["path", "payload", "latency", "peak alloc", "frame size", "columns"], rows)
+
+
+if __name__ == "__main__":
+    main()
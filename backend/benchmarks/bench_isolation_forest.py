@@ -0,0 +1,51 @@
+"""
+Benchmark IsolationForest scoring: sklearn ``score_samples`` vs the
+array-compiled scorer.
+
+Scores standard-normal feature rows (the scaler's output space) at batch
+sizes 1, 96, 1k and 100k with the trained forest, asserts the scores are
+bit-identical, and times both.
+
+Run from the backend directory:
+    python -m benchmarks.bench_isolation_forest
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from benchmarks.common import best_of, fmt_ms, print_table
+from core.anomaly_engine.compiled_iforest import CompiledIsolationForest
+from core.anomaly_engine.isolation_forest import _load_iforest
+
+
+BATCH_SIZES = [1, 96, 1_000, 100_000]
+
+
+def main() -> None:
+    model = _load_iforest()
+    if model is None:
+        raise SystemExit("models/anomaly/isolation_forest.pkl could not be loaded")
+    compiled = CompiledIsolationForest(model)
+    rng = np.random.default_rng(5)
+
+    rows = []
+    for n in BATCH_SIZES:
+        # Mix in-distribution rows with outliers so paths of every depth are hit
+        x = rng.standard_normal((n, model.n_features_in_)).astype(np.float32)
+        x[::7] *= 4.0
+
+        expected = model.score_samples(x)
+        actual = compiled.score_samples(x)
+        np.testing.assert_array_equal(actual, expected)
+
+        repeat = 3 if n >= 100_000 else 10
+        sklearn_t = best_of(lambda: model.score_samples(x), repeat=repeat)
+        compiled_t = best_of(lambda: compiled.score_samples(x), repeat=repeat)
+        rows.append([n, fmt_ms(sklearn_t), fmt_ms(compiled_t), f"{sklearn_t / compiled_t:.1f}x"])
+
+    print_table(["rows", "sklearn", "compiled", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
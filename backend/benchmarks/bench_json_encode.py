@@ -0,0 +1,104 @@
+"""
+Benchmark response encoding: FastAPI's default path (validate against the
+response model, dump to JSON-compatible Python, stdlib ``json``) vs returning
+``FastJSONResponse`` directly (no re-validation, orjson when installed).
+
+Payloads are ``/historical/query`` responses at 1k, 10k and 100k points and a
+dashboard overview with 288 chart rows. Asserts both paths decode to the same
+JSON.
+
+Run from the backend directory:
+    python -m benchmarks.bench_json_encode
+"""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from api.routes.dashboard_routes import DashboardResponse
+from api.routes.historical_routes import HistoricalDataRequest, HistoricalDataResponse, _metric_points
+from benchmarks.common import best_of, fmt_ms, print_table
+from core.utils import fast_json
+from core.utils.serialization import column_values, isoformat_column, records
+
+
+POINT_COUNTS = [1_000, 10_000, 100_000]
+
+REQUEST = HistoricalDataRequest(
+    building_id="building-1",
+    metrics=["energy", "temperature"],
+    start_time="2024-01-01T00:00:00Z",
+    end_time="2024-04-01T00:00:00Z",
+)
+
+
+def _historical_payload(n_points: int, rng: np.random.Generator) -> dict:
+    df = pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=n_points, freq="min", tz="UTC"),
+        "metric": np.where(np.arange(n_points) % 2 == 0, "energy", "temperature"),
+        "value": rng.normal(100.0, 15.0, n_points),
+        "zone_id": "zone-core",
+    })
+    return {"building_id": "building-1", "points": _metric_points(df, REQUEST), "resolution_minutes": 15}
+
+
+def _dashboard_payload(rng: np.random.Generator) -> dict:
+    n = 288
+    charts = records({
+        "timestamp": isoformat_column(pd.date_range("2024-01-01", periods=n, freq="5min", tz="UTC")),
+        "energy": column_values(rng.uniform(50, 150, n)),
+        "temperature": column_values(rng.uniform(19, 25, n)),
+        "occupancy": column_values(rng.uniform(0, 1, n)),
+        "carbon": column_values(rng.uniform(0, 0.1, n)),
+    })
+    anomalies = [dict(row, score=0.5, is_anomaly=False) for row in charts[:50]]
+    return {
+        "building": {"building_id": "building-1", "name": "HQ"},
+        "kpis": {"total_energy_kwh": 1234.5, "avg_temperature_c": 21.3},
+        "charts": charts,
+        "carbon": {"today_tonnes": 1.2, "previous_tonnes": 1.1, "delta_percent": 9.1},
+        "alerts": [],
+        "anomalies": anomalies,
+        "suggestions": [],
+        "applied_actions": [],
+        "actions_version": 3,
+        "partial": False,
+        "degraded": [],
+    }
+
+
+def _validated_stdlib(adapter: TypeAdapter, payload: dict) -> bytes:
+    # What FastAPI does for a returned dict with response_model set
+    value = adapter.validate_python(payload)
+    return JSONResponse(adapter.dump_python(value, mode="json")).body
+
+
+def main() -> None:
+    rng = np.random.default_rng(3)
+    cases = [(f"historical {n:,} points", HistoricalDataResponse, _historical_payload(n, rng)) for n in POINT_COUNTS]
+    cases.append(("dashboard overview", DashboardResponse, _dashboard_payload(rng)))
+
+    rows = []
+    for name, model, payload in cases:
+        adapter = TypeAdapter(model)
+        expected = _validated_stdlib(adapter, payload)
+        actual = fast_json.FastJSONResponse(payload).body
+        assert json.loads(actual) == json.loads(expected)
+
+        repeat = 3 if len(expected) > 5_000_000 else 10
+        stdlib_t = best_of(lambda: _validated_stdlib(adapter, payload), repeat=repeat)
+        fast_t = best_of(lambda: fast_json.FastJSONResponse(payload).body, repeat=repeat)
+        rows.append([name, f"{len(actual) / 1024:.0f} KiB", fmt_ms(stdlib_t), fmt_ms(fast_t), f"{stdlib_t / fast_t:.1f}x"])
+
+    encoder = "orjson" if fast_json.orjson is not None else "stdlib fallback"
+    print(f"FastJSONResponse encoder: {encoder}")
+    print_table(["payload", "size", "validate+json", "FastJSONResponse", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
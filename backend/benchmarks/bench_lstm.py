@@ -0,0 +1,52 @@
+"""
+Benchmark forecasting LSTM inference: Keras ``model.predict`` vs the NumPy
+export, for the energy and occupancy models.
+
+Runs MinMax-range random sequences through both engines at batch sizes from a
+single building up to a large portfolio, asserts the forecasts agree, and
+times each. Requires TensorFlow and models/forecasting/lstm_*.npz (see
+scripts/export_numpy_models.py).
+
+Run from the backend directory:
+    python -m benchmarks.bench_lstm
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import tensorflow as tf
+
+from benchmarks.common import best_of, fmt_ms, print_table
+from core.utils.model_loader import get_model_path
+from core.utils.numpy_inference import LSTMNetwork
+
+
+MODELS = ["lstm_energy", "lstm_occupancy"]
+BATCH_SIZES = [1, 100, 500]
+
+
+def main() -> None:
+    rng = np.random.default_rng(5)
+
+    rows = []
+    for name in MODELS:
+        keras_model = tf.keras.models.load_model(get_model_path("forecasting", f"{name}.h5"), compile=False)
+        numpy_model = LSTMNetwork.load(get_model_path("forecasting", f"{name}.npz"))
+
+        for n in BATCH_SIZES:
+            x = rng.uniform(0.0, 1.0, (n, *numpy_model.input_shape[1:])).astype(np.float32)
+
+            expected = keras_model.predict(x, verbose=0)
+            actual = numpy_model.predict(x)
+            np.testing.assert_allclose(actual, expected, rtol=1e-4, atol=1e-5)
+
+            keras_t = best_of(lambda: keras_model.predict(x, verbose=0), repeat=5)
+            numpy_t = best_of(lambda: numpy_model.predict(x), repeat=20)
+            max_diff = float(np.max(np.abs(actual - expected)))
+            rows.append([name, n, fmt_ms(keras_t), fmt_ms(numpy_t), f"{keras_t / numpy_t:.0f}x", f"{max_diff:.1e}"])
+
+    print_table(["model", "batch", "keras", "numpy", "speedup", "max |diff|"], rows)
+
+
+if __name__ == "__main__":
+    main()
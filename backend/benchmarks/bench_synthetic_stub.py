@@ -0,0 +1,69 @@
+"""
+Benchmark the synthetic ``query_time_series_stub`` fallback.
+
+Compares the previous list-of-dicts loop against the array-based generator
+on 48h, 30-day and 90-day windows at 15-minute resolution. Both versions
+are driven by the same seeded noise so their output can be compared.
+
+Run from the backend directory:
+    python -m benchmarks.bench_synthetic_stub
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import best_of, fmt_ms, print_table
+from core.services.influxdb_service import query_time_series_stub
+
+
+METRICS = ["energy", "temperature", "humidity", "occupancy"]
+WINDOWS = {"48h": 48, "30d": 30 * 24, "90d": 90 * 24}
+END = datetime(2024, 3, 31)
+SEED = 11
+
+
+def legacy_stub(building_id, zone_id, metrics, start_time, end_time, resolution_minutes=15, seed=None):
+    """The per-timestamp loop previously used by ``query_time_series_stub``."""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range(start=start_time, end=end_time, freq=f"{resolution_minutes}min")
+
+    data = []
+    for ts in timestamps:
+        hour = ts.hour
+        base_value = 0.5 + 0.3 * np.sin(2 * np.pi * hour / 24)
+        noise = rng.normal(0, 0.1)
+
+        for metric in metrics:
+            data.append({
+                "timestamp": ts,
+                "metric": metric,
+                "value": max(0, base_value + noise),
+                "zone_id": zone_id or "zone-1",
+                "building_id": building_id,
+            })
+
+    return pd.DataFrame(data)
+
+
+def main() -> None:
+    rows = []
+    for label, hours in WINDOWS.items():
+        args = ("building-1", None, METRICS, END - timedelta(hours=hours), END)
+
+        expected = legacy_stub(*args, seed=SEED)
+        actual = query_time_series_stub(*args, seed=SEED)
+        pd.testing.assert_frame_equal(expected, actual, check_dtype=False)
+
+        legacy_t = best_of(lambda: legacy_stub(*args), repeat=3)
+        vector_t = best_of(lambda: query_time_series_stub(*args), repeat=5)
+        rows.append([label, len(actual), fmt_ms(legacy_t), fmt_ms(vector_t), f"{legacy_t / vector_t:.0f}x"])
+
+    print_table(["window", "rows", "loop", "vectorized", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
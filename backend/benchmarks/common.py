@@ -0,0 +1,40 @@
+"""
+Shared helpers for the micro-benchmarks in this directory.
+
+Run any benchmark from the backend directory, e.g.:
+    python -m benchmarks.bench_dashboard_pivot
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, List, Sequence
+
+
+def best_of(fn: Callable[[], object], repeat: int = 5, number: int = 1) -> float:
+    """Return the best wall-clock time (seconds per call) over ``repeat`` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = (time.perf_counter() - start) / number
+        best = min(best, elapsed)
+    return best
+
+
+def print_table(headers: Sequence[str], rows: List[Sequence[object]]) -> None:
+    """Print a plain fixed-width table."""
+    widths = [
+        max(len(str(h)), *(len(str(r[i])) for r in rows)) if rows else len(str(h))
+        for i, h in enumerate(headers)
+    ]
+    line = "  ".join(str(h).ljust(w) for h, w in zip(headers, widths))
+    print(line)
+    print("-" * len(line))
+    for row in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(row, widths)))
+
+
+def fmt_ms(seconds: float) -> str:
+    return f"{seconds * 1000:.2f} ms"
@@ -3,12 +3,11 @@ from __future__ import annotations
 from functools import lru_cache
 from typing import List, Optional
 
-import joblib
 import numpy as np
 import pandas as pd
-import tensorflow as tf
 
-from core.utils.model_loader import get_model_path
+from core.utils.model_loader import load_joblib_artifact, load_keras_model, load_numpy_export
+from core.utils.numpy_inference import DenseNetwork
 
 
 @lru_cache(maxsize=1)
@@ -16,25 +15,23 @@ def _load_autoencoder() -> Optional[object]:
     """
     Lazily load the trained autoencoder model from disk.
 
-    If the file is missing or not a valid H5 model, return None so
-    the rest of the pipeline can gracefully fall back to other models.
+    Prefers the NumPy export (autoencoder.npz, written by
+    scripts/export_numpy_models.py) and falls back to the Keras H5 model,
+    which is the only path that imports TensorFlow. Both expose
+    ``predict(x, verbose=0)``. If neither loads, return None so the rest of
+    the pipeline can gracefully fall back to other models.
     """
-    model_path = get_model_path("anomaly", "autoencoder.h5")
-    try:
-        return tf.keras.models.load_model(model_path, compile=False)
-    except Exception:
-        # In a real system, you'd log this properly.
-        return None
+    network = load_numpy_export(DenseNetwork.load, "anomaly", "autoencoder")
+    if network is not None:
+        return network
+
+    return load_keras_model("anomaly", "autoencoder.h5")
 
 
 @lru_cache(maxsize=1)
 def _load_scaler() -> Optional[object]:
     """Load the feature scaler shared with IsolationForest."""
-    scaler_path = get_model_path("anomaly", "scaler.pkl")
-    try:
-        return joblib.load(scaler_path)
-    except Exception:
-        return None
+    return load_joblib_artifact("anomaly", "scaler.pkl")
 
 
 def autoencoder_reconstruction_error(
@@ -3,11 +3,11 @@ from __future__ import annotations
 from functools import lru_cache
 from typing import List, Optional
 
-import joblib
 import numpy as np
 import pandas as pd
 
-from core.utils.model_loader import get_model_path
+from core.anomaly_engine.compiled_iforest import CompiledIsolationForest
+from core.utils.model_loader import load_joblib_artifact
 
 
 @lru_cache(maxsize=1)
@@ -18,22 +18,30 @@ def _load_iforest() -> Optional[object]:
     If the pickle file is missing or corrupted, return None so the
     caller can gracefully fall back instead of raising EOFError.
     """
-    model_path = get_model_path("anomaly", "isolation_forest.pkl")
+    return load_joblib_artifact("anomaly", "isolation_forest.pkl")
+
+
+@lru_cache(maxsize=1)
+def _load_compiled_iforest() -> Optional[object]:
+    """
+    Flatten the trained forest into a CompiledIsolationForest.
+
+    Falls back to the sklearn model itself if it cannot be compiled (e.g. a
+    pickle from an sklearn version without the cached path-length arrays).
+    """
+    model = _load_iforest()
+    if model is None:
+        return None
     try:
-        return joblib.load(model_path)
+        return CompiledIsolationForest(model)
     except Exception:
-        # In production, log this error with details.
-        return None
+        return model
 
 
 @lru_cache(maxsize=1)
 def _load_scaler() -> Optional[object]:
     """Load the feature scaler used during training."""
-    scaler_path = get_model_path("anomaly", "scaler.pkl")
-    try:
-        return joblib.load(scaler_path)
-    except Exception:
-        return None
+    return load_joblib_artifact("anomaly", "scaler.pkl")
 
 
 def isolation_forest_scores(
@@ -50,7 +58,7 @@ def isolation_forest_scores(
     if df.empty:
         return pd.Series(dtype="float64")
 
-    model = _load_iforest()
+    model = _load_compiled_iforest()
     if model is None:
         return pd.Series(0.0, index=df.index, name="if_score")
 
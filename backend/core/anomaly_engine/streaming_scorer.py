@@ -0,0 +1,342 @@
+"""
+Incremental anomaly scoring with stable normalization.
+
+Min-max normalizing the autoencoder and IsolationForest scores inside each
+requested window makes scores incomparable across requests and forces the
+whole window to be rescored every time. ``IncrementalAnomalyScorer`` instead
+keeps a per-timestamp cache of raw model scores per (building, source); only
+rows that are new, or whose feature values changed since they were scored,
+go through the models.
+
+Raw scores are mapped to [0, 1] when results are read, never frozen at
+scoring time. With ``models/anomaly/score_calibration.json`` (written by
+``scripts/train_anomaly.py``) the mapping is fixed: the training-set 0.5th
+and 99.5th percentiles of each raw score. Without it, each state's running
+min/max of raw scores is used, applied to the whole response at once.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.anomaly_engine.autoencoder_model import autoencoder_reconstruction_error
+from core.anomaly_engine.isolation_forest import isolation_forest_scores
+from core.utils.config import get_settings
+from core.utils.model_loader import get_model_path
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+FEATURE_COLS = [
+    "energy",
+    "temperature",
+    "humidity",
+    "hour_sin",
+    "hour_cos",
+    "dow_sin",
+    "dow_cos",
+]
+
+RAW_COLS = ["ae_score", "if_score"]
+SCORE_COLS = ["ae_score", "if_score", "score", "is_anomaly"]
+
+
+def _utc_index(index: pd.Index) -> pd.DatetimeIndex:
+    """Cache keys are UTC timestamps; naive timestamps are taken as UTC."""
+    index = pd.DatetimeIndex(index)
+    return index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+
+
+@dataclass
+class _RunningRange:
+    lo: float = np.inf
+    hi: float = -np.inf
+
+    def update(self, values: np.ndarray) -> None:
+        if values.size:
+            self.lo = min(self.lo, float(np.min(values)))
+            self.hi = max(self.hi, float(np.max(values)))
+
+    def normalize(self, values: np.ndarray) -> np.ndarray:
+        if not np.isfinite(self.lo) or self.hi - self.lo < 1e-8:
+            # A single distinct value: nothing to rank it against yet
+            return np.zeros_like(values, dtype=np.float64)
+        return np.clip((values - self.lo) / (self.hi - self.lo), 0.0, 1.0)
+
+
+def load_score_calibration() -> Optional[Dict[str, _RunningRange]]:
+    """Fixed raw-score ranges saved at training time, or None if unavailable."""
+    path = get_model_path("anomaly", "score_calibration.json")
+    if not path.exists():
+        return None
+    try:
+        data = json.loads(path.read_text())
+        return {col: _RunningRange(lo=float(data[col]["lo"]), hi=float(data[col]["hi"])) for col in RAW_COLS}
+    except Exception as e:
+        logger.warning(f"⚠️ Ignoring unreadable anomaly score calibration {path}: {e}")
+        return None
+
+
+@dataclass
+class _BuildingState:
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    ae_range: _RunningRange = field(default_factory=_RunningRange)
+    if_range: _RunningRange = field(default_factory=_RunningRange)
+    # Indexed by UTC timestamp: FEATURE_COLS + RAW_COLS (replaced, never mutated)
+    cache: Optional[pd.DataFrame] = None
+    rows_scored: int = 0
+    rows_reused: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class IncrementalAnomalyScorer:
+    """
+    Scores feature frames per (building, source), reusing cached rows.
+
+    ``source`` separates feeds with different resolution or provenance (the
+    dashboard's 15-minute Influx features vs ``/anomalies/detect`` frames) so
+    they never share cache entries or score ranges; ``source=None`` scores
+    without any state, for throwaway (e.g. synthetic) frames. Raw scores are
+    cached once per distinct feature vector; the combined score
+    (0.5 * normalized AE + 0.5 * normalized IF) and flag
+    (``score >= threshold``) are computed on read, from the calibration when
+    available and otherwise from the state's current running range. At most
+    ``max_states`` states are kept (least recently used evicted), and a
+    state unused for ``idle_seconds`` is dropped.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        retention_hours: int = 168,
+        max_states: int = 512,
+        idle_seconds: float = 24 * 3600.0,
+        calibration: Optional[Dict[str, _RunningRange]] = None,
+    ) -> None:
+        self.threshold = threshold
+        self.retention = pd.Timedelta(hours=retention_hours)
+        self.max_states = max_states
+        self.idle_seconds = idle_seconds
+        self.calibration = calibration
+        self._states: "OrderedDict[Tuple[str, str], _BuildingState]" = OrderedDict()
+        self._states_lock = threading.Lock()
+
+    def _state(self, key: Tuple[str, str]) -> _BuildingState:
+        with self._states_lock:
+            now = time.monotonic()
+            while self._states:
+                oldest_key, oldest = next(iter(self._states.items()))
+                full = key not in self._states and len(self._states) >= self.max_states
+                idle = now - oldest.last_used >= self.idle_seconds
+                if oldest_key == key or not (full or idle):
+                    break
+                del self._states[oldest_key]
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = _BuildingState()
+            state.last_used = now
+            self._states.move_to_end(key)
+            return state
+
+    @staticmethod
+    def _stale_rows(state: _BuildingState, df: pd.DataFrame) -> np.ndarray:
+        """Boolean mask of rows in ``df`` that are uncached or whose features changed."""
+        if state.cache is None:
+            return np.ones(len(df), dtype=bool)
+        cached = state.cache.reindex(df.index)
+        same = np.all(
+            cached[FEATURE_COLS].to_numpy(dtype=np.float64) == df[FEATURE_COLS].to_numpy(dtype=np.float64),
+            axis=1,
+        )
+        return ~same
+
+    def _finish(self, raw: pd.DataFrame, ae_range: _RunningRange, if_range: _RunningRange) -> pd.DataFrame:
+        """Add score/is_anomaly to a frame of raw scores."""
+        if self.calibration is not None:
+            ae_range, if_range = self.calibration["ae_score"], self.calibration["if_score"]
+        ae = raw["ae_score"].to_numpy(dtype=np.float64)
+        iso = raw["if_score"].to_numpy(dtype=np.float64)
+        score = 0.5 * ae_range.normalize(ae) + 0.5 * if_range.normalize(iso)
+        # Rows missing from the cache stay NaN and are never flagged
+        score = np.where(np.isnan(ae) | np.isnan(iso), np.nan, score)
+        return raw.assign(score=score, is_anomaly=score >= self.threshold)
+
+    def score(self, building_id: str, df: pd.DataFrame, source: Optional[str] = "default") -> pd.DataFrame:
+        """
+        Score one building's feature frame.
+
+        Args:
+            building_id: Building identifier
+            df: Timestamp-indexed frame with FEATURE_COLS
+            source: Feed the frame comes from (selects cache and running
+                stats); None scores statelessly
+
+        Returns:
+            Frame on ``df.index`` with columns: ae_score, if_score, score, is_anomaly
+        """
+        return self.score_batch({building_id: df}, source=source)[building_id]
+
+    def _score_stateless(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """One call per model for every frame; each building is normalized over its own rows."""
+        features = {b: df.reindex(columns=FEATURE_COLS) for b, df in frames.items()}
+        scored = [b for b, df in features.items() if not df.empty]
+        if scored:
+            combined = pd.concat([features[b] for b in scored])
+            ae_raw = autoencoder_reconstruction_error(combined, FEATURE_COLS).to_numpy(dtype=np.float64)
+            if_raw = isolation_forest_scores(combined, FEATURE_COLS).to_numpy(dtype=np.float64)
+
+        results = {b: pd.DataFrame(columns=SCORE_COLS, index=df.index) for b, df in frames.items()}
+        offset = 0
+        for building_id in scored:
+            n = len(features[building_id])
+            raw = pd.DataFrame({
+                "ae_score": ae_raw[offset:offset + n],
+                "if_score": if_raw[offset:offset + n],
+            }, index=frames[building_id].index)
+            offset += n
+            ae_range, if_range = _RunningRange(), _RunningRange()
+            ae_range.update(raw["ae_score"].to_numpy())
+            if_range.update(raw["if_score"].to_numpy())
+            results[building_id] = self._finish(raw, ae_range, if_range)
+        return results
+
+    def score_batch(
+        self,
+        frames: Dict[str, pd.DataFrame],
+        source: Optional[str] = "default"
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Score many buildings with one autoencoder and one IsolationForest call.
+
+        Uncached rows from every frame are concatenated, run through both
+        models once, split back per building and cached; each building's
+        result is then normalized as a whole.
+        """
+        if source is None:
+            return self._score_stateless(frames)
+
+        originals = frames
+        frames = {}
+        for building_id, df in originals.items():
+            df = df.reindex(columns=FEATURE_COLS).set_axis(_utc_index(df.index))
+            frames[building_id] = df[~df.index.duplicated(keep="last")]
+        states = {b: self._state((b, source)) for b in frames}
+        # Lock in a stable order so concurrent batches cannot deadlock
+        ordered = sorted(frames)
+        for building_id in ordered:
+            states[building_id].lock.acquire()
+        try:
+            pending: List[pd.DataFrame] = []
+            masks: Dict[str, np.ndarray] = {}
+            for building_id in ordered:
+                df = frames[building_id]
+                mask = self._stale_rows(states[building_id], df) if not df.empty else np.zeros(0, dtype=bool)
+                masks[building_id] = mask
+                pending.append(df.loc[mask, FEATURE_COLS])
+
+            combined = pd.concat(pending) if pending else pd.DataFrame(columns=FEATURE_COLS)
+            if not combined.empty:
+                ae_raw = autoencoder_reconstruction_error(combined, FEATURE_COLS).to_numpy(dtype=np.float64)
+                if_raw = isolation_forest_scores(combined, FEATURE_COLS).to_numpy(dtype=np.float64)
+            else:
+                ae_raw = if_raw = np.zeros(0)
+
+            results: Dict[str, pd.DataFrame] = {}
+            offset = 0
+            for building_id, new_rows in zip(ordered, pending):
+                n = len(new_rows)
+                self._store(
+                    states[building_id],
+                    new_rows,
+                    ae_raw[offset:offset + n],
+                    if_raw[offset:offset + n],
+                    reused=int((~masks[building_id]).sum()),
+                )
+                offset += n
+                original = originals[building_id]
+                state = states[building_id]
+                if state.cache is None:
+                    results[building_id] = pd.DataFrame(columns=SCORE_COLS, index=original.index)
+                    continue
+                raw = state.cache.reindex(_utc_index(original.index))[RAW_COLS]
+                results[building_id] = self._finish(raw, state.ae_range, state.if_range).set_axis(original.index)
+                self._trim(state)
+            return results
+        finally:
+            for building_id in reversed(ordered):
+                states[building_id].lock.release()
+
+    def _store(
+        self,
+        state: _BuildingState,
+        new_rows: pd.DataFrame,
+        ae_raw: np.ndarray,
+        if_raw: np.ndarray,
+        reused: int
+    ) -> None:
+        state.rows_reused += reused
+        if new_rows.empty:
+            return
+
+        state.ae_range.update(ae_raw)
+        state.if_range.update(if_raw)
+
+        columns = {col: new_rows[col].to_numpy(dtype=np.float64) for col in FEATURE_COLS}
+        columns.update(ae_score=ae_raw, if_score=if_raw)
+        scored = pd.DataFrame(columns, index=new_rows.index)
+        cache = state.cache
+        if cache is not None:
+            cache = pd.concat([cache[~cache.index.isin(scored.index)], scored]).sort_index()
+        else:
+            cache = scored.sort_index()
+        state.cache = cache
+        state.rows_scored += len(scored)
+
+    def _trim(self, state: _BuildingState) -> None:
+        """Drop cached rows older than the retention window (after results are read)."""
+        if state.cache is not None:
+            state.cache = state.cache[state.cache.index >= state.cache.index.max() - self.retention]
+
+    def invalidate(self, building_id: str | None = None) -> None:
+        """Forget cached scores and running stats (for every source of the building)."""
+        with self._states_lock:
+            if building_id is None:
+                self._states.clear()
+            else:
+                for key in [k for k in self._states if k[0] == building_id]:
+                    del self._states[key]
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._states_lock:
+            states = dict(self._states)
+        return {
+            f"{building_id}/{source}": {
+                "cached_rows": 0 if state.cache is None else len(state.cache),
+                "rows_scored": state.rows_scored,
+                "rows_reused": state.rows_reused,
+                "ae_min": state.ae_range.lo,
+                "ae_max": state.ae_range.hi,
+                "if_min": state.if_range.lo,
+                "if_max": state.if_range.hi,
+            }
+            for (building_id, source), state in states.items()
+        }
+
+
+anomaly_scorer = IncrementalAnomalyScorer(
+    threshold=settings.anomaly_score_threshold,
+    retention_hours=settings.anomaly_cache_retention_hours,
+    max_states=settings.anomaly_scorer_max_states,
+    idle_seconds=settings.anomaly_scorer_idle_hours * 3600.0,
+    calibration=load_score_calibration(),
+)
@@ -0,0 +1,740 @@
+"""
+Dashboard payload builder and per-building snapshot cache.
+
+Building the overview payload means a 48h fetch, two anomaly models, a
+suggestions query and the KPI/carbon/chart roll-ups. ``DashboardSnapshotService``
+keeps one prebuilt payload per building; a background task refreshes it
+shortly after each 15-minute boundary by fetching only the newest buckets and
+merging them into the cached window.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.services.data_service import data_service
+from core.services.timeseries_service import timeseries_service
+from core.services.influxdb_service import run_in_influx_executor
+from core.services.action_state_service import action_state_service
+from core.anomaly_engine.streaming_scorer import anomaly_scorer
+from core.suggestions_engine.smart_suggestions import suggestion_engine
+from core.utils.config import get_settings
+from core.utils.http_cache import compute_etag
+from core.utils.serialization import column_values, isoformat_column, records
+
+logger = logging.getLogger(__name__)
+
+
+settings = get_settings()
+
+FEATURE_COLS = [
+    "energy",
+    "temperature",
+    "humidity",
+    "hour_sin",
+    "hour_cos",
+    "dow_sin",
+    "dow_cos",
+]
+
+DASHBOARD_METRICS = ["energy", "temperature", "humidity", "occupancy"]
+
+ANOMALY_COLUMNS = ["timestamp", "score", "is_anomaly", "energy", "temperature", "occupancy"]
+
+EMISSION_FACTOR_T_PER_KWH = 0.000707  # ≈0.707 kg CO₂ per kWh
+
+# Suggestion analysis, building info and anomaly scoring run here; only Influx
+# queries use the Influx pool, so stage work the dashboard stopped waiting for
+# never holds a query slot
+_stage_executor: Optional[ThreadPoolExecutor] = None
+
+DashboardContext = Tuple[List[Dict[str, Any]], Dict[str, Any], List[str]]
+
+
+def get_stage_executor() -> ThreadPoolExecutor:
+    """Get the bounded thread pool used for dashboard payload stages."""
+    global _stage_executor
+    if _stage_executor is None:
+        _stage_executor = ThreadPoolExecutor(
+            max_workers=settings.dashboard_stage_workers,
+            thread_name_prefix="dashboard-stage",
+        )
+    return _stage_executor
+
+
+def shutdown_stage_executor() -> None:
+    """Stop the stage pool (called on application shutdown)."""
+    global _stage_executor
+    if _stage_executor is not None:
+        _stage_executor.shutdown(wait=False, cancel_futures=True)
+        _stage_executor = None
+
+
+def _augment_time_features(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df["hour"] = df.index.hour
+    df["dayofweek"] = df.index.dayofweek
+    df["hour_sin"] = np.sin(2 * np.pi * df["hour"] / 24.0)
+    df["hour_cos"] = np.cos(2 * np.pi * df["hour"] / 24.0)
+    df["dow_sin"] = np.sin(2 * np.pi * df["dayofweek"] / 7.0)
+    df["dow_cos"] = np.cos(2 * np.pi * df["dayofweek"] / 7.0)
+    return df.drop(columns=["hour", "dayofweek"])
+
+
+def _to_utc(timestamps: pd.Series) -> pd.Series:
+    timestamps = pd.to_datetime(timestamps)
+    if timestamps.dt.tz is None:
+        return timestamps.dt.tz_localize("UTC")
+    return timestamps.dt.tz_convert("UTC")
+
+
+def _build_anomalies(
+    building_id: str,
+    base_df: pd.DataFrame,
+    display_df: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """
+    Score measured telemetry with the building's incremental anomaly scorer.
+
+    Only timestamps not scored before (or whose readings changed) hit the
+    models. When ``display_df`` is given (the window with applied-action
+    adjustments, same rows as ``base_df``) its energy, temperature and
+    occupancy are reported, so what-if adjustments change the displayed values
+    but not the scores.
+    """
+    if base_df.empty:
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+
+    # Ensure timestamp is a column, not index
+    if base_df.index.name == "timestamp" or "timestamp" not in base_df.columns:
+        if "timestamp" not in base_df.columns and base_df.index.name == "timestamp":
+            base_df = base_df.reset_index()
+
+    # Ensure required columns exist, fill missing ones with defaults
+    required_cols = ["energy", "temperature", "humidity", "occupancy"]
+    for col in required_cols:
+        if col not in base_df.columns:
+            if col == "humidity":
+                # Default humidity if missing (typical indoor range)
+                base_df[col] = 50.0
+            else:
+                base_df[col] = 0.0
+
+    # Set timestamp as index for feature engineering
+    feature_df = base_df.set_index("timestamp")[required_cols].copy()
+    feature_df = _augment_time_features(feature_df)
+
+    # Ensure all feature columns exist
+    missing_features = [col for col in FEATURE_COLS if col not in feature_df.columns]
+    for col in missing_features:
+        feature_df[col] = 0.0
+
+    scores = anomaly_scorer.score(building_id, feature_df, source="dashboard")
+    feature_df = feature_df.assign(
+        score=scores["score"], is_anomaly=scores["is_anomaly"]
+    ).reset_index()
+
+    if display_df is not None:
+        for col in ("energy", "temperature", "occupancy"):
+            if col in display_df.columns:
+                feature_df[col] = display_df[col].to_numpy()
+    return feature_df
+
+
+def load_dashboard_frame(
+    building_id: str,
+    start_time: datetime,
+    end_time: datetime,
+    use_cache: bool = True,
+    fallback: bool = True
+) -> pd.DataFrame:
+    """
+    Load building-level telemetry in dashboard format.
+
+    Influx pivots and aggregates across zones (sum for energy, mean for the
+    rest); metrics with no reading in a bucket count as 0.0. With
+    ``fallback=False`` only stored rows are returned and load failures are
+    raised instead of being logged.
+
+    Returns:
+        DataFrame with columns: timestamp, energy, temperature, humidity, occupancy
+    """
+    try:
+        df = timeseries_service.get_metrics_wide(
+            building_id=building_id,
+            zone_id=None,  # Get all zones
+            metrics=DASHBOARD_METRICS,
+            start_time=start_time,
+            end_time=end_time,
+            resolution_minutes=15,
+            zone_agg={"energy": "sum"},
+            use_cache=use_cache,
+            fallback=fallback
+        )
+        if df.empty:
+            return pd.DataFrame()
+
+        df["timestamp"] = _to_utc(df["timestamp"])
+        frame = df.reindex(columns=["timestamp", *DASHBOARD_METRICS])
+        frame[DASHBOARD_METRICS] = frame[DASHBOARD_METRICS].astype("float64").fillna(0.0)
+        return frame.sort_values("timestamp").reset_index(drop=True)
+    except Exception as e:
+        if not fallback:
+            raise
+        logger.error(f"Failed to load dashboard telemetry for {building_id}: {e}", exc_info=True)
+        return pd.DataFrame()
+
+
+def _load_fallback_frame(start_time: datetime, end_time: datetime) -> pd.DataFrame:
+    """Deployment CSV (or synthetic) data used when no time-series data is available."""
+    logger.warning("⚠️  InfluxDB data empty, falling back to CSV data...")
+    df = data_service.get_data(start_time=start_time, end_time=end_time)
+    if df.empty:
+        df = data_service.get_data()
+    if df.empty:
+        return df
+
+    df = df.copy()
+    df["timestamp"] = _to_utc(df["timestamp"])
+    # Ensure required columns exist
+    for metric in ["energy", "temperature", "occupancy"]:
+        if metric not in df.columns:
+            logger.warning(f"⚠️  Missing column '{metric}', filling with 0.0")
+            df[metric] = 0.0
+    # Add humidity if missing (default to 50%)
+    if "humidity" not in df.columns:
+        df["humidity"] = 50.0
+    return df.sort_values("timestamp").reset_index(drop=True)
+
+
+def _rank_suggestions(building_id: str, recent: pd.DataFrame) -> List[Dict[str, Any]]:
+    suggestions = suggestion_engine.generate_suggestions(building_id, recent=recent)
+    return [
+        s
+        for s in suggestions
+        if not action_state_service.should_suppress_suggestion(building_id, s)
+    ]
+
+
+async def _load_suggestions(building_id: str) -> List[Dict[str, Any]]:
+    """Fetch the suggestion window on the Influx pool, then analyse it on the stage pool."""
+    recent = await run_in_influx_executor(suggestion_engine.load_recent_metrics, building_id)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_stage_executor(), functools.partial(_rank_suggestions, building_id, recent)
+    )
+
+
+async def _run_stage(
+    name: str,
+    timeout_seconds: float,
+    default: Any,
+    degraded: List[str],
+    func: Callable[..., Any],
+    *args: Any
+) -> Any:
+    """
+    Run one dashboard stage: a blocking ``func`` on the stage pool, or a
+    coroutine function that schedules its own pool work.
+
+    On timeout or error the stage is recorded in ``degraded`` and ``default``
+    is returned. A timed-out call keeps running on its pool thread; only the
+    dashboard stops waiting for it.
+    """
+    if asyncio.iscoroutinefunction(func):
+        work = func(*args)
+    else:
+        loop = asyncio.get_running_loop()
+        work = loop.run_in_executor(get_stage_executor(), functools.partial(func, *args))
+    try:
+        return await asyncio.wait_for(work, timeout=timeout_seconds)
+    except asyncio.TimeoutError:
+        logger.warning(f"⏱️  Dashboard stage '{name}' timed out after {timeout_seconds:.1f}s")
+    except Exception as e:
+        logger.error(f"❌ Dashboard stage '{name}' failed: {e}", exc_info=True)
+    degraded.append(name)
+    return default
+
+
+async def load_dashboard_context(building_id: str) -> DashboardContext:
+    """
+    Suggestions and building info, the stages that do not need the telemetry window.
+
+    Returns:
+        (suggestions, building_info, names of degraded stages)
+    """
+    degraded: List[str] = []
+    suggestions, building_info = await asyncio.gather(
+        _run_stage(
+            "suggestions", settings.dashboard_suggestions_timeout_seconds,
+            [], degraded, _load_suggestions, building_id
+        ),
+        _run_stage(
+            "building", settings.dashboard_building_info_timeout_seconds,
+            {"building_id": building_id}, degraded, data_service.get_building_info
+        ),
+    )
+    return suggestions, building_info, degraded
+
+
+async def build_dashboard_payload(
+    building_id: str,
+    df: pd.DataFrame,
+    end_time: datetime,
+    degraded: Optional[List[str]] = None,
+    context: Optional[Awaitable[DashboardContext]] = None
+) -> Dict[str, Any]:
+    """
+    Aggregate KPIs, charts, anomalies, alerts and suggestions from a telemetry window.
+
+    ``df`` holds one row per timestamp (UTC) with energy, temperature,
+    humidity and occupancy columns, covering ``end_time - 48h`` to ``end_time``.
+
+    Anomaly scoring, suggestions and building info run concurrently, each with
+    its own timeout. ``context`` is a ``load_dashboard_context`` call already
+    started alongside the telemetry load; without it that stage starts here.
+    A stage that fails or times out is left empty and named in ``degraded``,
+    and the payload is flagged ``partial``; KPIs and charts are always
+    computed from ``df``.
+    """
+    degraded = list(degraded or [])
+    applied_actions = action_state_service.get_applied_actions(building_id)
+    actions_version = action_state_service.get_version(building_id)
+
+    total_applied_savings = float(
+        sum(a.get("estimated_savings_kwh", 0.0) for a in applied_actions)
+    )
+
+    last_24h_start = end_time - timedelta(hours=24)
+    recent_df = df[df["timestamp"] >= last_24h_start].copy()
+    if recent_df.empty:
+        recent_df = df.tail(96).copy()  # fallback ~24h assuming 15m data
+    measured_df = recent_df.copy()
+
+    if not recent_df.empty and total_applied_savings > 0:
+        recent_energy_total = float(recent_df["energy"].sum())
+        if recent_energy_total > 0:
+            reduction_ratio = min(0.30, total_applied_savings / recent_energy_total)
+            recent_df["energy"] = recent_df["energy"] * (1.0 - reduction_ratio)
+
+    setpoint_targets = [
+        float(a.get("params", {}).get("setpoint_c_target"))
+        for a in applied_actions
+        if a.get("type") == "setpoint_change" and a.get("params", {}).get("setpoint_c_target") is not None
+    ]
+    if setpoint_targets and not recent_df.empty:
+        target = float(max(setpoint_targets))
+        current_avg = float(recent_df["temperature"].mean()) if not recent_df["temperature"].empty else target
+        recent_df["temperature"] = recent_df["temperature"] + 0.35 * (target - current_avg)
+
+    chart_points = recent_df.tail(288).copy()
+    chart_points["carbon"] = chart_points["energy"] * EMISSION_FACTOR_T_PER_KWH
+
+    anomalies_df, (suggestions, building_info, context_degraded) = await asyncio.gather(
+        _run_stage(
+            "anomalies", settings.dashboard_anomaly_timeout_seconds,
+            pd.DataFrame(columns=ANOMALY_COLUMNS), degraded,
+            _build_anomalies, building_id, measured_df, recent_df
+        ),
+        context if context is not None else load_dashboard_context(building_id),
+    )
+    degraded.extend(context_degraded)
+
+    top_anomalies = anomalies_df.sort_values("score", ascending=False).head(50)
+    anomalies_payload = records({
+        "timestamp": isoformat_column(top_anomalies["timestamp"]),
+        "score": column_values(top_anomalies["score"], float),
+        "is_anomaly": column_values(top_anomalies["is_anomaly"], bool),
+        "energy": column_values(top_anomalies["energy"], float),
+        "temperature": column_values(top_anomalies["temperature"], float),
+        "occupancy": column_values(top_anomalies["occupancy"], float),
+    }, length=len(top_anomalies))
+
+    total_energy = float(recent_df["energy"].sum())
+    avg_temp = float(recent_df["temperature"].mean())
+    peak_occ = float(recent_df["occupancy"].max())
+    anomaly_rate = (
+        float(anomalies_df["is_anomaly"].mean()) * 100.0 if not anomalies_df.empty else 0.0
+    )
+    potential_savings = (
+        sum(s.get("estimated_savings_kwh", 0) for s in suggestions)
+        if suggestions
+        else 0.0
+    )
+
+    carbon_today = total_energy * EMISSION_FACTOR_T_PER_KWH
+    prev_window = df[
+        (df["timestamp"] < last_24h_start)
+        & (df["timestamp"] >= last_24h_start - timedelta(hours=24))
+    ]
+    carbon_prev = float(prev_window["energy"].sum()) * EMISSION_FACTOR_T_PER_KWH if not prev_window.empty else 0.0
+    delta_percent = (
+        ((carbon_today - carbon_prev) / carbon_prev) * 100.0 if carbon_prev else 0.0
+    )
+
+    alerts = []
+    for anomaly in anomalies_payload[:5]:
+        severity = "critical" if anomaly["score"] >= 0.9 else "warning"
+        alerts.append(
+            {
+                "id": f"anomaly-{anomaly['timestamp']}",
+                "severity": severity,
+                "title": "Anomaly detected",
+                "message": (
+                    f"Energy spike to {anomaly['energy']:.1f} kWh "
+                    f"(score {(anomaly['score'] * 100):.0f}%)."
+                ),
+                "timestamp": anomaly["timestamp"],
+            }
+        )
+
+    if delta_percent > 5:
+        alerts.append(
+            {
+                "id": "carbon-alert",
+                "severity": "warning",
+                "title": "Carbon footprint rise",
+                "message": f"Carbon emissions increased by {delta_percent:.1f}% vs. previous day.",
+                "timestamp": end_time.isoformat(),
+            }
+        )
+
+    return {
+        "building": building_info,
+        "kpis": {
+            "total_energy_kwh": round(total_energy, 2),
+            "avg_temperature_c": round(avg_temp, 1),
+            "peak_occupancy": round(peak_occ, 2),
+            "anomaly_rate_pct": round(anomaly_rate, 1),
+            "potential_savings_kwh": round(potential_savings, 1),
+        },
+        "charts": records({
+            "timestamp": isoformat_column(chart_points["timestamp"]),
+            "energy": column_values(chart_points["energy"], float),
+            "temperature": column_values(chart_points["temperature"], float),
+            "occupancy": column_values(chart_points["occupancy"], float),
+            "carbon": column_values(chart_points["carbon"], float),
+        }, length=len(chart_points)),
+        "carbon": {
+            "today_tonnes": round(carbon_today, 3),
+            "previous_tonnes": round(carbon_prev, 3),
+            "delta_percent": round(delta_percent, 1),
+        },
+        "alerts": alerts,
+        "anomalies": anomalies_payload,
+        "suggestions": suggestions[:5],
+        "applied_actions": applied_actions,
+        "actions_version": actions_version,
+        "partial": bool(degraded),
+        "degraded": degraded,
+    }
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """A prebuilt dashboard payload and the telemetry window it was built from."""
+    building_id: str
+    payload: Dict[str, Any]
+    frame: pd.DataFrame
+    watermark: pd.Timestamp  # Latest telemetry timestamp in ``frame``
+    actions_version: int
+    built_at: datetime
+    incremental: bool  # False when ``frame`` came from the CSV fallback
+    etag: str
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.payload.get("partial"))
+
+
+class DashboardSnapshotService:
+    """
+    Keeps a warm dashboard payload per building.
+
+    Buildings are registered on their first successful request. At most
+    ``max_buildings`` are kept (the least recently requested is evicted),
+    and a building nobody has requested for ``idle_seconds`` stops being
+    refreshed and is dropped. A snapshot is rebuilt
+    when a new bucket boundary has passed since it was built (normally by the
+    background task, otherwise on the next request) or when the building's
+    applied actions change. Refreshes re-fetch only the buckets from the
+    previous watermark onward, merge them into the cached window and trim it
+    to ``window_hours``. Partial snapshots (a stage timed out) are served
+    as-is and retried after ``partial_retry_seconds``.
+    """
+
+    def __init__(
+        self,
+        window_hours: int = 48,
+        resolution_minutes: int = 15,
+        settle_seconds: float = 5.0,
+        load_timeout_seconds: float = 20.0,
+        partial_retry_seconds: float = 30.0,
+        max_buildings: int = 200,
+        idle_seconds: float = 3600.0,
+    ) -> None:
+        self.window_hours = window_hours
+        self.resolution_minutes = resolution_minutes
+        self.settle_seconds = settle_seconds
+        self.load_timeout_seconds = load_timeout_seconds
+        self.partial_retry_seconds = partial_retry_seconds
+        self.max_buildings = max_buildings
+        self.idle_seconds = idle_seconds
+
+        # Only touched from the event loop
+        self._snapshots: Dict[str, DashboardSnapshot] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # building_id -> last request (monotonic), least recent first
+        self._last_requested: "OrderedDict[str, float]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def _bucket(self) -> timedelta:
+        return timedelta(minutes=self.resolution_minutes)
+
+    def _lock_for(self, building_id: str) -> asyncio.Lock:
+        return self._locks.setdefault(building_id, asyncio.Lock())
+
+    def _is_stale(self, snapshot: DashboardSnapshot, now: datetime) -> bool:
+        freq = f"{self.resolution_minutes}min"
+        if pd.Timestamp(now).floor(freq) > pd.Timestamp(snapshot.built_at).floor(freq):
+            return True
+        return snapshot.partial and (now - snapshot.built_at).total_seconds() >= self.partial_retry_seconds
+
+    def data_watermark(self, building_id: str) -> pd.Timestamp:
+        """
+        Latest telemetry timestamp known for a building, without querying.
+
+        Uses the current snapshot when it is up to date; otherwise the start of
+        the current bucket, which changes exactly as often as new data can land.
+        """
+        now = datetime.now(timezone.utc)
+        snapshot = self._snapshots.get(building_id)
+        if snapshot is not None and not self._is_stale(snapshot, now):
+            return snapshot.watermark
+        return pd.Timestamp(now).floor(f"{self.resolution_minutes}min")
+
+    def buildings(self) -> List[str]:
+        """Registered buildings that have been requested within ``idle_seconds``."""
+        self._evict_idle()
+        return list(self._last_requested)
+
+    def _touch(self, building_id: str) -> None:
+        self._last_requested[building_id] = time.monotonic()
+        self._last_requested.move_to_end(building_id)
+        while len(self._last_requested) > self.max_buildings:
+            self._forget(next(iter(self._last_requested)))
+
+    def _forget(self, building_id: str) -> None:
+        self._last_requested.pop(building_id, None)
+        self._snapshots.pop(building_id, None)
+        lock = self._locks.get(building_id)
+        if lock is not None and not lock.locked():
+            del self._locks[building_id]
+
+    def _evict_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_seconds
+        while self._last_requested and next(iter(self._last_requested.values())) < cutoff:
+            building_id = next(iter(self._last_requested))
+            logger.info(f"💤 Dropping dashboard snapshot for idle building {building_id}")
+            self._forget(building_id)
+
+    async def get_snapshot(self, building_id: str) -> DashboardSnapshot:
+        """
+        Return the current snapshot for a building, building or refreshing it if needed.
+
+        Raises LookupError when no telemetry is available at all.
+        """
+        is_new = building_id not in self._last_requested
+        self._touch(building_id)
+        try:
+            async with self._lock_for(building_id):
+                now = datetime.now(timezone.utc)
+                snapshot = self._snapshots.get(building_id)
+                if snapshot is None:
+                    snapshot = await self._build_full(building_id, now)
+                elif self._is_stale(snapshot, now):
+                    snapshot = await self._refresh(snapshot, now)
+                elif snapshot.actions_version != action_state_service.get_version(building_id):
+                    snapshot = await self._publish(building_id, snapshot.frame, now, snapshot.incremental)
+                return snapshot
+        except LookupError:
+            if is_new:
+                self._forget(building_id)
+            raise
+        finally:
+            if building_id not in self._last_requested:
+                self._forget(building_id)
+
+    async def refresh(self, building_id: str) -> Optional[DashboardSnapshot]:
+        """Bring a registered building's snapshot up to date (no-op once it is dropped)."""
+        if building_id not in self._last_requested:
+            return None
+        async with self._lock_for(building_id):
+            now = datetime.now(timezone.utc)
+            snapshot = self._snapshots.get(building_id)
+            if snapshot is None:
+                return await self._build_full(building_id, now)
+            if self._is_stale(snapshot, now):
+                return await self._refresh(snapshot, now)
+            return snapshot
+
+    def invalidate(self, building_id: Optional[str] = None) -> None:
+        """Drop cached snapshots so the next request rebuilds from a full fetch."""
+        if building_id is None:
+            self._snapshots.clear()
+        else:
+            self._snapshots.pop(building_id, None)
+
+    async def _load(
+        self,
+        building_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        use_cache: bool = True,
+        fallback: bool = True
+    ) -> Optional[pd.DataFrame]:
+        """Telemetry load stage; None when it exceeds ``load_timeout_seconds``."""
+        try:
+            return await asyncio.wait_for(
+                run_in_influx_executor(load_dashboard_frame, building_id, start_time, end_time, use_cache, fallback),
+                timeout=self.load_timeout_seconds,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️  Dashboard telemetry load for {building_id} timed out after {self.load_timeout_seconds:.1f}s")
+            return None
+
+    async def _build_full(
+        self,
+        building_id: str,
+        now: datetime,
+        context: Optional["asyncio.Future[DashboardContext]"] = None
+    ) -> DashboardSnapshot:
+        # Suggestions/building info do not need the window: run them during the load
+        context = context or asyncio.ensure_future(load_dashboard_context(building_id))
+        try:
+            start_time = now - timedelta(hours=self.window_hours)
+            df = await self._load(building_id, start_time, now)
+            incremental = df is not None and not df.empty
+            if not incremental:
+                df = await run_in_influx_executor(_load_fallback_frame, start_time, now)
+            if df.empty:
+                raise LookupError("No telemetry available for dashboard.")
+            logger.info(f"✅ Built dashboard window for {building_id}: {len(df)} records")
+            return await self._publish(building_id, df, now, incremental, context=context)
+        finally:
+            context.cancel()  # No-op once the payload consumed it
+
+    async def _refresh(self, snapshot: DashboardSnapshot, now: datetime) -> DashboardSnapshot:
+        building_id = snapshot.building_id
+        context = asyncio.ensure_future(load_dashboard_context(building_id))
+        try:
+            if not snapshot.incremental:
+                return await self._build_full(building_id, now, context)
+
+            # The bucket at the watermark may have been partial when last fetched
+            since = snapshot.watermark.to_pydatetime() - self._bucket
+            try:
+                # Stored rows only: synthetic rows would overwrite real ones and move the watermark
+                fresh = await self._load(building_id, since, now, use_cache=False, fallback=False)
+            except Exception as e:
+                logger.warning(f"⚠️  Dashboard refresh load for {building_id} failed: {e}")
+                fresh = None
+            if fresh is None:
+                # Keep serving the cached window, flagged as partial
+                return await self._publish(
+                    building_id, snapshot.frame, now, True, degraded=["telemetry"], context=context
+                )
+            frame = snapshot.frame
+            if not fresh.empty:
+                frame = pd.concat(
+                    [frame[frame["timestamp"] < fresh["timestamp"].iloc[0]], fresh],
+                    ignore_index=True,
+                )
+            frame = frame[frame["timestamp"] >= now - timedelta(hours=self.window_hours)].reset_index(drop=True)
+            if frame.empty:
+                return await self._build_full(building_id, now, context)
+            logger.info(f"🔄 Refreshed dashboard window for {building_id}: {len(fresh)} new/updated rows")
+            return await self._publish(building_id, frame, now, incremental=True, context=context)
+        finally:
+            context.cancel()
+
+    async def _publish(
+        self,
+        building_id: str,
+        frame: pd.DataFrame,
+        now: datetime,
+        incremental: bool,
+        degraded: Optional[List[str]] = None,
+        context: Optional[Awaitable[DashboardContext]] = None
+    ) -> DashboardSnapshot:
+        payload = await build_dashboard_payload(building_id, frame, now, degraded=degraded, context=context)
+        watermark = frame["timestamp"].iloc[-1]
+        snapshot = DashboardSnapshot(
+            building_id=building_id,
+            payload=payload,
+            frame=frame,
+            watermark=watermark,
+            actions_version=payload["actions_version"],
+            built_at=now,
+            incremental=incremental,
+            # Build time too: a rebuild without new data still changes the payload
+            etag=compute_etag("dashboard", building_id, watermark.isoformat(), payload["actions_version"], now.isoformat()),
+        )
+        if building_id in self._last_requested:  # Not evicted while this was building
+            self._snapshots[building_id] = snapshot
+        return snapshot
+
+    async def _run(self) -> None:
+        bucket_seconds = self.resolution_minutes * 60
+        while True:
+            now = datetime.now(timezone.utc).timestamp()
+            delay = bucket_seconds - (now % bucket_seconds) + self.settle_seconds
+            await asyncio.sleep(delay)
+            for building_id in self.buildings():
+                try:
+                    await self.refresh(building_id)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"❌ Dashboard refresh failed for {building_id}: {e}", exc_info=True)
+
+    def start(self) -> None:
+        """Start the background refresh task on the running event loop."""
+        if not settings.dashboard_background_refresh:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info("Dashboard snapshot refresher started")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+dashboard_snapshots = DashboardSnapshotService(
+    window_hours=settings.dashboard_window_hours,
+    resolution_minutes=15,
+    settle_seconds=settings.dashboard_refresh_settle_seconds,
+    load_timeout_seconds=settings.dashboard_load_timeout_seconds,
+    partial_retry_seconds=settings.dashboard_partial_retry_seconds,
+    max_buildings=settings.dashboard_max_buildings,
+    idle_seconds=settings.dashboard_idle_minutes * 60.0,
+)
@@ -0,0 +1,212 @@
+"""
+Background forecast precomputation.
+
+Forecasts are cached per hour bucket (see ``forecasting_service``), so the
+first request after each hour boundary pays for the history queries and the
+model rollout. This service does that work ahead of the requests: shortly
+after every boundary it recomputes energy and occupancy forecasts for all
+known buildings and leaves them in the forecast cache for ``/forecast/*``.
+
+Known buildings are the configured ``forecast_precompute_buildings``, every
+building with a dashboard snapshot, and buildings requested from the
+forecast routes within the last ``forecast_precompute_idle_hours`` (at most
+``forecast_precompute_max_tracked`` of them, least recently requested
+dropped first). Only a fixed set of horizons is precomputed; other horizons
+are computed on request and cached as usual.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from core.services.dashboard_service import dashboard_snapshots
+from core.services.forecasting_service import forecast_energy_batch, forecast_occupancy
+from core.services.influxdb_service import run_in_influx_executor
+from core.utils.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class ForecastPrecomputeService:
+    """
+    Refreshes cached forecasts after each hour boundary.
+
+    Each run starts ``settle_seconds`` after the boundary plus a random delay
+    of up to ``jitter_seconds``, so several workers do not hit Influx at the
+    same instant. Energy forecasts go through ``forecast_energy_batch`` in
+    chunks of ``batch_size`` buildings per horizon; occupancy has no batched
+    path and runs per building. At most ``max_concurrency`` chunks/buildings
+    are in flight at once. A run never plans more forecasts than the forecast
+    cache holds, so it cannot evict its own results.
+    """
+
+    def __init__(
+        self,
+        buildings: Optional[List[str]] = None,
+        energy_horizons: Optional[List[int]] = None,
+        occupancy_horizons: Optional[List[int]] = None,
+        settle_seconds: float = 10.0,
+        jitter_seconds: float = 60.0,
+        max_concurrency: int = 2,
+        batch_size: int = 100,
+        max_tracked: int = 1000,
+        idle_seconds: float = 24 * 3600.0,
+        cache_capacity: int = 1024,
+    ) -> None:
+        self.static_buildings = list(buildings or [])
+        self.energy_horizons = sorted(set(energy_horizons or [24]))
+        self.occupancy_horizons = sorted(set(occupancy_horizons or [12]))
+        self.settle_seconds = settle_seconds
+        self.jitter_seconds = jitter_seconds
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.max_tracked = max_tracked
+        self.idle_seconds = idle_seconds
+        self.cache_capacity = cache_capacity
+
+        # building_id -> last request (monotonic), least recent first; only touched from the event loop
+        self._tracked: "OrderedDict[str, float]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self._last_run: Optional[Dict[str, Any]] = None
+
+    def track(self, building_id: str) -> None:
+        """Keep a requested building's forecasts warm while it keeps being requested."""
+        self._tracked[building_id] = time.monotonic()
+        self._tracked.move_to_end(building_id)
+        while len(self._tracked) > self.max_tracked:
+            self._tracked.popitem(last=False)
+
+    def _expire_tracked(self) -> None:
+        cutoff = time.monotonic() - self.idle_seconds
+        while self._tracked and next(iter(self._tracked.values())) < cutoff:
+            self._tracked.popitem(last=False)
+
+    def buildings(self) -> List[str]:
+        """Known buildings, most important first: configured, dashboards, then most recently requested."""
+        self._expire_tracked()
+        known = self.static_buildings + dashboard_snapshots.buildings() + list(reversed(self._tracked))
+        return list(dict.fromkeys(known))
+
+    def _plan(self) -> List[str]:
+        """Buildings for this run, limited so every planned forecast fits in the cache."""
+        per_building = len(self.energy_horizons) + len(self.occupancy_horizons)
+        buildings = self.buildings()
+        limit = max(self.cache_capacity // max(per_building, 1), 0)
+        if len(buildings) > limit:
+            logger.warning(
+                f"⚠️ {len(buildings)} buildings known but the forecast cache fits {limit}; "
+                f"precomputing the first {limit} (raise FORECAST_CACHE_MAX_ENTRIES)"
+            )
+            buildings = buildings[:limit]
+        return buildings
+
+    async def precompute(self) -> Dict[str, Any]:
+        """Compute (or confirm cached) forecasts for all known buildings; returns a run summary."""
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        buildings = self._plan()
+        planned = len(buildings) * (len(self.energy_horizons) + len(self.occupancy_horizons))
+
+        async def energy_chunk(building_ids: List[str], horizon: int) -> int:
+            async with semaphore:
+                results = await run_in_influx_executor(forecast_energy_batch, building_ids, horizon)
+            return sum(1 for r in results.values() if r.get("model_available"))
+
+        async def occupancy_one(building_id: str, horizon: int) -> int:
+            async with semaphore:
+                result = await run_in_influx_executor(forecast_occupancy, building_id, horizon)
+            return int(bool(result.get("model_available")))
+
+        jobs = [
+            energy_chunk(buildings[i:i + self.batch_size], horizon)
+            for horizon in self.energy_horizons
+            for i in range(0, len(buildings), self.batch_size)
+        ]
+        jobs += [
+            occupancy_one(building_id, horizon)
+            for horizon in self.occupancy_horizons
+            for building_id in buildings
+        ]
+
+        outcomes = await asyncio.gather(*jobs, return_exceptions=True)
+        failures = [o for o in outcomes if isinstance(o, BaseException)]
+        for error in failures:
+            logger.error(f"❌ Forecast precompute job failed: {error}")
+
+        self._last_run = {
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "seconds": round(time.perf_counter() - start, 3),
+            "buildings": len(buildings),
+            "forecasts": planned,
+            "model_forecasts": sum(o for o in outcomes if not isinstance(o, BaseException)),
+            "failed_jobs": len(failures),
+        }
+        return self._last_run
+
+    def _seconds_until_next_run(self) -> float:
+        now = time.time()
+        return 3600 - (now % 3600) + self.settle_seconds + random.uniform(0.0, self.jitter_seconds)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._seconds_until_next_run())
+            if not self.buildings():
+                continue
+            try:
+                summary = await self.precompute()
+                logger.info(
+                    f"🔮 Precomputed {summary['forecasts']} forecasts for "
+                    f"{summary['buildings']} buildings in {summary['seconds']:.1f}s"
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Forecast precompute failed: {e}", exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "buildings": len(self.buildings()),
+            "tracked": len(self._tracked),
+            "last_run": self._last_run,
+        }
+
+    def start(self) -> None:
+        """Start the hourly precompute task on the running event loop."""
+        if not settings.forecast_precompute_enabled:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info("Forecast precompute scheduler started")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+forecast_precompute = ForecastPrecomputeService(
+    buildings=settings.forecast_precompute_buildings,
+    energy_horizons=settings.forecast_precompute_energy_horizons,
+    occupancy_horizons=settings.forecast_precompute_occupancy_horizons,
+    settle_seconds=settings.forecast_precompute_settle_seconds,
+    jitter_seconds=settings.forecast_precompute_jitter_seconds,
+    max_concurrency=settings.forecast_precompute_concurrency,
+    batch_size=settings.forecast_precompute_batch_size,
+    max_tracked=settings.forecast_precompute_max_tracked,
+    idle_seconds=settings.forecast_precompute_idle_hours * 3600.0,
+    cache_capacity=settings.forecast_cache_max_entries,
+)
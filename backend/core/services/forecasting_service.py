@@ -5,28 +5,29 @@ Uses trained LSTM models to generate forecasts.
 
 from __future__ import annotations
 
-from functools import lru_cache
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 import numpy as np
 import pandas as pd
-import joblib
-from sklearn.preprocessing import MinMaxScaler
 
-try:
-    from tensorflow import keras
-except ImportError:
-    keras = None
-
-from core.utils.model_loader import get_model_path
+from core.utils.cache import TTLCache
+from core.utils.config import get_settings
+from core.utils.model_loader import load_joblib_artifact, load_keras_model, load_numpy_export
+from core.utils.numpy_inference import LSTMNetwork
+from core.utils.serialization import isoformat_column, records
 from core.services.timeseries_service import timeseries_service
 from core.services.action_state_service import action_state_service
 
 
+settings = get_settings()
+
 # Forecasting parameters (must match training script)
 SEQUENCE_LENGTH = 24  # Use 24 hours of history for energy
 FORECAST_HORIZON = 24  # Predict next 24 hours for energy
 ENERGY_FEATURES = ["energy", "temperature", "humidity"]
+ENERGY_CONFIDENCE_RATIO = 0.10  # ±10% band over the model's first output block
 
 # Occupancy prediction parameters
 OCCUPANCY_SEQUENCE_LENGTH = 12  # Use 12 hours of history
@@ -34,6 +35,29 @@ OCCUPANCY_FORECAST_HORIZON = 12  # Predict next 12 hours
 OCCUPANCY_FEATURES = ["occupancy", "hour_sin", "hour_cos", "dow_sin", "dow_cos", "energy"]
 
 
+# Forecasts are recomputed once per hour bucket; entries for past hours are
+# never looked up again and age out via the TTL / LRU bound.
+_forecast_cache: TTLCache[Dict[str, Any]] = TTLCache(
+    maxsize=settings.forecast_cache_max_entries,
+    ttl_seconds=3600,
+    name="forecasts",
+)
+
+
+def current_hour_bucket() -> datetime:
+    """Start of the current UTC hour (naive, like the forecast timestamps)."""
+    return datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+
+
+def _is_model_forecast(result: Dict[str, Any]) -> bool:
+    # Synthetic fallbacks are cheap and should not pin a transient failure for an hour
+    return bool(result.get("model_available"))
+
+
+def forecast_cache_stats() -> Dict[str, Any]:
+    return _forecast_cache.stats()
+
+
 def _apply_action_effects_to_energy_forecast(
     building_id: str,
     forecast_points: list[dict[str, Any]],
@@ -68,53 +92,58 @@ def _apply_action_effects_to_energy_forecast(
     return adjusted
 
 
+def _load_lstm(name: str) -> Optional[Any]:
+    # Both expose input_shape and predict(x, verbose=0)
+    network = load_numpy_export(LSTMNetwork.load, "forecasting", name)
+    if network is not None:
+        return network
+    
+    return load_keras_model("forecasting", f"{name}.h5")
+
+
 @lru_cache(maxsize=1)
 def _load_energy_model() -> Optional[Any]:
     """
     Lazily load the trained energy forecasting LSTM model.
     
-    Returns None if model cannot be loaded.
+    Prefers the NumPy export (lstm_energy.npz, written by
+    scripts/export_numpy_models.py) and falls back to the Keras H5 model, the
+    only path that imports TensorFlow. Returns None if neither loads.
     """
-    if keras is None:
-        return None
-    
-    model_path = get_model_path("forecasting", "lstm_energy.h5")
-    try:
-        return keras.models.load_model(model_path)
-    except Exception:
-        # In production, log this error with details
-        return None
+    return _load_lstm("lstm_energy")
 
 
 @lru_cache(maxsize=1)
-def _load_energy_scaler() -> Optional[MinMaxScaler]:
+def _load_energy_scaler() -> Optional[Any]:
     """Load the scaler used during energy model training."""
-    scaler_path = get_model_path("forecasting", "lstm_energy_scaler.pkl")
-    try:
-        return joblib.load(scaler_path)
-    except Exception:
-        return None
+    return load_joblib_artifact("forecasting", "lstm_energy_scaler.pkl")
 
 
 def _prepare_historical_data(
     building_id: str,
-    hours: int = SEQUENCE_LENGTH
+    hours: int = SEQUENCE_LENGTH,
+    end_time: Optional[datetime] = None
 ) -> Optional[pd.DataFrame]:
     """
     Fetch and prepare historical data for forecasting.
     
+    The window ends at ``end_time`` (default: the current hour bucket), so
+    the in-progress hour never becomes the model's last input row.
+    
     Args:
         building_id: Building identifier
         hours: Number of hours of history to fetch
+        end_time: End of the window; should be on an hour boundary
     
     Returns:
-        DataFrame with required features, or None if unavailable
+        Timestamp-indexed DataFrame with required features, or None if unavailable
     """
-    end_time = datetime.utcnow()
+    end_time = end_time or current_hour_bucket()
     start_time = end_time - timedelta(hours=hours)
     
     try:
-        df = timeseries_service.get_metrics(
+        # One row per hour, zones averaged server-side
+        df = timeseries_service.get_metrics_wide(
             building_id=building_id,
             zone_id=None,
             metrics=ENERGY_FEATURES,
@@ -126,19 +155,11 @@ def _prepare_historical_data(
         if df.empty:
             return None
         
-        # Pivot to get metrics as columns
-        if "metric" in df.columns:
-            df = df.pivot_table(
-                index="timestamp",
-                columns="metric",
-                values="value",
-                aggfunc="mean"
-            ).reset_index()
-        
         # Ensure we have all required features
         for feature in ENERGY_FEATURES:
             if feature not in df.columns:
                 return None
+        df = df.dropna(subset=ENERGY_FEATURES)
         
         # Sort by timestamp and take last SEQUENCE_LENGTH rows
         df = df.sort_values("timestamp").tail(SEQUENCE_LENGTH)
@@ -146,19 +167,23 @@ def _prepare_historical_data(
         if len(df) < SEQUENCE_LENGTH:
             return None
         
-        return df[ENERGY_FEATURES]
+        return df.set_index("timestamp")[ENERGY_FEATURES]
     
     except Exception:
         return None
 
 
-def _generate_synthetic_history(hours: int = SEQUENCE_LENGTH) -> pd.DataFrame:
+def _generate_synthetic_history(
+    hours: int = SEQUENCE_LENGTH,
+    end_time: Optional[datetime] = None
+) -> pd.DataFrame:
     """
     Generate synthetic historical data as fallback.
     Creates realistic patterns for energy, temperature, and humidity.
+    The last row is at ``end_time`` (default: the current hour bucket).
     """
     timestamps = pd.date_range(
-        end=datetime.utcnow(),
+        end=end_time or current_hour_bucket(),
         periods=hours,
         freq="1H"
     )
@@ -187,16 +212,146 @@ def _generate_synthetic_history(hours: int = SEQUENCE_LENGTH) -> pd.DataFrame:
     }, index=timestamps)
 
 
+def _hour_of_day(timestamps: pd.DatetimeIndex) -> np.ndarray:
+    return np.asarray(timestamps.hour + timestamps.minute / 60.0, dtype=np.float64)
+
+
+def _daily_design(hours: np.ndarray) -> np.ndarray:
+    angle = 2 * np.pi * hours / 24.0
+    return np.stack([np.ones_like(angle), np.sin(angle), np.cos(angle)], axis=-1)
+
+
+def _project_daily_cycle(
+    history: np.ndarray,
+    history_hours: np.ndarray,
+    future_hours: np.ndarray
+) -> np.ndarray:
+    """
+    Project exogenous series forward with a first-harmonic daily cycle.
+
+    Fits ``a + b*sin(2*pi*h/24) + c*cos(2*pi*h/24)`` per building and series
+    by least squares on the history window and evaluates it at the future
+    hours of day. Cheap, and far better than holding the last value flat for
+    multi-day horizons.
+
+    Args:
+        history: (N, T, K) series to project
+        history_hours: (N, T) fractional hour of day of each history row
+        future_hours: (N, F) fractional hour of day of each future row
+
+    Returns:
+        (N, F, K) projected values
+    """
+    X = _daily_design(history_hours)  # (N, T, 3)
+    gram = np.einsum("ntp,ntq->npq", X, X) + 1e-6 * np.eye(3)  # ridge keeps short windows solvable
+    coef = np.linalg.solve(gram, np.einsum("ntp,ntk->npk", X, history))  # (N, 3, K)
+    return np.einsum("nfp,npk->nfk", _daily_design(future_hours), coef)
+
+
+def _rollout_energy_forecast(
+    model: Any,
+    history_scaled: np.ndarray,
+    exog_future_scaled: np.ndarray,
+    horizon: int,
+    energy_floor_scaled: float = -np.inf
+) -> np.ndarray:
+    """
+    Recursive multi-step energy forecast beyond the model's output length.
+
+    Each ``model.predict`` call yields a block of up to FORECAST_HORIZON
+    hours for every building at once; the block's energy, paired with the
+    projected temperature/humidity for those hours, is appended to the input
+    window, which slides forward for the next call. A 168h horizon therefore
+    takes 7 calls, not 168. Predictions are clipped at ``energy_floor_scaled``
+    (0 kWh) before they are fed back, so a negative block cannot drag the
+    following ones further down.
+
+    Args:
+        model: Energy LSTM, input (N, SEQUENCE_LENGTH, 3)
+        history_scaled: (N, SEQUENCE_LENGTH, 3) scaled history
+        exog_future_scaled: (N, horizon, 2) scaled temperature/humidity projection
+        horizon: Hours to forecast
+        energy_floor_scaled: Scaled value of 0 kWh
+
+    Returns:
+        (N, horizon) scaled energy forecast
+    """
+    window = history_scaled
+    blocks = []
+    produced = 0
+    while produced < horizon:
+        predicted = np.asarray(model.predict(window, verbose=0))
+        step = min(predicted.shape[1], horizon - produced)
+        block = np.maximum(predicted[:, :step], energy_floor_scaled)
+        blocks.append(block)
+
+        new_rows = np.concatenate(
+            [block[:, :, None], exog_future_scaled[:, produced:produced + step]], axis=2
+        )
+        window = np.concatenate([window, new_rows], axis=1)[:, -SEQUENCE_LENGTH:]
+        produced += step
+    return np.concatenate(blocks, axis=1)
+
+
+def _energy_confidence_ratios(horizon: int) -> np.ndarray:
+    """
+    Relative half-width of the confidence band for each forecast hour.
+
+    ±10% over the first model block; every fed-back block compounds the
+    error, so the band grows with the square root of the block count.
+    """
+    blocks = np.arange(horizon) // FORECAST_HORIZON + 1
+    return np.minimum(ENERGY_CONFIDENCE_RATIO * np.sqrt(blocks), 1.0)
+
+
 def forecast_energy_consumption(
     building_id: str,
-    horizon_hours: int = FORECAST_HORIZON
+    horizon_hours: int = FORECAST_HORIZON,
+    use_cache: bool = True
 ) -> Dict[str, Any]:
     """
     Forecast energy consumption for the next N hours.
     
+    Model inputs are hourly, so results are cached per (building, horizon,
+    current hour bucket, actions version): repeated polls within the hour are
+    a cache lookup, and a new hour or an applied/dismissed action recomputes.
+    Treat the returned dict as read-only.
+    
     Args:
         building_id: Building identifier
         horizon_hours: Number of hours to forecast (default: 24)
+        use_cache: Set False to bypass the forecast cache
+    
+    Returns:
+        Dictionary with:
+        - forecast: List of forecasted values with timestamps
+        - confidence: Optional confidence intervals
+        - model_available: Boolean indicating if model was used
+    """
+    hour_bucket = current_hour_bucket()
+    if not use_cache:
+        return _compute_energy_forecast(building_id, horizon_hours, hour_bucket)
+    
+    key = ("energy", building_id, horizon_hours, hour_bucket, action_state_service.get_version(building_id))
+    return _forecast_cache.get_or_compute(
+        key,
+        lambda: _compute_energy_forecast(building_id, horizon_hours, hour_bucket),
+        should_cache=_is_model_forecast,
+    )
+
+
+def _compute_energy_forecast(
+    building_id: str,
+    horizon_hours: int,
+    start_time: datetime
+) -> Dict[str, Any]:
+    """
+    Run the energy model for one building (uncached).
+    
+    Args:
+        building_id: Building identifier
+        horizon_hours: Number of hours to forecast
+        start_time: Timestamp of the first forecast point
     
     Returns:
         Dictionary with:
@@ -204,90 +359,200 @@ def forecast_energy_consumption(
         - confidence: Optional confidence intervals
         - model_available: Boolean indicating if model was used
     """
+    history = _prepare_historical_data(building_id, SEQUENCE_LENGTH, end_time=start_time)
+    return _compute_energy_forecasts(
+        [building_id], horizon_hours, start_time, {building_id: history}
+    )[building_id]
+
+
+def _energy_reduction_ratios(building_ids: List[str], forecast_energy: np.ndarray) -> np.ndarray:
+    """
+    Per-building action reduction, as ``_apply_action_effects_to_energy_forecast``.
+
+    Args:
+        building_ids: N building identifiers
+        forecast_energy: (N, H) unadjusted forecast
+
+    Returns:
+        (N,) ratio to scale each building's forecast by ``1 - ratio``
+    """
+    savings = np.array([
+        sum(a.get("estimated_savings_kwh", 0.0) for a in action_state_service.get_applied_actions(b))
+        for b in building_ids
+    ], dtype=np.float64)
+    totals = forecast_energy.sum(axis=1)
+    valid = (totals > 0.0) & (savings > 0.0)
+    ratios = np.zeros(len(building_ids))
+    ratios[valid] = np.minimum(0.30, savings[valid] / totals[valid])
+    return ratios
+
+
+def _compute_energy_forecasts(
+    building_ids: List[str],
+    horizon_hours: int,
+    start_time: datetime,
+    histories: Dict[str, Optional[pd.DataFrame]]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run the energy model for many buildings with one batched rollout (uncached).
+    
+    Histories are stacked into an (N, SEQUENCE_LENGTH, 3) tensor, so every
+    ``model.predict`` call covers all buildings; buildings without usable
+    history get a synthetic one, as in the single-building path.
+    
+    Args:
+        building_ids: Building identifiers (unique)
+        horizon_hours: Number of hours to forecast
+        start_time: Timestamp of the first forecast point
+        histories: Output of ``_prepare_historical_data`` per building
+    
+    Returns:
+        Forecast dict per building, shaped like ``forecast_energy_consumption``
+    """
+    if not building_ids:
+        return {}
+    
     # Load model and scaler
     model = _load_energy_model()
     scaler = _load_energy_scaler()
     
     if model is None or scaler is None:
-        # Fallback: generate synthetic forecast
-        result = _generate_synthetic_forecast(building_id, horizon_hours)
-        result["forecast"] = _apply_action_effects_to_energy_forecast(building_id, result.get("forecast", []))
-        return result
+        return {b: _synthetic_energy_forecast(b, horizon_hours, start_time) for b in building_ids}
     
-    # Get historical data
-    historical_df = _prepare_historical_data(building_id, SEQUENCE_LENGTH)
+    frames = []
+    for building_id in building_ids:
+        historical_df = histories.get(building_id)
+        if historical_df is None or len(historical_df) < SEQUENCE_LENGTH:
+            # Fallback to synthetic data
+            historical_df = _generate_synthetic_history(SEQUENCE_LENGTH, start_time)
+        frames.append(historical_df)
     
-    if historical_df is None or len(historical_df) < SEQUENCE_LENGTH:
-        # Fallback to synthetic data
-        historical_df = _generate_synthetic_history(SEQUENCE_LENGTH)
+    n_features = len(ENERGY_FEATURES)
+    historical_values = np.stack([df[ENERGY_FEATURES].to_numpy(dtype=np.float64) for df in frames])
     
-    # Prepare input sequence
-    historical_values = historical_df[ENERGY_FEATURES].values
-    
-    # Scale the data
-    historical_scaled = scaler.transform(historical_values)
-    
-    # Reshape for LSTM: (1, sequence_length, n_features)
-    input_sequence = historical_scaled.reshape(1, SEQUENCE_LENGTH, len(ENERGY_FEATURES))
+    # Scale all buildings at once, then reshape for LSTM: (N, sequence_length, n_features)
+    input_sequences = scaler.transform(
+        historical_values.reshape(-1, n_features)
+    ).reshape(len(building_ids), SEQUENCE_LENGTH, n_features)
     
     # Generate forecast
     try:
-        forecast_scaled = model.predict(input_sequence, verbose=0)
-        
-        # The model predicts energy for FORECAST_HORIZON hours (24 by default)
-        # We may need to truncate or extend based on requested horizon_hours
-        predicted_hours = min(horizon_hours, len(forecast_scaled[0]))
-        forecast_energy_scaled = forecast_scaled[0, :predicted_hours]
-        
-        # Get the last known scaled values for temperature and humidity
-        # We'll use these for inverse transform (scaler needs all features)
-        last_scaled = historical_scaled[-1:]
+        forecast_timestamps = pd.date_range(
+            start=start_time,
+            periods=horizon_hours,
+            freq="1h"
+        )
         
-        # Create array for inverse transform
-        # Use forecasted energy, and repeat last known temp/humidity for each hour
-        forecast_array = np.zeros((predicted_hours, len(ENERGY_FEATURES)))
-        forecast_array[:, 0] = forecast_energy_scaled  # Energy forecast
-        forecast_array[:, 1] = last_scaled[0, 1]  # Use last known temperature (constant)
-        forecast_array[:, 2] = last_scaled[0, 2]  # Use last known humidity (constant)
+        # Temperature/humidity for the forecast hours, from each history's daily cycle
+        history_hours = np.stack([_hour_of_day(pd.DatetimeIndex(df.index)) for df in frames])
+        future_hours = np.broadcast_to(_hour_of_day(forecast_timestamps), (len(building_ids), horizon_hours))
+        exog_future_scaled = _project_daily_cycle(input_sequences[:, :, 1:], history_hours, future_hours)
         
-        # Inverse transform to get actual energy values
-        forecast_actual = scaler.inverse_transform(forecast_array)
-        energy_forecast = forecast_actual[:, 0]
+        # Beyond the model's 24 outputs, predictions are fed back as input
+        energy_floor_scaled = float(scaler.transform(np.zeros((1, n_features)))[0, 0])
+        forecast_energy_scaled = _rollout_energy_forecast(
+            model, input_sequences, exog_future_scaled, horizon_hours, energy_floor_scaled
+        )
         
-        actual_horizon = predicted_hours
+        # Inverse transform (the scaler needs all features)
+        forecast_array = np.concatenate([forecast_energy_scaled[:, :, None], exog_future_scaled], axis=2)
+        energy_forecast = scaler.inverse_transform(
+            forecast_array.reshape(-1, n_features)
+        )[:, 0].reshape(len(building_ids), horizon_hours)
         
-        # Generate timestamps for forecast
-        start_time = datetime.utcnow()
-        forecast_timestamps = pd.date_range(
-            start=start_time,
-            periods=actual_horizon,
-            freq="1H"
-        )
+        energy_forecast = np.maximum(energy_forecast, 0.0)
+        energy_forecast = energy_forecast * (1.0 - _energy_reduction_ratios(building_ids, energy_forecast))[:, None]
         
         # Create forecast points
-        forecast_points = [
-            {
-                "timestamp": ts.isoformat(),
-                "energy_kwh": float(value),
-                "confidence_lower": float(value * 0.9),  # Simple confidence estimate
-                "confidence_upper": float(value * 1.1),
+        timestamps = isoformat_column(forecast_timestamps)
+        band = _energy_confidence_ratios(horizon_hours)
+        results = {}
+        for building_id, values in zip(building_ids, energy_forecast):
+            results[building_id] = {
+                "forecast": records({
+                    "timestamp": timestamps,
+                    "energy_kwh": values.tolist(),
+                    "confidence_lower": (values * (1.0 - band)).tolist(),
+                    "confidence_upper": (values * (1.0 + band)).tolist(),
+                }),
+                "model_available": True,
+                "horizon_hours": horizon_hours,
             }
-            for ts, value in zip(forecast_timestamps, energy_forecast)
-        ]
-
-        forecast_points = _apply_action_effects_to_energy_forecast(building_id, forecast_points)
-        
-        return {
-            "forecast": forecast_points,
-            "model_available": True,
-            "horizon_hours": horizon_hours,
-        }
+        return results
     
-    except Exception as e:
+    except Exception:
         # Fallback on any error
-        result = _generate_synthetic_forecast(building_id, horizon_hours)
-        result["forecast"] = _apply_action_effects_to_energy_forecast(building_id, result.get("forecast", []))
-        return result
+        return {b: _synthetic_energy_forecast(b, horizon_hours, start_time) for b in building_ids}
+
+
+def _synthetic_energy_forecast(building_id: str, horizon_hours: int, start_time: datetime) -> Dict[str, Any]:
+    result = _generate_synthetic_forecast(building_id, horizon_hours, start_time)
+    result["forecast"] = _apply_action_effects_to_energy_forecast(building_id, result.get("forecast", []))
+    return result
+
+
+def _fetch_energy_histories(
+    building_ids: List[str],
+    end_time: datetime
+) -> Dict[str, Optional[pd.DataFrame]]:
+    fetch = partial(_prepare_historical_data, hours=SEQUENCE_LENGTH, end_time=end_time)
+    if len(building_ids) <= 1:
+        return {b: fetch(b) for b in building_ids}
+    workers = min(settings.forecast_batch_fetch_workers, len(building_ids))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="forecast-history") as pool:
+        return dict(zip(building_ids, pool.map(fetch, building_ids)))
+
+
+def forecast_energy_batch(
+    building_ids: List[str],
+    horizon_hours: int = FORECAST_HORIZON,
+    use_cache: bool = True
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Forecast energy consumption for many buildings at once.
+    
+    Shares the cache with ``forecast_energy_consumption``: cached buildings
+    are served as-is, buildings already being computed by another request are
+    waited for, and the rest have their histories fetched concurrently and go
+    through one batched model rollout, so the Keras call overhead is paid once
+    per 24h block rather than once per building.
+    
+    Args:
+        building_ids: Building identifiers (duplicates are ignored)
+        horizon_hours: Number of hours to forecast (default: 24)
+        use_cache: Set False to bypass the forecast cache
+    
+    Returns:
+        Forecast dict per building, in request order
+    """
+    building_ids = list(dict.fromkeys(building_ids))
+    hour_bucket = current_hour_bucket()
+    
+    def compute(missing: List[str]) -> Dict[str, Dict[str, Any]]:
+        return _compute_energy_forecasts(
+            missing, horizon_hours, hour_bucket, _fetch_energy_histories(missing, hour_bucket)
+        )
+    
+    if not use_cache:
+        return compute(building_ids)
+    
+    keys = {
+        building_id: (
+            "energy", building_id, horizon_hours, hour_bucket,
+            action_state_service.get_version(building_id),
+        )
+        for building_id in building_ids
+    }
+    buildings = {key: building_id for building_id, key in keys.items()}
+    
+    def compute_keys(missing_keys: List[tuple]) -> Dict[tuple, Dict[str, Any]]:
+        computed = compute([buildings[key] for key in missing_keys])
+        return {keys[building_id]: result for building_id, result in computed.items()}
+    
+    results = _forecast_cache.get_or_compute_many(
+        list(keys.values()), compute_keys, should_cache=_is_model_forecast
+    )
+    return {b: results[keys[b]] for b in building_ids}
 
 
 @lru_cache(maxsize=1)
@@ -295,49 +560,42 @@ def _load_occupancy_model() -> Optional[Any]:
     """
     Lazily load the trained occupancy prediction LSTM model.
     
-    Returns None if model cannot be loaded.
+    NumPy export first, Keras H5 fallback, like ``_load_energy_model``.
+    Returns None if neither loads.
     """
-    if keras is None:
-        return None
-    
-    model_path = get_model_path("forecasting", "lstm_occupancy.h5")
-    try:
-        return keras.models.load_model(model_path)
-    except Exception:
-        # In production, log this error with details
-        return None
+    return _load_lstm("lstm_occupancy")
 
 
 @lru_cache(maxsize=1)
-def _load_occupancy_scaler() -> Optional[MinMaxScaler]:
+def _load_occupancy_scaler() -> Optional[Any]:
     """Load the scaler used during occupancy model training."""
-    scaler_path = get_model_path("forecasting", "lstm_occupancy_scaler.pkl")
-    try:
-        return joblib.load(scaler_path)
-    except Exception:
-        return None
+    return load_joblib_artifact("forecasting", "lstm_occupancy_scaler.pkl")
 
 
 def _prepare_occupancy_historical_data(
     building_id: str,
-    hours: int = OCCUPANCY_SEQUENCE_LENGTH
+    hours: int = OCCUPANCY_SEQUENCE_LENGTH,
+    end_time: Optional[datetime] = None
 ) -> Optional[pd.DataFrame]:
     """
     Fetch and prepare historical data for occupancy prediction.
     Includes time features (hour, dayofweek) encoded cyclically.
+    Like ``_prepare_historical_data``, the window ends at the last complete hour.
     
     Args:
         building_id: Building identifier
         hours: Number of hours of history to fetch
+        end_time: End of the window (default: the current hour bucket)
     
     Returns:
         DataFrame with required features including time features, or None if unavailable
     """
-    end_time = datetime.utcnow()
+    end_time = end_time or current_hour_bucket()
     start_time = end_time - timedelta(hours=hours)
     
     try:
-        df = timeseries_service.get_metrics(
+        # One row per hour, zones averaged server-side
+        df = timeseries_service.get_metrics_wide(
             building_id=building_id,
             zone_id=None,
             metrics=["occupancy", "energy"],
@@ -349,18 +607,10 @@ def _prepare_occupancy_historical_data(
         if df.empty:
             return None
         
-        # Pivot to get metrics as columns
-        if "metric" in df.columns:
-            df = df.pivot_table(
-                index="timestamp",
-                columns="metric",
-                values="value",
-                aggfunc="mean"
-            ).reset_index()
-        
         # Ensure we have required features
         if "occupancy" not in df.columns or "energy" not in df.columns:
             return None
+        df = df.dropna(subset=["occupancy", "energy"])
         
         # Sort by timestamp and take last OCCUPANCY_SEQUENCE_LENGTH rows
         df = df.sort_values("timestamp").tail(OCCUPANCY_SEQUENCE_LENGTH)
@@ -385,12 +635,16 @@ def _prepare_occupancy_historical_data(
         return None
 
 
-def _generate_synthetic_occupancy_history(hours: int = OCCUPANCY_SEQUENCE_LENGTH) -> pd.DataFrame:
+def _generate_synthetic_occupancy_history(
+    hours: int = OCCUPANCY_SEQUENCE_LENGTH,
+    end_time: Optional[datetime] = None
+) -> pd.DataFrame:
     """
     Generate synthetic historical occupancy data with time features as fallback.
+    The last row is at ``end_time`` (default: the current hour bucket).
     """
     timestamps = pd.date_range(
-        end=datetime.utcnow(),
+        end=end_time or current_hour_bucket(),
         periods=hours,
         freq="1H"
     )
@@ -428,14 +682,20 @@ def _generate_synthetic_occupancy_history(hours: int = OCCUPANCY_SEQUENCE_LENGTH
 
 def forecast_occupancy(
     building_id: str,
-    horizon_hours: int = OCCUPANCY_FORECAST_HORIZON
+    horizon_hours: int = OCCUPANCY_FORECAST_HORIZON,
+    use_cache: bool = True
 ) -> Dict[str, Any]:
     """
     Forecast occupancy for the next N hours.
     
+    Cached per (building, horizon, current hour bucket) like
+    ``forecast_energy_consumption``; actions do not affect occupancy. Treat
+    the returned dict as read-only.
+    
     Args:
         building_id: Building identifier
         horizon_hours: Number of hours to forecast (default: 12, max: 12)
+        use_cache: Set False to bypass the forecast cache
     
     Returns:
         Dictionary with:
@@ -445,21 +705,39 @@ def forecast_occupancy(
     """
     # Limit horizon to model's training horizon
     horizon_hours = min(horizon_hours, OCCUPANCY_FORECAST_HORIZON)
-    
+    hour_bucket = current_hour_bucket()
+    if not use_cache:
+        return _compute_occupancy_forecast(building_id, horizon_hours, hour_bucket)
+    
+    return _forecast_cache.get_or_compute(
+        ("occupancy", building_id, horizon_hours, hour_bucket),
+        lambda: _compute_occupancy_forecast(building_id, horizon_hours, hour_bucket),
+        should_cache=_is_model_forecast,
+    )
+
+
+def _compute_occupancy_forecast(
+    building_id: str,
+    horizon_hours: int,
+    start_time: datetime
+) -> Dict[str, Any]:
+    """Run the occupancy model (uncached); the first forecast point is at ``start_time``."""
     # Load model and scaler
     model = _load_occupancy_model()
     scaler = _load_occupancy_scaler()
     
     if model is None or scaler is None:
         # Fallback: generate synthetic forecast
-        return _generate_synthetic_occupancy_forecast(building_id, horizon_hours)
+        return _generate_synthetic_occupancy_forecast(building_id, horizon_hours, start_time)
     
     # Get historical data
-    historical_df = _prepare_occupancy_historical_data(building_id, OCCUPANCY_SEQUENCE_LENGTH)
+    historical_df = _prepare_occupancy_historical_data(
+        building_id, OCCUPANCY_SEQUENCE_LENGTH, end_time=start_time
+    )
     
     if historical_df is None or len(historical_df) < OCCUPANCY_SEQUENCE_LENGTH:
         # Fallback to synthetic data
-        historical_df = _generate_synthetic_occupancy_history(OCCUPANCY_SEQUENCE_LENGTH)
+        historical_df = _generate_synthetic_occupancy_history(OCCUPANCY_SEQUENCE_LENGTH, start_time)
     
     # Prepare input sequence
     historical_values = historical_df[OCCUPANCY_FEATURES].values
@@ -493,7 +771,6 @@ def forecast_occupancy(
         forecast_array[:, 5] = last_scaled[0, 5]  # energy (use last known)
         
         # Update time features for future timestamps
-        start_time = datetime.utcnow()
         future_timestamps = pd.date_range(
             start=start_time,
             periods=predicted_hours,
@@ -536,17 +813,20 @@ def forecast_occupancy(
     
     except Exception as e:
         # Fallback on any error
-        return _generate_synthetic_occupancy_forecast(building_id, horizon_hours)
+        return _generate_synthetic_occupancy_forecast(building_id, horizon_hours, start_time)
 
 
 def _generate_synthetic_occupancy_forecast(
     building_id: str,
-    horizon_hours: int
+    horizon_hours: int,
+    start_time: Optional[datetime] = None
 ) -> Dict[str, Any]:
     """
     Generate synthetic occupancy forecast as fallback when model is unavailable.
+    
+    Starts at ``start_time`` (default: the current hour bucket), like the model path.
     """
-    start_time = datetime.utcnow()
+    start_time = start_time or current_hour_bucket()
     timestamps = pd.date_range(
         start=start_time,
         periods=horizon_hours,
@@ -583,12 +863,15 @@ def _generate_synthetic_occupancy_forecast(
 
 def _generate_synthetic_forecast(
     building_id: str,
-    horizon_hours: int
+    horizon_hours: int,
+    start_time: Optional[datetime] = None
 ) -> Dict[str, Any]:
     """
     Generate synthetic forecast as fallback when model is unavailable.
+    
+    Starts at ``start_time`` (default: the current hour bucket), like the model path.
     """
-    start_time = datetime.utcnow()
+    start_time = start_time or current_hour_bucket()
     timestamps = pd.date_range(
         start=start_time,
         periods=horizon_hours,
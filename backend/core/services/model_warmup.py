@@ -0,0 +1,192 @@
+"""
+Startup warmup for the ML models.
+
+The model loaders are ``lru_cache``d and normally run on the first request
+that needs them, which makes that request pay for importing TensorFlow,
+deserializing artifacts and the first ``predict`` trace. ``ModelWarmupService``
+calls every loader in parallel at startup, runs one dummy inference per model,
+and records per-model timings for the ``/ready`` endpoint.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from core.anomaly_engine import autoencoder_model, isolation_forest
+from core.services import forecasting_service
+from core.utils.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+settings = get_settings()
+
+
+def _probe_predict(model: Any) -> None:
+    """One zero-input ``predict`` shaped from the model's declared input."""
+    shape = (1, *tuple(model.input_shape)[1:])
+    model.predict(np.zeros(shape, dtype=np.float32), verbose=0)
+
+
+def _probe_score_samples(model: Any) -> None:
+    model.score_samples(np.zeros((1, model.n_features_in_), dtype=np.float32))
+
+
+# name -> (model loader, scaler loader, dummy inference)
+MODEL_REGISTRY: Dict[str, Tuple[Callable[[], Any], Callable[[], Any], Callable[[Any], None]]] = {
+    "autoencoder": (
+        autoencoder_model._load_autoencoder,
+        autoencoder_model._load_scaler,
+        _probe_predict,
+    ),
+    "isolation_forest": (
+        isolation_forest._load_compiled_iforest,
+        isolation_forest._load_scaler,
+        _probe_score_samples,
+    ),
+    "energy_forecaster": (
+        forecasting_service._load_energy_model,
+        forecasting_service._load_energy_scaler,
+        _probe_predict,
+    ),
+    "occupancy_forecaster": (
+        forecasting_service._load_occupancy_model,
+        forecasting_service._load_occupancy_scaler,
+        _probe_predict,
+    ),
+}
+
+
+class ModelWarmupService:
+    """
+    Loads every registered model once and reports readiness.
+
+    Per-model status is ``pending`` -> ``loading`` -> ``ready``, or
+    ``unavailable`` when the artifact cannot be loaded (requests then use the
+    synthetic fallbacks), or ``failed`` when the dummy inference raises. The
+    worker is ready once every model has settled and none of the ``required``
+    models ended ``unavailable`` or ``failed``; an optional model that did
+    only marks the report ``degraded``. With warmup disabled it is ready
+    immediately and models load lazily as before.
+    """
+
+    UNUSABLE = ("unavailable", "failed")
+
+    def __init__(
+        self,
+        registry: Dict[str, Tuple[Callable, Callable, Callable]],
+        max_workers: int = 4,
+        required: Optional[Iterable[str]] = None,
+    ) -> None:
+        self.registry = registry
+        self.max_workers = max_workers
+        self.required = set(registry if required is None else required)
+        unknown = self.required - set(registry)
+        if unknown:
+            raise ValueError(f"Unknown required models: {sorted(unknown)}")
+        self._lock = threading.Lock()
+        self._state = "idle"
+        self._started_at: Optional[datetime] = None
+        self._elapsed: Optional[float] = None
+        self._models: Dict[str, Dict[str, Any]] = {
+            name: {"status": "pending", "load_seconds": None, "inference_seconds": None, "error": None}
+            for name in registry
+        }
+
+    def _update(self, name: str, **fields: Any) -> None:
+        with self._lock:
+            self._models[name].update(fields)
+
+    def _warm_one(self, name: str) -> None:
+        load_model, load_scaler, probe = self.registry[name]
+        self._update(name, status="loading")
+        try:
+            start = time.perf_counter()
+            model = load_model()
+            load_scaler()
+            self._update(name, load_seconds=round(time.perf_counter() - start, 3))
+            if model is None:
+                self._update(name, status="unavailable", error="artifact could not be loaded")
+                return
+
+            start = time.perf_counter()
+            probe(model)
+            self._update(
+                name,
+                status="ready",
+                inference_seconds=round(time.perf_counter() - start, 3),
+            )
+        except Exception as e:
+            logger.error(f"❌ Warmup failed for {name}: {e}", exc_info=True)
+            self._update(name, status="failed", error=str(e))
+
+    def warm_up(self) -> Dict[str, Any]:
+        """Load and probe all models in parallel (blocking); returns the readiness report."""
+        with self._lock:
+            already_started = self._state in ("running", "complete")
+            if not already_started:
+                self._state = "running"
+                self._started_at = datetime.now(timezone.utc)
+        # report() takes the lock itself
+        if already_started:
+            return self.report()
+
+        start = time.perf_counter()
+        logger.info(f"🔥 Warming up {len(self.registry)} models...")
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="model-warmup") as pool:
+            list(pool.map(self._warm_one, self.registry))
+
+        with self._lock:
+            self._state = "complete"
+            self._elapsed = round(time.perf_counter() - start, 3)
+        logger.info(f"✅ Model warmup finished in {self._elapsed:.2f}s")
+        return self.report()
+
+    def disable(self) -> None:
+        """Skip warmup: report ready now and leave models to load on first use."""
+        with self._lock:
+            if self._state == "idle":
+                self._state = "disabled"
+                for model in self._models.values():
+                    model["status"] = "lazy"
+
+    def _unusable(self) -> List[str]:
+        """Models that settled without a usable model; caller must hold the lock."""
+        return sorted(name for name, info in self._models.items() if info["status"] in self.UNUSABLE)
+
+    def _is_ready(self) -> bool:
+        """Caller must hold the lock."""
+        settled = self._state in ("complete", "disabled")
+        return settled and not self.required.intersection(self._unusable())
+
+    @property
+    def is_ready(self) -> bool:
+        with self._lock:
+            return self._is_ready()
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            unusable = self._unusable()
+            return {
+                "ready": self._is_ready(),
+                "degraded": bool(unusable),
+                "failed_required": [name for name in unusable if name in self.required],
+                "warmup": self._state,
+                "started_at": self._started_at.isoformat() if self._started_at else None,
+                "elapsed_seconds": self._elapsed,
+                "models": {name: dict(info) for name, info in self._models.items()},
+            }
+
+
+model_warmup = ModelWarmupService(
+    MODEL_REGISTRY,
+    max_workers=settings.warmup_workers,
+    required=settings.warmup_required,
+)
@@ -0,0 +1,233 @@
+"""
+Write-behind buffer for InfluxDB telemetry writes.
+
+Points are queued as line protocol and written in batches by a background
+thread, so callers never wait on an HTTP round trip per point.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+from influxdb_client import WritePrecision
+
+from core.utils.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+settings = get_settings()
+
+
+def _default_write(lines: List[str]) -> None:
+    """Send one batch of line-protocol records in a single HTTP request."""
+    from core.services.influxdb_service import get_write_api
+
+    get_write_api().write(
+        bucket=settings.influxdb_bucket,
+        org=settings.influxdb_org,
+        record=lines,
+        write_precision=WritePrecision.NS,
+    )
+
+
+class TelemetryWriteBuffer:
+    """
+    Buffers line-protocol records and flushes them in batches.
+
+    A batch is written when ``batch_size`` records are waiting or
+    ``flush_interval_seconds`` has elapsed since the last flush. Failed batches
+    are retried with exponential backoff; batches that still fail, and records
+    that overflow ``max_buffer_size``, are counted as dropped.
+
+    ``close()`` stops the flusher and flushes what is left within its
+    ``timeout``: no retry is started past that deadline and records still
+    buffered at it are counted as dropped. ``start()`` reopens the buffer
+    (application startup, e.g. after a lifespan restart in tests). Records
+    queued while the buffer is closed are written synchronously instead of
+    being rejected.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 500,
+        flush_interval_seconds: float = 1.0,
+        max_buffer_size: int = 50_000,
+        max_retries: int = 3,
+        retry_backoff_seconds: float = 0.5,
+        write_fn: Optional[Callable[[List[str]], None]] = None,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_buffer_size = max_buffer_size
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._write_fn = write_fn or _default_write
+
+        self._buffer: Deque[str] = deque()
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        # Set by close(): monotonic time after which writes are not retried
+        self._deadline: Optional[float] = None
+
+        self._written = 0
+        self._retried = 0
+        self._dropped = 0
+        self._batches = 0
+        self._last_error: Optional[str] = None
+
+    def _ensure_started(self) -> None:
+        """Start the flusher thread on first use; caller must hold the condition."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="telemetry-writer", daemon=True
+            )
+            self._thread.start()
+
+    def start(self) -> None:
+        """Reopen the buffer after ``close()``; the flusher starts on first enqueue."""
+        with self._cond:
+            if self._closed:
+                self._closed = False
+                self._deadline = None
+                logger.info("Telemetry writer reopened")
+
+    def enqueue(self, line: str) -> None:
+        """Queue a single line-protocol record."""
+        self.enqueue_many([line])
+
+    def enqueue_many(self, lines: Iterable[str]) -> None:
+        """Queue several line-protocol records (written directly if the buffer is closed)."""
+        with self._cond:
+            closed = self._closed
+            if not closed:
+                self._enqueue_locked(lines)
+        if closed:
+            batch = list(lines)
+            logger.warning(f"⚠️ Telemetry writer is closed, writing {len(batch)} points directly")
+            for i in range(0, len(batch), self.batch_size):
+                self._write_batch(batch[i:i + self.batch_size])
+
+    def _enqueue_locked(self, lines: Iterable[str]) -> None:
+        """Append records and wake the flusher; caller must hold the condition."""
+        for line in lines:
+            if len(self._buffer) >= self.max_buffer_size:
+                # Keep the newest data: drop the oldest queued record
+                self._buffer.popleft()
+                self._dropped += 1
+            self._buffer.append(line)
+        self._ensure_started()
+        if len(self._buffer) >= self.batch_size:
+            self._cond.notify()
+
+    def _take_batch(self) -> List[str]:
+        """Pop up to ``batch_size`` records; caller must hold the condition."""
+        count = min(self.batch_size, len(self._buffer))
+        return [self._buffer.popleft() for _ in range(count)]
+
+    def _before_deadline(self, delay: float = 0.0) -> bool:
+        """Whether ``delay`` seconds from now is still before the shutdown deadline."""
+        deadline = self._deadline
+        return deadline is None or time.monotonic() + delay < deadline
+
+    def _write_batch(self, batch: List[str]) -> None:
+        with self._write_lock:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self._write_fn(batch)
+                    with self._cond:
+                        self._written += len(batch)
+                        self._batches += 1
+                    logger.debug(f"Wrote batch of {len(batch)} telemetry points to InfluxDB")
+                    return
+                except Exception as e:
+                    delay = self.retry_backoff_seconds * (2 ** attempt)
+                    retry = attempt < self.max_retries and self._before_deadline(delay)
+                    with self._cond:
+                        self._last_error = str(e)
+                        if retry:
+                            self._retried += 1
+                    if not retry:
+                        break
+                    time.sleep(delay)
+            with self._cond:
+                self._dropped += len(batch)
+            logger.error(f"Dropped batch of {len(batch)} telemetry points after {attempt} retries: {self._last_error}")
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while True:
+            with self._cond:
+                while not self._closed:
+                    waited = time.monotonic() - last_flush
+                    if len(self._buffer) >= self.batch_size:
+                        break
+                    if self._buffer and waited >= self.flush_interval_seconds:
+                        break
+                    self._cond.wait(timeout=max(self.flush_interval_seconds - waited, 0.05))
+                    if not self._buffer:
+                        last_flush = time.monotonic()
+                if self._closed:
+                    return
+                batch = self._take_batch()
+            self._write_batch(batch)
+            last_flush = time.monotonic()
+
+    def flush(self) -> int:
+        """Synchronously write everything currently buffered. Returns records attempted."""
+        attempted = 0
+        while True:
+            with self._cond:
+                if not self._before_deadline():
+                    remaining = len(self._buffer)
+                    self._buffer.clear()
+                    self._dropped += remaining
+                    if remaining:
+                        logger.error(f"Dropped {remaining} buffered telemetry points at the shutdown deadline")
+                    return attempted
+                batch = self._take_batch()
+            if not batch:
+                return attempted
+            self._write_batch(batch)
+            attempted += len(batch)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the flusher thread and flush remaining records within ``timeout`` (shutdown hook)."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._deadline = time.monotonic() + timeout
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        flushed = self.flush()
+        logger.info(f"Telemetry writer closed, flushed {flushed} buffered points")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "buffered": len(self._buffer),
+                "written": self._written,
+                "retried": self._retried,
+                "dropped": self._dropped,
+                "batches": self._batches,
+                "batch_size": self.batch_size,
+                "flush_interval_seconds": self.flush_interval_seconds,
+                "last_error": self._last_error,
+                "closed": self._closed,
+            }
+
+
+telemetry_writer = TelemetryWriteBuffer(
+    batch_size=settings.telemetry_write_batch_size,
+    flush_interval_seconds=settings.telemetry_flush_interval_seconds,
+    max_buffer_size=settings.telemetry_max_buffer_size,
+    max_retries=settings.telemetry_write_max_retries,
+)
@@ -1,17 +1,50 @@
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 import pandas as pd
 import logging
 
 from core.services.influxdb_service import (
+    build_telemetry_line,
     query_time_series,
     query_time_series_stub,
-    write_telemetry_point
+    query_time_series_wide,
+    run_in_influx_executor
 )
+from core.services.telemetry_writer import telemetry_writer
+from core.utils.cache import TTLCache
+from core.utils.config import get_settings
+from core.utils.preprocessing import pivot_zone_metrics
 
 logger = logging.getLogger(__name__)
 
 
+settings = get_settings()
+
+# Shared across all callers in this worker so dashboard polls from many
+# viewers collapse into one Influx query per distinct window.
+_metrics_cache: TTLCache[pd.DataFrame] = TTLCache(
+    maxsize=settings.timeseries_cache_max_entries,
+    ttl_seconds=settings.timeseries_cache_ttl_seconds,
+    name="timeseries_metrics",
+)
+
+
+def _align_window(
+    start_time: datetime,
+    end_time: datetime,
+    resolution_minutes: int
+) -> Tuple[datetime, datetime]:
+    """Snap a query window to resolution buckets (start floored, end ceiled), in UTC."""
+    if start_time.tzinfo is None:
+        start_time = start_time.replace(tzinfo=timezone.utc)
+    if end_time.tzinfo is None:
+        end_time = end_time.replace(tzinfo=timezone.utc)
+    freq = f"{max(int(resolution_minutes), 1)}min"
+    start = pd.Timestamp(start_time).tz_convert("UTC").floor(freq)
+    end = pd.Timestamp(end_time).tz_convert("UTC").ceil(freq)
+    return start.to_pydatetime(), end.to_pydatetime()
+
+
 class TimeSeriesService:
     """Service for managing time-series data operations."""
     
@@ -22,22 +55,45 @@ class TimeSeriesService:
         metrics: List[str],
         start_time: datetime,
         end_time: datetime,
-        resolution_minutes: int = 15
+        resolution_minutes: int = 15,
+        use_cache: bool = True
     ) -> pd.DataFrame:
-        """Get time-series metrics for a building/zone."""
-        try:
+        """
+        Get time-series metrics for a building/zone.
+
+        InfluxDB results are cached per (building, zone, metrics, aligned window,
+        resolution); concurrent identical requests share a single query.
+        """
+        aligned_start, aligned_end = _align_window(start_time, end_time, resolution_minutes)
+        cache_key = (
+            building_id,
+            zone_id,
+            tuple(sorted(metrics)),
+            aligned_start,
+            aligned_end,
+            resolution_minutes,
+        )
+
+        def _load() -> pd.DataFrame:
             logger.info(f"Attempting InfluxDB query for {building_id}/{zone_id}, metrics={metrics}")
-            df = query_time_series(
+            return query_time_series(
                 building_id=building_id,
                 zone_id=zone_id,
                 metrics=metrics,
-                start_time=start_time,
-                end_time=end_time,
+                start_time=aligned_start,
+                end_time=aligned_end,
                 resolution_minutes=resolution_minutes
             )
+
+        try:
+            if use_cache:
+                df = _metrics_cache.get_or_compute(cache_key, _load, should_cache=lambda d: not d.empty)
+            else:
+                df = _load()
             if not df.empty:
                 logger.info(f"✅ InfluxDB query successful: {len(df)} records returned")
-                return df
+                # Callers mutate the frame in place; never hand out the cached object
+                return df.copy()
             else:
                 logger.warning(f"⚠️  InfluxDB query returned empty results, using synthetic fallback")
                 return query_time_series_stub(
@@ -60,6 +116,167 @@ class TimeSeriesService:
                 resolution_minutes=resolution_minutes
             )
     
+    @staticmethod
+    def get_metrics_wide(
+        building_id: str,
+        zone_id: Optional[str],
+        metrics: List[str],
+        start_time: datetime,
+        end_time: datetime,
+        resolution_minutes: int = 15,
+        zone_agg: Optional[Dict[str, str]] = None,
+        use_cache: bool = True,
+        fallback: bool = True
+    ) -> pd.DataFrame:
+        """
+        Get building-level metrics as one row per timestamp.
+
+        Pivoting and cross-zone aggregation run inside InfluxDB (see
+        ``query_time_series_wide``). ``zone_agg`` maps metric -> ``"sum"`` or
+        ``"mean"`` (default). The synthetic fallback is pivoted locally with
+        the same aggregates. With ``fallback=False`` an empty result is
+        returned as-is and query failures are raised, so callers merging into
+        stored data never pick up synthetic rows.
+
+        Returns:
+            DataFrame with columns: timestamp, *metrics
+        """
+        zone_agg = dict(zone_agg or {})
+        aligned_start, aligned_end = _align_window(start_time, end_time, resolution_minutes)
+        cache_key = (
+            "wide",
+            building_id,
+            zone_id,
+            tuple(sorted(metrics)),
+            tuple(sorted(zone_agg.items())),
+            aligned_start,
+            aligned_end,
+            resolution_minutes,
+        )
+
+        def _load() -> pd.DataFrame:
+            logger.info(f"Attempting wide InfluxDB query for {building_id}/{zone_id}, metrics={metrics}")
+            return query_time_series_wide(
+                building_id=building_id,
+                zone_id=zone_id,
+                metrics=metrics,
+                start_time=aligned_start,
+                end_time=aligned_end,
+                resolution_minutes=resolution_minutes,
+                zone_agg=zone_agg,
+                raise_errors=not fallback
+            )
+
+        if not fallback:
+            if use_cache:
+                df = _metrics_cache.get_or_compute(cache_key, _load, should_cache=lambda d: not d.empty)
+            else:
+                df = _load()
+            return df.copy()
+
+        try:
+            if use_cache:
+                df = _metrics_cache.get_or_compute(cache_key, _load, should_cache=lambda d: not d.empty)
+            else:
+                df = _load()
+            if not df.empty:
+                logger.info(f"✅ InfluxDB wide query successful: {len(df)} rows returned")
+                return df.copy()
+            logger.warning(f"⚠️  InfluxDB wide query returned empty results, using synthetic fallback")
+        except Exception as e:
+            logger.error(f"❌ InfluxDB wide query failed: {e}, using synthetic fallback", exc_info=True)
+
+        stub = query_time_series_stub(
+            building_id=building_id,
+            zone_id=zone_id,
+            metrics=metrics,
+            start_time=start_time,
+            end_time=end_time,
+            resolution_minutes=resolution_minutes
+        )
+        sum_metrics = [m for m, fn in zone_agg.items() if fn == "sum"]
+        return pivot_zone_metrics(stub, metrics, sum_metrics=sum_metrics)
+    
+    @staticmethod
+    def cache_stats() -> Dict[str, Any]:
+        """Hit/miss counters for the metrics query cache."""
+        return _metrics_cache.stats()
+    
+    @staticmethod
+    def clear_cache() -> int:
+        """Drop all cached query results; returns the number of entries removed."""
+        return _metrics_cache.invalidate()
+    
+    @staticmethod
+    async def get_metrics_async(
+        building_id: str,
+        zone_id: Optional[str],
+        metrics: List[str],
+        start_time: datetime,
+        end_time: datetime,
+        resolution_minutes: int = 15,
+        use_cache: bool = True
+    ) -> pd.DataFrame:
+        """Non-blocking get_metrics: runs the query (and fallback) on the Influx pool."""
+        return await run_in_influx_executor(
+            TimeSeriesService.get_metrics,
+            building_id=building_id,
+            zone_id=zone_id,
+            metrics=metrics,
+            start_time=start_time,
+            end_time=end_time,
+            resolution_minutes=resolution_minutes,
+            use_cache=use_cache
+        )
+    
+    @staticmethod
+    async def iter_metrics_async(
+        building_id: str,
+        zone_id: Optional[str],
+        metrics: List[str],
+        start_time: datetime,
+        end_time: datetime,
+        resolution_minutes: int = 15,
+        chunk_hours: int = 24
+    ) -> AsyncIterator[pd.DataFrame]:
+        """
+        Yield InfluxDB frames for consecutive time chunks of a long window.
+
+        Meant for exports, so there is no synthetic fallback: a chunk with no
+        data yields nothing, and a failed query (or an open circuit breaker)
+        raises, ending the iteration. Chunks are multiples of the resolution
+        (so aggregation windows never straddle a boundary) and bypass the
+        query cache, so only one chunk is in memory at a time. A timestamp
+        already emitted by the previous chunk is dropped, since Influx labels
+        buckets by window end.
+        """
+        resolution = timedelta(minutes=max(int(resolution_minutes), 1))
+        chunk = max(timedelta(hours=chunk_hours) // resolution, 1) * resolution
+        chunk_start, end = _align_window(start_time, end_time, resolution_minutes)
+        last_emitted: Optional[pd.Timestamp] = None
+
+        while chunk_start < end:
+            chunk_end = min(chunk_start + chunk, end)
+            df = await run_in_influx_executor(
+                query_time_series,
+                building_id=building_id,
+                zone_id=zone_id,
+                metrics=metrics,
+                start_time=chunk_start,
+                end_time=chunk_end,
+                resolution_minutes=resolution_minutes,
+                raise_errors=True
+            )
+            if not df.empty:
+                timestamps = pd.to_datetime(df["timestamp"], utc=True)
+                if last_emitted is not None:
+                    keep = (timestamps > last_emitted).to_numpy()
+                    df, timestamps = df[keep], timestamps[keep]
+                if not df.empty:
+                    last_emitted = timestamps.max()
+                    yield df
+            chunk_start = chunk_end
+    
     @staticmethod
     def store_simulation_results(
         building_id: str,
@@ -67,16 +284,25 @@ class TimeSeriesService:
         results: Dict[str, pd.Series],
         start_time: datetime
     ) -> None:
-        """Store simulation results to InfluxDB."""
-        for metric_name, series in results.items():
-            for timestamp, value in series.items():
-                write_telemetry_point(
-                    building_id=building_id,
-                    zone_id=zone_id,
-                    metric=metric_name,
-                    value=float(value),
-                    timestamp=timestamp if isinstance(timestamp, datetime) else pd.Timestamp(timestamp).to_pydatetime()
-                )
+        """
+        Store simulation results to InfluxDB.
+
+        All points are rendered to line protocol up front and handed to the
+        write-behind buffer in one call, which writes them in batches.
+        """
+        lines = [
+            build_telemetry_line(
+                building_id=building_id,
+                zone_id=zone_id,
+                metric=metric_name,
+                value=float(value),
+                timestamp=timestamp if isinstance(timestamp, datetime) else pd.Timestamp(timestamp).to_pydatetime()
+            )
+            for metric_name, series in results.items()
+            for timestamp, value in series.items()
+        ]
+        telemetry_writer.enqueue_many(lines)
+        logger.info(f"Queued {len(lines)} simulation points for {building_id}/{zone_id}")
     
     @staticmethod
     def get_latest_metrics(
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import hashlib
 import json
 import pandas as pd
@@ -10,27 +10,35 @@ from core.services.timeseries_service import timeseries_service
 class SuggestionEngine:
     """Enhanced suggestion engine with data-driven recommendations."""
     
+    def load_recent_metrics(self, building_id: str) -> pd.DataFrame:
+        """The last 48h of hourly telemetry the data-driven suggestions analyse."""
+        end_time = datetime.utcnow()
+        start_time = end_time - timedelta(hours=48)
+        return timeseries_service.get_metrics(
+            building_id=building_id,
+            zone_id=None,
+            metrics=["energy", "temperature", "occupancy"],
+            start_time=start_time,
+            end_time=end_time,
+            resolution_minutes=60
+        )
+
     def generate_suggestions(
         self,
         building_id: str,
-        horizon_hours: int = 24
+        horizon_hours: int = 24,
+        recent: Optional[pd.DataFrame] = None
     ) -> List[Dict[str, Any]]:
-        """Generate energy optimization suggestions."""
+        """
+        Generate energy optimization suggestions.
+
+        ``recent`` is the output of ``load_recent_metrics`` when the caller
+        already fetched it (e.g. on the Influx pool); otherwise it is loaded here.
+        """
         suggestions = []
         
-        # Get recent data to inform suggestions
-        end_time = datetime.utcnow()
-        start_time = end_time - timedelta(hours=48)
-        
         try:
-            df = timeseries_service.get_metrics(
-                building_id=building_id,
-                zone_id=None,
-                metrics=["energy", "temperature", "occupancy"],
-                start_time=start_time,
-                end_time=end_time,
-                resolution_minutes=60
-            )
+            df = self.load_recent_metrics(building_id) if recent is None else recent
             
             if not df.empty:
                 # Analyze patterns and generate data-driven suggestions
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, Sequence, Tuple, TypeVar
+
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    Thread-safe LRU cache with per-entry time-to-live and single-flight loading.
+
+    ``get_or_compute`` coalesces concurrent misses for the same key: the first
+    caller runs the loader, every other caller waits for that result instead
+    of issuing a duplicate query. ``get_or_compute_many`` does the same for a
+    batch of keys with one loader call for all of its misses.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl_seconds: float = 60.0, name: str = "cache") -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Optional[V]]:
+        """Return (found, value); caller must hold the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._expirations += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: V, ttl_seconds: Optional[float]) -> None:
+        """Insert a value and evict least-recently-used entries; caller must hold the lock."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self._hits += 1
+            else:
+                self._misses += 1
+            return value
+
+    def set(self, key: Hashable, value: V, ttl_seconds: Optional[float] = None) -> None:
+        with self._lock:
+            self._store(key, value, ttl_seconds)
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        loader: Callable[[], V],
+        should_cache: Optional[Callable[[V], bool]] = None,
+        ttl_seconds: Optional[float] = None,
+    ) -> V:
+        """
+        Return the cached value for ``key`` or load it exactly once.
+
+        Args:
+            key: Hashable cache key
+            loader: Zero-argument callable producing the value on a miss
+            should_cache: Optional predicate; results it rejects are returned
+                to every waiting caller but not stored
+            ttl_seconds: Optional per-entry TTL override
+        """
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self._hits += 1
+                return value
+            inflight = self._inflight.get(key)
+            leader = inflight is None
+            if leader:
+                self._misses += 1
+                inflight = Future()
+                self._inflight[key] = inflight
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            return inflight.result()
+
+        try:
+            value = loader()
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+            inflight.set_exception(exc)
+            raise
+
+        with self._lock:
+            if should_cache is None or should_cache(value):
+                self._store(key, value, ttl_seconds)
+            self._inflight.pop(key, None)
+        inflight.set_result(value)
+        return value
+
+    def get_or_compute_many(
+        self,
+        keys: Sequence[Hashable],
+        loader: Callable[[List[Hashable]], Dict[Hashable, V]],
+        should_cache: Optional[Callable[[V], bool]] = None,
+        ttl_seconds: Optional[float] = None,
+    ) -> Dict[Hashable, V]:
+        """
+        Batch ``get_or_compute``: cached keys are returned as-is, keys another
+        caller is already loading are waited for, and the remaining misses go
+        to a single ``loader`` call.
+
+        Args:
+            keys: Hashable cache keys (duplicates are ignored)
+            loader: Callable taking the list of missing keys and returning a
+                value for every one of them
+            should_cache: Optional predicate; results it rejects are returned
+                to every waiting caller but not stored
+            ttl_seconds: Optional per-entry TTL override
+
+        Returns:
+            Value per key, in ``keys`` order
+        """
+        keys = list(dict.fromkeys(keys))
+        values: Dict[Hashable, V] = {}
+        led: Dict[Hashable, Future] = {}
+        waiting: Dict[Hashable, Future] = {}
+        with self._lock:
+            for key in keys:
+                found, value = self._lookup(key)
+                if found:
+                    self._hits += 1
+                    values[key] = value
+                elif key in self._inflight:
+                    self._coalesced += 1
+                    waiting[key] = self._inflight[key]
+                else:
+                    self._misses += 1
+                    led[key] = self._inflight[key] = Future()
+
+        # Load our own misses before waiting, so two overlapping batches cannot block each other
+        if led:
+            try:
+                loaded = loader(list(led))
+                missing = [key for key in led if key not in loaded]
+                if missing:
+                    raise KeyError(f"{self.name} loader returned no value for {missing}")
+            except BaseException as exc:
+                with self._lock:
+                    for key in led:
+                        self._inflight.pop(key, None)
+                for future in led.values():
+                    future.set_exception(exc)
+                raise
+
+            with self._lock:
+                for key in led:
+                    if should_cache is None or should_cache(loaded[key]):
+                        self._store(key, loaded[key], ttl_seconds)
+                    self._inflight.pop(key, None)
+            for key, future in led.items():
+                future.set_result(loaded[key])
+                values[key] = loaded[key]
+
+        for key, future in waiting.items():
+            values[key] = future.result()
+        return {key: values[key] for key in keys}
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """Drop all entries (or those whose key matches ``predicate``)."""
+        with self._lock:
+            keys = [k for k in self._entries if predicate is None or predicate(k)]
+            for k in keys:
+                del self._entries[k]
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses + self._coalesced
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "in_flight": len(self._inflight),
+                "hit_rate": round((self._hits + self._coalesced) / lookups, 4) if lookups else 0.0,
+            }
@@ -1,5 +1,6 @@
 from pathlib import Path
 from functools import lru_cache
+from typing import List
 from pydantic_settings import BaseSettings
 
 
@@ -22,6 +23,60 @@ class Settings(BaseSettings):
     influxdb_org: str = "digital-twin"
     influxdb_bucket: str = "building_telemetry"
     influxdb_verify_ssl: bool = True
+    influxdb_query_workers: int = 8  # Max concurrent blocking Influx calls per worker
+    influxdb_breaker_failure_threshold: int = 3  # Consecutive failures before failing fast
+    influxdb_breaker_reset_seconds: float = 30.0  # Open time before a background probe
+    
+    # Time-series query cache
+    timeseries_cache_ttl_seconds: int = 60
+    timeseries_cache_max_entries: int = 256
+    
+    # Streaming historical export (POST /historical/export)
+    historical_export_max_days: int = 731
+    historical_export_chunk_hours: int = 24  # Influx window fetched per step
+    
+    # Telemetry write-behind buffer
+    telemetry_write_batch_size: int = 500
+    telemetry_flush_interval_seconds: float = 1.0
+    telemetry_max_buffer_size: int = 50_000
+    telemetry_write_max_retries: int = 3
+    
+    # Dashboard snapshots
+    dashboard_window_hours: int = 48
+    dashboard_background_refresh: bool = True  # Refresh snapshots after each 15-min boundary
+    dashboard_refresh_settle_seconds: float = 5.0  # Delay after the boundary for late writes
+    dashboard_load_timeout_seconds: float = 20.0
+    dashboard_anomaly_timeout_seconds: float = 10.0
+    dashboard_suggestions_timeout_seconds: float = 5.0
+    dashboard_building_info_timeout_seconds: float = 2.0
+    dashboard_stage_workers: int = 4  # Threads for payload stages, separate from the Influx query pool
+    dashboard_partial_retry_seconds: float = 30.0  # Rebuild a partial snapshot after this long
+    dashboard_max_buildings: int = 200  # Snapshots kept per worker, least recently requested evicted
+    dashboard_idle_minutes: float = 60.0  # Stop refreshing a building nobody has requested for this long
+    
+    # Anomaly scoring (running per-building normalization, per-timestamp cache)
+    anomaly_score_threshold: float = 0.85
+    anomaly_cache_retention_hours: int = 168
+    anomaly_scorer_max_states: int = 512  # (building, source) states kept, least recently used evicted
+    anomaly_scorer_idle_hours: float = 24.0  # Drop a state unused for this long
+    anomaly_batch_max_queries: int = 500  # Per POST /anomalies/detect/batch
+    
+    # Forecast result cache (per building, horizon, hour bucket, actions version)
+    forecast_cache_max_entries: int = 1024
+    forecast_batch_max_buildings: int = 500  # Per POST /forecast/energy/batch
+    forecast_batch_fetch_workers: int = 8  # Concurrent history queries per batch
+    
+    # Hourly forecast precompute (fills the forecast cache after each hour boundary)
+    forecast_precompute_enabled: bool = True
+    forecast_precompute_buildings: List[str] = []  # Always precomputed, in addition to buildings seen at runtime
+    forecast_precompute_energy_horizons: List[int] = [24]
+    forecast_precompute_occupancy_horizons: List[int] = [12]
+    forecast_precompute_max_tracked: int = 1000  # Requested buildings remembered, least recent dropped
+    forecast_precompute_idle_hours: float = 24.0  # Forget a requested building after this long unrequested
+    forecast_precompute_settle_seconds: float = 10.0  # Delay after the boundary for late writes
+    forecast_precompute_jitter_seconds: float = 60.0  # Random extra delay so workers don't start together
+    forecast_precompute_concurrency: int = 2  # Batches/buildings in flight at once
+    forecast_precompute_batch_size: int = 100  # Buildings per batched energy forecast
     
     # Neo4j (for graph-based layout)
     neo4j_uri: str = "bolt://localhost:7687"
@@ -31,6 +86,14 @@ class Settings(BaseSettings):
     # Model paths
     models_dir: Path = PROJECT_ROOT / "backend" / "models"
     
+    # Model warmup (load + dummy inference at startup; /ready is 503 until done)
+    warmup_enabled: bool = True
+    warmup_workers: int = 4
+    # /ready stays 503 if any of these fails to load or probe; others only mark it degraded
+    warmup_required: List[str] = [
+        "autoencoder", "isolation_forest", "energy_forecaster", "occupancy_forecaster",
+    ]
+    
     # API settings
     api_base_url: str = "http://localhost:8000"
     cors_origins: list[str] = ["http://localhost:5173", "http://localhost:3000"]
@@ -0,0 +1,80 @@
+"""
+Fast JSON responses.
+
+``FastJSONResponse`` is the app's ``default_response_class``. With orjson
+installed it encodes in Rust, including NumPy arrays/scalars and datetimes
+natively; without it, it falls back to the stdlib encoder with the same
+extra-type handling, so routes behave the same either way.
+
+Hot routes can return ``FastJSONResponse(payload)`` directly: FastAPI does not
+re-validate a returned ``Response`` against ``response_model`` (the model is
+still used for the OpenAPI schema), so the payload must already match it, as
+the columnar builders in ``core.utils.serialization`` do.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Encode types neither encoder handles natively (orjson: pandas Timestamp/NaT)."""
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(content: Any) -> bytes:
+        """Encode to compact UTF-8 JSON; NaN/inf become null."""
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+else:
+
+    def dumps(content: Any) -> bytes:
+        """Encode to compact UTF-8 JSON; NaN/inf become null."""
+        return json.dumps(
+            _replace_nonfinite(content),
+            default=_default,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    def _replace_nonfinite(obj: Any) -> Any:
+        # Match orjson: the stdlib would emit NaN/Infinity, which is not JSON
+        if isinstance(obj, float):
+            return obj if np.isfinite(obj) else None
+        if isinstance(obj, dict):
+            return {k: _replace_nonfinite(v) for k, v in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [_replace_nonfinite(v) for v in obj]
+        return obj
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,58 @@
+"""
+Conditional request helpers (ETag / If-None-Match).
+
+Polling endpoints derive an ETag from the inputs that determine their payload
+(data watermark, ``actions_version``, request parameters) so an unchanged
+payload can be answered with an empty 304 before any work is done.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Dict
+
+from fastapi import Request, Response
+
+
+# Clients may keep the body but must revalidate before reusing it
+CACHE_CONTROL = "no-cache"
+
+
+def compute_etag(*parts: Any) -> str:
+    """
+    Build a weak ETag from the values a payload is derived from.
+
+    Weak because payloads with the same inputs are equivalent rather than
+    byte-identical (e.g. forecast timestamps are stamped at request time).
+    """
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match header matches ``etag`` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    target = _opaque_tag(etag)
+    return any(_opaque_tag(candidate) == target for candidate in header.split(","))
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    """Headers for a response built directly (injected ``Response`` headers are not applied to it)."""
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=etag_headers(etag))
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers.update(etag_headers(etag))
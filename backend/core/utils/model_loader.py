@@ -1,6 +1,11 @@
+import logging
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Optional
 
+from core.utils.numpy_inference import file_sha256
+
+
+logger = logging.getLogger(__name__)
 
 BASE_MODELS_DIR = Path(__file__).resolve().parents[2] / "models"
 
@@ -12,6 +17,68 @@ def get_model_path(*relative_parts: str) -> Path:
     return BASE_MODELS_DIR.joinpath(*relative_parts)
 
 
+def load_joblib_artifact(*relative_parts: str) -> Optional[Any]:
+    """
+    Load a joblib/pickle artifact (scalers, sklearn models).
+
+    joblib, and sklearn when unpickling, are imported on first call rather
+    than at app import. Returns None if the file is missing or unreadable.
+    """
+    try:
+        import joblib
+
+        return joblib.load(get_model_path(*relative_parts))
+    except Exception:
+        return None
+
+
+def load_keras_model(*relative_parts: str) -> Optional[Any]:
+    """
+    Load a Keras model for inference, importing TensorFlow on first call.
+
+    Returns None if TensorFlow is not installed or the file cannot be loaded.
+    ``compile=False``: we only predict, and H5 files saved with string
+    metrics such as "mse" cannot be deserialized for compilation by Keras 3.
+    """
+    try:
+        from tensorflow import keras
+    except ImportError:
+        return None
+    try:
+        return keras.models.load_model(get_model_path(*relative_parts), compile=False)
+    except Exception:
+        return None
+
+
+def load_numpy_export(load: Callable[[Path], Any], *relative_parts: str) -> Optional[Any]:
+    """
+    Load the NumPy export of a Keras model, e.g. ("forecasting", "lstm_energy").
+
+    ``<name>.npz`` is used only if it was exported from the current
+    ``<name>.h5``: an export whose recorded ``source_sha256`` is missing or
+    does not match the H5 file (the model was retrained and not re-exported)
+    is skipped with a warning, so the caller falls back to Keras. Returns None
+    when there is no usable export.
+    """
+    *folder, name = relative_parts
+    npz_path = get_model_path(*folder, f"{name}.npz")
+    h5_path = get_model_path(*folder, f"{name}.h5")
+    if not npz_path.exists():
+        return None
+    try:
+        network = load(npz_path)
+    except Exception as e:
+        logger.error(f"❌ Failed to load NumPy export {npz_path}: {e}")
+        return None
+    if h5_path.exists() and network.source_sha256 != file_sha256(h5_path):
+        logger.warning(
+            f"⚠️ {npz_path.name} was not exported from the current {h5_path.name}; "
+            "using the Keras model (re-run scripts/export_numpy_models.py)"
+        )
+        return None
+    return network
+
+
 def load_stub_model(name: str) -> Any:
     """
     For now, just return the model name.
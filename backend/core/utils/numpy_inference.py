@@ -0,0 +1,242 @@
+"""
+Pure-NumPy forward passes for the small Keras models we serve.
+
+Weights are exported once from the trained Keras models by
+``scripts/export_numpy_models.py`` into ``.npz`` files; loading and running
+them needs neither TensorFlow nor a Keras session, and avoids Keras' per-call
+dispatch overhead on the few-hundred-row batches the API scores.
+
+``DenseNetwork`` covers the anomaly autoencoder; ``LSTMNetwork`` covers the
+forecasting models (stacked LSTMs followed by a Dense head). Each export
+records the SHA-256 of the ``.h5`` file it was made from (``source_sha256``)
+so loaders can detect an export left behind by retraining.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+def file_sha256(path: Union[str, Path]) -> str:
+    """Hex SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_source_sha256(data: "np.lib.npyio.NpzFile") -> Optional[str]:
+    return str(data["source_sha256"]) if "source_sha256" in data.files else None
+
+
+def _relu(x: np.ndarray) -> np.ndarray:
+    return np.maximum(x, 0.0, out=x)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _linear(x: np.ndarray) -> np.ndarray:
+    return x
+
+
+ACTIVATIONS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "relu": _relu,
+    "linear": _linear,
+    "sigmoid": _sigmoid,
+    "tanh": np.tanh,
+}
+
+
+class DenseNetwork:
+    """
+    A stack of Dense layers evaluated with NumPy.
+
+    BatchNormalization layers are folded into the following Dense layer at
+    export time, so inference is one matmul + bias + activation per layer.
+    Computation runs in float32 like Keras. ``predict`` accepts the same call
+    as ``keras.Model.predict`` so it can be used as a drop-in replacement.
+    """
+
+    def __init__(
+        self,
+        layers: List[Tuple[np.ndarray, np.ndarray, str]],
+        source_sha256: Optional[str] = None,
+    ) -> None:
+        if not layers:
+            raise ValueError("DenseNetwork needs at least one layer")
+        for _, _, activation in layers:
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation: {activation}")
+        self.layers = [
+            (np.ascontiguousarray(W, dtype=np.float32), np.asarray(b, dtype=np.float32), activation)
+            for W, b, activation in layers
+        ]
+        self.source_sha256 = source_sha256
+
+    @property
+    def input_dim(self) -> int:
+        return self.layers[0][0].shape[0]
+
+    @property
+    def input_shape(self) -> Tuple[None, int]:
+        """Keras-style input shape, batch dimension first."""
+        return (None, self.input_dim)
+
+    @property
+    def output_dim(self) -> int:
+        return self.layers[-1][0].shape[1]
+
+    def predict(self, x: np.ndarray, verbose: int = 0, **_: object) -> np.ndarray:
+        h = np.asarray(x, dtype=np.float32)
+        for W, b, activation in self.layers:
+            h = ACTIVATIONS[activation](h @ W + b)
+        return h
+
+    __call__ = predict
+
+    def save(self, path: Union[str, Path]) -> None:
+        arrays: Dict[str, np.ndarray] = {
+            "activations": np.array([activation for _, _, activation in self.layers]),
+        }
+        if self.source_sha256 is not None:
+            arrays["source_sha256"] = np.array(self.source_sha256)
+        for i, (W, b, _) in enumerate(self.layers):
+            arrays[f"W{i}"] = W
+            arrays[f"b{i}"] = b
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "DenseNetwork":
+        with np.load(path, allow_pickle=False) as data:
+            activations = [str(a) for a in data["activations"]]
+            layers = [(data[f"W{i}"], data[f"b{i}"], act) for i, act in enumerate(activations)]
+            source_sha256 = _read_source_sha256(data)
+        return cls(layers, source_sha256)
+
+
+class LSTMNetwork:
+    """
+    Stacked LSTM layers followed by a Dense head, evaluated with NumPy.
+
+    Each LSTM layer is ``(kernel, recurrent_kernel, bias, return_sequences)``
+    in Keras' layout: gates are packed along the last axis in the order input,
+    forget, cell, output, with sigmoid gates and tanh cell/output activations
+    (the Keras defaults). The input projection ``x @ kernel + bias`` is done
+    for all timesteps in one matmul; only the recurrent matmul runs per step.
+    Dropout layers are no-ops at inference and are dropped at export time.
+    Like ``DenseNetwork``, computation is float32 and ``predict`` mirrors
+    ``keras.Model.predict``.
+    """
+
+    def __init__(
+        self,
+        lstm_layers: List[Tuple[np.ndarray, np.ndarray, np.ndarray, bool]],
+        head: DenseNetwork,
+        timesteps: Optional[int] = None,
+        source_sha256: Optional[str] = None,
+    ) -> None:
+        if not lstm_layers:
+            raise ValueError("LSTMNetwork needs at least one LSTM layer")
+        self.lstm_layers = []
+        for kernel, recurrent_kernel, bias, return_sequences in lstm_layers:
+            units = recurrent_kernel.shape[0]
+            if kernel.shape[1] != 4 * units or recurrent_kernel.shape[1] != 4 * units or bias.shape != (4 * units,):
+                raise ValueError(f"LSTM weights do not match {units} units with 4 gates")
+            self.lstm_layers.append((
+                np.ascontiguousarray(kernel, dtype=np.float32),
+                np.ascontiguousarray(recurrent_kernel, dtype=np.float32),
+                np.asarray(bias, dtype=np.float32),
+                bool(return_sequences),
+            ))
+        if self.lstm_layers[-1][3]:
+            raise ValueError("The last LSTM layer must return only its final state")
+        self.head = head
+        self.timesteps = timesteps
+        self.source_sha256 = source_sha256
+
+    @property
+    def input_dim(self) -> int:
+        return self.lstm_layers[0][0].shape[0]
+
+    @property
+    def input_shape(self) -> Tuple[None, Optional[int], int]:
+        """Keras-style input shape, batch dimension first."""
+        return (None, self.timesteps, self.input_dim)
+
+    @property
+    def output_dim(self) -> int:
+        return self.head.output_dim
+
+    @staticmethod
+    def _run_lstm(
+        x: np.ndarray,
+        kernel: np.ndarray,
+        recurrent_kernel: np.ndarray,
+        bias: np.ndarray,
+        return_sequences: bool,
+    ) -> np.ndarray:
+        n, steps, _ = x.shape
+        units = recurrent_kernel.shape[0]
+        projected = x @ kernel + bias  # (N, T, 4 * units)
+        h = np.zeros((n, units), dtype=np.float32)
+        c = np.zeros((n, units), dtype=np.float32)
+        outputs = np.empty((n, steps, units), dtype=np.float32) if return_sequences else None
+
+        for t in range(steps):
+            z = projected[:, t] + h @ recurrent_kernel
+            i = _sigmoid(z[:, :units])
+            f = _sigmoid(z[:, units:2 * units])
+            g = np.tanh(z[:, 2 * units:3 * units])
+            o = _sigmoid(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * np.tanh(c)
+            if outputs is not None:
+                outputs[:, t] = h
+        return outputs if outputs is not None else h
+
+    def predict(self, x: np.ndarray, verbose: int = 0, **_: object) -> np.ndarray:
+        h = np.asarray(x, dtype=np.float32)
+        if h.ndim != 3 or h.shape[2] != self.input_dim:
+            raise ValueError(f"Expected input of shape (batch, timesteps, {self.input_dim}), got {h.shape}")
+        for kernel, recurrent_kernel, bias, return_sequences in self.lstm_layers:
+            h = self._run_lstm(h, kernel, recurrent_kernel, bias, return_sequences)
+        return self.head.predict(h)
+
+    __call__ = predict
+
+    def save(self, path: Union[str, Path]) -> None:
+        arrays: Dict[str, np.ndarray] = {
+            "activations": np.array([activation for _, _, activation in self.head.layers]),
+            "return_sequences": np.array([layer[3] for layer in self.lstm_layers]),
+            "timesteps": np.array(self.timesteps if self.timesteps is not None else -1),
+        }
+        if self.source_sha256 is not None:
+            arrays["source_sha256"] = np.array(self.source_sha256)
+        for i, (kernel, recurrent_kernel, bias, _) in enumerate(self.lstm_layers):
+            arrays[f"lstm{i}_kernel"] = kernel
+            arrays[f"lstm{i}_recurrent_kernel"] = recurrent_kernel
+            arrays[f"lstm{i}_bias"] = bias
+        for i, (W, b, _) in enumerate(self.head.layers):
+            arrays[f"W{i}"] = W
+            arrays[f"b{i}"] = b
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "LSTMNetwork":
+        with np.load(path, allow_pickle=False) as data:
+            lstm_layers = [
+                (data[f"lstm{i}_kernel"], data[f"lstm{i}_recurrent_kernel"], data[f"lstm{i}_bias"], bool(rs))
+                for i, rs in enumerate(data["return_sequences"])
+            ]
+            activations = [str(a) for a in data["activations"]]
+            head = DenseNetwork([(data[f"W{i}"], data[f"b{i}"], act) for i, act in enumerate(activations)])
+            timesteps = int(data["timesteps"])
+            source_sha256 = _read_source_sha256(data)
+        return cls(lstm_layers, head, timesteps if timesteps > 0 else None, source_sha256)
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable
 import pandas as pd
 
 
@@ -14,3 +14,40 @@ def to_time_series(records: List[Dict[str, Any]], time_key: str = "timestamp") -
         df[time_key] = pd.to_datetime(df[time_key])
         df = df.sort_values(time_key).set_index(time_key)
     return df
+
+
+def pivot_zone_metrics(
+    df: pd.DataFrame,
+    metrics: List[str],
+    sum_metrics: Iterable[str] = ("energy",),
+) -> pd.DataFrame:
+    """
+    Collapse long-format rows (timestamp, metric, value, zone_id) into one
+    building-level row per timestamp.
+
+    Metrics in ``sum_metrics`` are summed across zones, every other metric
+    is averaged. Metrics with no reading at a timestamp are filled with 0.0.
+
+    Returns:
+        DataFrame with columns: timestamp, *metrics (sorted by timestamp)
+    """
+    if df.empty:
+        return pd.DataFrame(columns=["timestamp", *metrics])
+
+    values = pd.to_numeric(df["value"], errors="coerce")
+    grouped = values.groupby([df["timestamp"], df["metric"]], sort=False)
+    sums = grouped.sum()
+    means = grouped.mean()
+
+    is_sum = sums.index.get_level_values("metric").isin(list(sum_metrics))
+    aggregated = means.where(~is_sum, sums)
+
+    wide = (
+        aggregated.unstack("metric")
+        .reindex(columns=metrics)
+        .fillna(0.0)
+        .astype("float64")
+        .sort_index()
+    )
+    wide.columns.name = None
+    return wide.rename_axis("timestamp").reset_index()
@@ -0,0 +1,92 @@
+"""
+Columnar DataFrame -> JSON-ready records.
+
+Building response rows with ``df.iterrows()`` boxes every row into a Series
+and converts each cell one at a time, which dominates large responses. These
+helpers convert each column once (NumPy ``tolist`` yields native floats, ints
+and bools; datetimes are formatted in one vectorized pass) and then zip the
+columns into row dicts.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def isoformat_column(values: Any) -> List[Optional[str]]:
+    """
+    Format timestamps as ISO-8601 strings, matching ``Timestamp.isoformat()``.
+
+    Second-resolution naive or UTC timestamps (everything our telemetry
+    produces) are formatted with ``np.datetime_as_string``; anything else
+    (sub-second values, non-UTC offsets) falls back to per-element
+    ``isoformat``. NaT becomes None.
+    """
+    index = pd.DatetimeIndex(values)
+    if len(index) == 0:
+        return []
+
+    suffix = ""
+    wall = index
+    if index.tz is not None:
+        wall = index.tz_localize(None)
+        if not np.array_equal(wall.asi8, index.tz_convert("UTC").tz_localize(None).asi8):
+            return _isoformat_slow(index)
+        suffix = "+00:00"
+
+    nat = index.isna()
+    ns = wall.asi8
+    if np.any((ns % 1_000_000_000 != 0) & ~nat):
+        return _isoformat_slow(index)
+
+    strings = np.datetime_as_string(wall.to_numpy().astype("datetime64[s]"), unit="s").tolist()
+    if nat.any():
+        return [None if missing else s + suffix for s, missing in zip(strings, nat.tolist())]
+    if suffix:
+        return [s + suffix for s in strings]
+    return strings
+
+
+def _isoformat_slow(index: pd.DatetimeIndex) -> List[Optional[str]]:
+    return [None if ts is pd.NaT else ts.isoformat() for ts in index]
+
+
+def column_values(values: Any, dtype: Any = None) -> List[Any]:
+    """
+    One column as a list of native Python values.
+
+    Datetime columns become ISO strings; numeric and bool columns go through
+    ``ndarray.tolist`` (optionally cast to ``dtype`` first, e.g. ``float`` for
+    fields the API declares as floats); anything else is listed as-is.
+    """
+    if dtype is None and pd.api.types.is_datetime64_any_dtype(values):
+        return isoformat_column(values)
+    array = np.asarray(values, dtype=dtype)
+    if array.dtype.kind == "M":
+        return isoformat_column(array)
+    return array.tolist()
+
+
+def records(columns: Mapping[str, Any], length: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Zip columns into a list of row dicts.
+
+    Each value in ``columns`` is either a list (see ``column_values``) or a
+    scalar repeated on every row; ``length`` is required when all values are
+    scalars.
+    """
+    keys = list(columns)
+    lists = [value for value in columns.values() if isinstance(value, list)]
+    if length is None:
+        if not lists:
+            raise ValueError("records() needs a length when every column is a scalar")
+        length = len(lists[0])
+    for value in lists:
+        if len(value) != length:
+            raise ValueError(f"Column lengths differ: {len(value)} != {length}")
+
+    cols = [value if isinstance(value, list) else [value] * length for value in columns.values()]
+    return [dict(zip(keys, row)) for row in zip(*cols)]
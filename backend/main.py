@@ -1,4 +1,7 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import os
 import logging
@@ -6,6 +9,13 @@ import os
 from dotenv import load_dotenv
 
 from api.api_gateway import include_api_routes
+from core.services.dashboard_service import dashboard_snapshots, shutdown_stage_executor
+from core.services.forecast_scheduler import forecast_precompute
+from core.services.influxdb_service import shutdown_query_executor
+from core.services.model_warmup import model_warmup
+from core.services.telemetry_writer import telemetry_writer
+from core.utils.config import get_settings
+from core.utils.fast_json import FastJSONResponse
 
 # Configure logging
 logging.basicConfig(
@@ -19,6 +29,30 @@ env_file = '.env.local' if os.path.exists('.env.local') else '.env'
 load_dotenv(env_file)
 logger.info(f"Environment variables loaded from {env_file}")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown hooks for long-lived resources."""
+    # Warm models in the background so /health answers immediately;
+    # /ready reports 503 until every model is loaded and probed, and stays
+    # 503 if a required model could not be loaded.
+    if get_settings().warmup_enabled:
+        app.state.warmup_task = asyncio.create_task(asyncio.to_thread(model_warmup.warm_up))
+    else:
+        model_warmup.disable()
+    # Reopen the write buffer if a previous lifespan closed it
+    telemetry_writer.start()
+    dashboard_snapshots.start()
+    forecast_precompute.start()
+    yield
+    await forecast_precompute.stop()
+    await dashboard_snapshots.stop()
+    # Flush buffered telemetry before the worker exits
+    telemetry_writer.close()
+    shutdown_stage_executor()
+    shutdown_query_executor()
+    logger.info("InfluxDB query pool stopped")
+
+
 def create_app() -> FastAPI:
     """
     Application factory for the digital twin backend.
@@ -31,6 +65,8 @@ def create_app() -> FastAPI:
             "Backend for a smart-building digital twin that simulates, "
             "detects anomalies, and suggests energy/comfort optimizations."
         ),
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
     )
 
     # Configure CORS based on environment
@@ -43,6 +79,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag"],  # Read by the frontend for If-None-Match polling
     )
 
     include_api_routes(app)
@@ -58,6 +95,7 @@ def create_app() -> FastAPI:
             "endpoints": {
                 "docs": "/docs",
                 "health": "/health",
+                "ready": "/ready",
                 "simulation": "/simulation",
                 "anomalies": "/anomalies",
                 "suggestions": "/suggestions",
@@ -71,6 +109,12 @@ def create_app() -> FastAPI:
     async def health_check() -> dict:
         return {"status": "ok"}
 
+    @app.get("/ready", tags=["system"])
+    async def readiness_check() -> JSONResponse:
+        """Readiness probe: 503 until model warmup finishes or if a required model failed."""
+        report = model_warmup.report()
+        return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
     return app
 
 
@@ -0,0 +1,136 @@
+"""
+POST /detect/batch: one scoring call per group, results split back per query.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routes import anomaly_routes
+from core.anomaly_engine import streaming_scorer
+from core.anomaly_engine.streaming_scorer import FEATURE_COLS, IncrementalAnomalyScorer
+
+
+def _window(start, end, offset):
+    """Feature frame whose energy identifies the building (offset) and the hour."""
+    index = pd.date_range(start, end, freq="1h", inclusive="left")
+    df = pd.DataFrame(0.0, index=index, columns=FEATURE_COLS)
+    df["energy"] = offset + index.hour.to_numpy(dtype=np.float64)
+    df["temperature"] = 20.0 + df["energy"] / 100.0
+    return df
+
+
+@pytest.fixture
+def client(monkeypatch):
+    batches = []
+    model_calls = []
+
+    def load_feature_frame(query):
+        offset = 1000.0 if query.building_id == "b2" else 0.0
+        synthetic = query.building_id.startswith("synthetic")
+        return _window(query.start_time, query.end_time, offset), synthetic
+
+    def autoencoder(df, cols):
+        model_calls.append(("autoencoder", len(df)))
+        return pd.Series(df["energy"].to_numpy(), index=df.index)
+
+    def isolation_forest(df, cols):
+        model_calls.append(("isolation_forest", len(df)))
+        return pd.Series(df["temperature"].to_numpy(), index=df.index)
+
+    def score_batch(frames, source="default"):
+        batches.append((source, {b: len(df) for b, df in frames.items()}))
+        return scorer.score_batch(frames, source)
+
+    scorer = IncrementalAnomalyScorer()
+    monkeypatch.setattr(streaming_scorer, "autoencoder_reconstruction_error", autoencoder)
+    monkeypatch.setattr(streaming_scorer, "isolation_forest_scores", isolation_forest)
+    monkeypatch.setattr(anomaly_routes, "_load_feature_frame", load_feature_frame)
+    monkeypatch.setattr(anomaly_routes.anomaly_scorer, "score_batch", score_batch)
+
+    app = FastAPI()
+    app.include_router(anomaly_routes.router)
+    test_client = TestClient(app)
+    test_client.batches = batches
+    test_client.model_calls = model_calls
+    return test_client
+
+
+def _query(building_id, start, end, metric="energy"):
+    return {"building_id": building_id, "metric": metric, "start_time": start, "end_time": end}
+
+
+def test_results_are_split_back_per_query_in_order(client):
+    queries = [
+        _query("b1", "2024-01-01T00:00:00", "2024-01-01T04:00:00"),
+        _query("b2", "2024-01-01T02:00:00", "2024-01-01T05:00:00"),
+        _query("b1", "2024-01-01T02:00:00", "2024-01-01T06:00:00"),  # overlaps the first b1 window
+    ]
+    response = client.post("/detect/batch", json={"queries": queries})
+    assert response.status_code == 200
+    results = response.json()
+
+    assert [(r["building_id"], r["start_time"]) for r in results] == [
+        (q["building_id"], q["start_time"]) for q in queries
+    ]
+    assert [p["value"] for p in results[0]["points"]] == [0.0, 1.0, 2.0, 3.0]
+    assert [p["value"] for p in results[1]["points"]] == [1002.0, 1003.0, 1004.0]
+    assert [p["value"] for p in results[2]["points"]] == [2.0, 3.0, 4.0, 5.0]
+    assert results[2]["points"][0]["timestamp"].startswith("2024-01-01T02:00:00")
+
+    # One scoring call for all real windows, both b1 windows concatenated
+    assert client.batches == [("detect", {"b1": 8, "b2": 3})]
+
+
+def test_overlapping_windows_get_the_same_scores(client):
+    queries = [
+        _query("b1", "2024-01-01T00:00:00", "2024-01-01T04:00:00"),
+        _query("b1", "2024-01-01T02:00:00", "2024-01-01T06:00:00"),
+    ]
+    first, second = client.post("/detect/batch", json={"queries": queries}).json()
+
+    by_time = {p["timestamp"]: p["score"] for p in first["points"]}
+    for point in second["points"]:
+        if point["timestamp"] in by_time:
+            assert point["score"] == by_time[point["timestamp"]]
+
+
+def test_synthetic_windows_are_scored_statelessly(client):
+    queries = [
+        _query("b1", "2024-01-01T00:00:00", "2024-01-01T02:00:00"),
+        _query("synthetic", "2024-01-01T00:00:00", "2024-01-01T03:00:00"),
+    ]
+    results = client.post("/detect/batch", json={"queries": queries}).json()
+
+    assert len(results[0]["points"]) == 2
+    assert len(results[1]["points"]) == 3
+    assert sorted(client.batches, key=lambda b: str(b[0])) == [
+        (None, {"synthetic": 3}),
+        ("detect", {"b1": 2}),
+    ]
+
+
+def test_synthetic_buildings_share_one_call_per_model(client):
+    queries = [
+        _query("synthetic-1", "2024-01-01T00:00:00", "2024-01-01T02:00:00"),
+        _query("synthetic-2", "2024-01-01T00:00:00", "2024-01-01T03:00:00"),
+        _query("synthetic-3", "2024-01-01T01:00:00", "2024-01-01T05:00:00"),
+    ]
+    results = client.post("/detect/batch", json={"queries": queries}).json()
+
+    assert [len(r["points"]) for r in results] == [2, 3, 4]
+    assert client.model_calls == [("autoencoder", 9), ("isolation_forest", 9)]
+
+
+def test_empty_batch_returns_empty_list(client):
+    response = client.post("/detect/batch", json={"queries": []})
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_batch_over_limit_is_rejected(client):
+    limit = anomaly_routes.settings.anomaly_batch_max_queries
+    queries = [_query("b1", "2024-01-01T00:00:00", "2024-01-01T01:00:00")] * (limit + 1)
+    assert client.post("/detect/batch", json={"queries": queries}).status_code == 400
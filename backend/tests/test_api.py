@@ -0,0 +1,54 @@
+"""
+API application tests.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Cold-start budget for importing the app and calling create_app(). Importing
+# TensorFlow alone takes several seconds, so this fails if it creeps back in.
+IMPORT_BUDGET_SECONDS = 3.0
+
+# Loaded on first inference / warmup only, never at app import
+HEAVY_MODULES = ("tensorflow", "keras", "sklearn", "joblib", "huggingface_hub")
+
+
+@pytest.fixture(scope="module")
+def cold_start():
+    """Import main and build the app in a fresh interpreter; report time and heavy imports."""
+    probe = "\n".join([
+        "import json, sys, time",
+        "start = time.perf_counter()",
+        "from main import create_app",
+        "create_app()",
+        "elapsed = time.perf_counter() - start",
+        f"loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]",
+        "print(json.dumps({'elapsed': elapsed, 'loaded': loaded}))",
+    ])
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_create_app_does_not_import_ml_frameworks(cold_start):
+    assert cold_start["loaded"] == []
+
+
+def test_create_app_within_import_budget(cold_start):
+    assert cold_start["elapsed"] < IMPORT_BUDGET_SECONDS, (
+        f"create_app() cold start took {cold_start['elapsed']:.2f}s "
+        f"(budget {IMPORT_BUDGET_SECONDS:.1f}s)"
+    )
@@ -0,0 +1,212 @@
+"""
+TTLCache: LRU eviction, expiry and single-flight loading.
+"""
+
+import threading
+import time
+
+import pytest
+
+from core.utils.cache import TTLCache
+
+
+def test_get_returns_stored_value_and_counts_lookups():
+    cache = TTLCache(maxsize=4, ttl_seconds=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache(maxsize=4, ttl_seconds=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl_seconds=60)
+    time.sleep(0.1)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_get_or_compute_caches_loader_result():
+    cache = TTLCache(maxsize=4, ttl_seconds=60)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return "value"
+
+    assert cache.get_or_compute("k", loader) == "value"
+    assert cache.get_or_compute("k", loader) == "value"
+    assert len(calls) == 1
+
+
+def test_should_cache_rejects_result_without_storing():
+    cache = TTLCache(maxsize=4, ttl_seconds=60)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {"synthetic": True}
+
+    for _ in range(2):
+        cache.get_or_compute("k", loader, should_cache=lambda v: not v["synthetic"])
+    assert len(calls) == 2
+    assert cache.stats()["size"] == 0
+
+
+def test_concurrent_misses_run_loader_once():
+    cache = TTLCache(maxsize=4, ttl_seconds=60)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return "value"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("k", loader)))
+    leader.start()
+    assert started.wait(timeout=5)
+
+    followers = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("k", loader)))
+        for _ in range(4)
+    ]
+    for t in followers:
+        t.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for t in [leader, *followers]:
+        t.join(timeout=5)
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["in_flight"]) == (1, 4, 0)
+
+
+def test_loader_error_reaches_waiters_and_is_not_cached():
+    cache = TTLCache(maxsize=4, ttl_seconds=60)
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing_loader():
+        started.set()
+        release.wait(timeout=5)
+        raise RuntimeError("influx down")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_compute("k", failing_loader)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    assert started.wait(timeout=5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    leader.join(timeout=5)
+    follower.join(timeout=5)
+
+    assert errors == ["influx down", "influx down"]
+    assert cache.get_or_compute("k", lambda: "recovered") == "recovered"
+
+
+def test_invalidate_by_predicate():
+    cache = TTLCache(maxsize=8, ttl_seconds=60)
+    for key in [("b1", 1), ("b1", 2), ("b2", 1)]:
+        cache.set(key, key)
+
+    assert cache.invalidate(lambda k: k[0] == "b1") == 2
+    assert cache.stats()["size"] == 1
+    assert cache.get(("b2", 1)) == ("b2", 1)
+
+
+def test_get_or_compute_many_loads_only_misses_in_one_call():
+    cache = TTLCache(maxsize=8, ttl_seconds=60)
+    cache.set("a", 1)
+    calls = []
+
+    def loader(keys):
+        calls.append(keys)
+        return {k: k.upper() for k in keys}
+
+    assert cache.get_or_compute_many(["b", "a", "c", "b"], loader) == {"b": "B", "a": 1, "c": "C"}
+    assert calls == [["b", "c"]]
+    assert cache.get_or_compute_many(["a", "b", "c"], loader) == {"a": 1, "b": "B", "c": "C"}
+    assert len(calls) == 1
+
+
+def test_get_or_compute_many_waits_for_in_flight_keys():
+    cache = TTLCache(maxsize=8, ttl_seconds=60)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_loader():
+        started.set()
+        release.wait(timeout=5)
+        return "A"
+
+    leader = threading.Thread(target=lambda: cache.get_or_compute("a", slow_loader))
+    leader.start()
+    assert started.wait(timeout=5)
+
+    calls, results = [], []
+
+    def batch():
+        results.append(cache.get_or_compute_many(["a", "b"], lambda keys: calls.append(keys) or {k: k.upper() for k in keys}))
+
+    follower = threading.Thread(target=batch)
+    follower.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    leader.join(timeout=5)
+    follower.join(timeout=5)
+
+    assert calls == [["b"]]
+    assert results == [{"a": "A", "b": "B"}]
+    assert cache.stats()["in_flight"] == 0
+
+
+def test_get_or_compute_many_error_is_not_cached():
+    cache = TTLCache(maxsize=8, ttl_seconds=60)
+
+    def failing(keys):
+        raise RuntimeError("influx down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute_many(["a", "b"], failing)
+    assert cache.stats()["in_flight"] == 0
+    assert cache.get_or_compute_many(["a"], lambda keys: {"a": 1}, should_cache=lambda v: v > 1) == {"a": 1}
+    assert cache.get("a") is None
@@ -0,0 +1,117 @@
+"""
+InfluxDB circuit breaker state machine.
+"""
+
+import time
+
+import pytest
+import urllib3
+from influxdb_client.rest import ApiException
+
+from core.services.influxdb_service import (
+    CircuitOpenError,
+    InfluxCircuitBreaker,
+    is_transport_error,
+)
+
+
+def _connection_error():
+    return urllib3.exceptions.NewConnectionError(None, "connection refused")
+
+
+def _fail(error):
+    def func():
+        raise error
+    return func
+
+
+def _wait_for_state(breaker, state, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while breaker.state != state and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return breaker.state
+
+
+@pytest.mark.parametrize("error, expected", [
+    (_connection_error(), True),
+    (urllib3.exceptions.ReadTimeoutError(None, "/api/v2/query", "read timed out"), True),
+    (TimeoutError(), True),
+    (ConnectionRefusedError(), True),
+    (ApiException(status=503), True),
+    (ApiException(status=400), False),
+    (ValueError("bad flux"), False),
+    (KeyError("_value"), False),
+])
+def test_is_transport_error(error, expected):
+    assert is_transport_error(error) is expected
+
+
+def test_opens_after_threshold_transport_failures():
+    breaker = InfluxCircuitBreaker(failure_threshold=3, reset_timeout_seconds=60, probe=lambda: True)
+    for _ in range(2):
+        with pytest.raises(urllib3.exceptions.HTTPError):
+            breaker.call(_fail(_connection_error()))
+        assert breaker.state == InfluxCircuitBreaker.CLOSED
+
+    with pytest.raises(urllib3.exceptions.HTTPError):
+        breaker.call(_fail(_connection_error()))
+    assert breaker.state == InfluxCircuitBreaker.OPEN
+    assert breaker.snapshot()["times_opened"] == 1
+
+
+def test_open_circuit_fails_fast_without_calling():
+    breaker = InfluxCircuitBreaker(failure_threshold=1, reset_timeout_seconds=60, probe=lambda: True)
+    with pytest.raises(urllib3.exceptions.HTTPError):
+        breaker.call(_fail(_connection_error()))
+
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: calls.append(1))
+    assert calls == []
+    assert breaker.snapshot()["rejected_calls"] == 1
+
+
+def test_non_transport_errors_do_not_count():
+    breaker = InfluxCircuitBreaker(failure_threshold=1, reset_timeout_seconds=60, probe=lambda: True)
+    for error in (ValueError("bad flux"), ApiException(status=400), KeyError("_value")):
+        with pytest.raises(type(error)):
+            breaker.call(_fail(error))
+    assert breaker.state == InfluxCircuitBreaker.CLOSED
+    assert breaker.snapshot()["consecutive_failures"] == 0
+
+
+def test_success_resets_consecutive_failures():
+    breaker = InfluxCircuitBreaker(failure_threshold=2, reset_timeout_seconds=60, probe=lambda: True)
+    with pytest.raises(urllib3.exceptions.HTTPError):
+        breaker.call(_fail(_connection_error()))
+    assert breaker.call(lambda: "ok") == "ok"
+    with pytest.raises(urllib3.exceptions.HTTPError):
+        breaker.call(_fail(_connection_error()))
+    assert breaker.state == InfluxCircuitBreaker.CLOSED
+
+
+def test_successful_probe_closes_circuit():
+    breaker = InfluxCircuitBreaker(failure_threshold=1, reset_timeout_seconds=0, probe=lambda: True)
+    with pytest.raises(urllib3.exceptions.HTTPError):
+        breaker.call(_fail(_connection_error()))
+
+    # The first request after the timeout is rejected and starts the probe
+    assert breaker.allow_request() is False
+    assert _wait_for_state(breaker, InfluxCircuitBreaker.CLOSED) == InfluxCircuitBreaker.CLOSED
+    assert breaker.call(lambda: "ok") == "ok"
+
+
+def test_failed_probe_reopens_circuit_and_records_error():
+    def probe():
+        raise TimeoutError("ping timed out")
+
+    breaker = InfluxCircuitBreaker(failure_threshold=1, reset_timeout_seconds=60, probe=probe)
+    with pytest.raises(urllib3.exceptions.HTTPError):
+        breaker.call(_fail(_connection_error()))
+    with breaker._lock:
+        breaker._opened_at = time.monotonic() - 120  # reset timeout elapsed
+
+    assert breaker.allow_request() is False
+    assert _wait_for_state(breaker, InfluxCircuitBreaker.OPEN) == InfluxCircuitBreaker.OPEN
+    assert breaker.snapshot()["last_error"] == "ping timed out"
+    assert breaker.snapshot()["times_opened"] == 2  # re-opened from half-open
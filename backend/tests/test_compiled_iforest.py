@@ -0,0 +1,66 @@
+"""
+CompiledIsolationForest must score exactly like sklearn's IsolationForest.
+"""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest
+
+from core.anomaly_engine.compiled_iforest import CompiledIsolationForest
+from core.anomaly_engine.isolation_forest import _load_iforest
+
+
+def _data(n_samples, n_features, seed):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_samples, n_features))
+    X[:10] += 6.0  # a few clear outliers
+    return X
+
+
+@pytest.mark.parametrize("params", [
+    {"n_estimators": 50},
+    {"n_estimators": 30, "max_samples": 64},
+    {"n_estimators": 30, "max_features": 0.5},
+    {"n_estimators": 20, "max_features": 2, "bootstrap": True},
+])
+def test_scores_match_sklearn_exactly(params):
+    X_train = _data(512, 5, seed=0)
+    model = IsolationForest(random_state=42, **params).fit(X_train)
+    X = _data(1000, 5, seed=1)
+
+    expected = model.score_samples(X)
+    actual = CompiledIsolationForest(model).score_samples(X)
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_chunking_does_not_change_scores():
+    model = IsolationForest(n_estimators=25, random_state=0).fit(_data(256, 4, seed=0))
+    X = _data(777, 4, seed=2)
+
+    full = CompiledIsolationForest(model).score_samples(X)
+    chunked = CompiledIsolationForest(model, chunk_size=7, block_size=100).score_samples(X)
+    np.testing.assert_array_equal(chunked, full)
+
+
+def test_values_on_split_thresholds_match_sklearn():
+    # Integer-valued features put many samples exactly on a threshold
+    rng = np.random.default_rng(3)
+    X = rng.integers(0, 4, size=(400, 3)).astype(np.float64)
+    model = IsolationForest(n_estimators=40, random_state=1).fit(X)
+
+    np.testing.assert_array_equal(CompiledIsolationForest(model).score_samples(X), model.score_samples(X))
+
+
+def test_rejects_wrong_feature_count():
+    model = IsolationForest(n_estimators=5, random_state=0).fit(_data(64, 3, seed=0))
+    with pytest.raises(ValueError):
+        CompiledIsolationForest(model).score_samples(np.zeros((4, 2)))
+
+
+def test_shipped_model_matches_sklearn():
+    model = _load_iforest()
+    if model is None:
+        pytest.skip("isolation_forest.pkl not available")
+    X = _data(500, model.n_features_in_, seed=4)
+
+    np.testing.assert_array_equal(CompiledIsolationForest(model).score_samples(X), model.score_samples(X))
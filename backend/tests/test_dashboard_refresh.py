@@ -0,0 +1,90 @@
+"""
+Dashboard snapshot refresh: only stored telemetry is merged into the cached window.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+from core.services import dashboard_service
+from core.services import timeseries_service as timeseries_module
+from core.services.dashboard_service import ANOMALY_COLUMNS, DashboardSnapshotService
+
+
+NOW = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+
+
+class FakeWideInflux:
+    """Stands in for ``query_time_series_wide``: constant readings, or empty/failing on demand."""
+
+    def __init__(self):
+        self.mode = "rows"
+        self.energy = 10.0
+
+    def __call__(self, building_id, zone_id, metrics, start_time, end_time, resolution_minutes, zone_agg, raise_errors):
+        if self.mode == "fail":
+            if raise_errors:
+                raise ConnectionError("influx down")
+            return pd.DataFrame()
+        if self.mode == "empty":
+            return pd.DataFrame()
+        timestamps = pd.date_range(start_time, end_time, freq=f"{resolution_minutes}min")
+        frame = pd.DataFrame({"timestamp": timestamps})
+        for metric in metrics:
+            frame[metric] = 1.0
+        frame["energy"] = self.energy
+        return frame
+
+
+@pytest.fixture
+def influx(monkeypatch):
+    fake = FakeWideInflux()
+    monkeypatch.setattr(timeseries_module, "query_time_series_wide", fake)
+    monkeypatch.setattr(dashboard_service, "_load_suggestions", lambda building_id: [])
+    monkeypatch.setattr(dashboard_service.data_service, "get_building_info", lambda: {"building_id": "b1"})
+    monkeypatch.setattr(
+        dashboard_service, "_build_anomalies",
+        lambda building_id, base_df, display_df=None: pd.DataFrame(columns=ANOMALY_COLUMNS),
+    )
+    return fake
+
+
+def _build_and_refresh(influx, mode):
+    service = DashboardSnapshotService(window_hours=6)
+
+    async def run():
+        snapshot = await service._build_full("b1", NOW)
+        influx.mode = mode
+        influx.energy = 20.0
+        return snapshot, await service._refresh(snapshot, NOW + timedelta(minutes=15))
+
+    return asyncio.run(run())
+
+
+def test_refresh_merges_new_stored_rows(influx):
+    snapshot, refreshed = _build_and_refresh(influx, "rows")
+
+    assert refreshed.watermark > snapshot.watermark
+    assert refreshed.frame["timestamp"].is_unique
+    assert refreshed.frame["energy"].iloc[-1] == 20.0
+    assert refreshed.payload["degraded"] == []
+
+
+def test_empty_refresh_keeps_the_stored_window(influx):
+    snapshot, refreshed = _build_and_refresh(influx, "empty")
+
+    assert refreshed.watermark == snapshot.watermark
+    assert set(refreshed.frame["timestamp"]) <= set(snapshot.frame["timestamp"])
+    # No synthetic rows merged in
+    assert (refreshed.frame["energy"] == 10.0).all()
+    assert refreshed.payload["degraded"] == []
+
+
+def test_failed_refresh_serves_the_stored_window_as_degraded(influx):
+    snapshot, refreshed = _build_and_refresh(influx, "fail")
+
+    assert refreshed.watermark == snapshot.watermark
+    pd.testing.assert_frame_equal(refreshed.frame, snapshot.frame)
+    assert refreshed.payload["degraded"] == ["telemetry"]
@@ -0,0 +1,106 @@
+"""
+Dashboard payload stages: overlap with the telemetry load, keep CPU work off the Influx pool.
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+from core.services import dashboard_service
+from core.services.dashboard_service import ANOMALY_COLUMNS, DashboardSnapshotService
+
+STAGE_SECONDS = 0.3
+
+
+@pytest.fixture
+def stages(monkeypatch):
+    threads = {}
+
+    def load_frame(building_id, start_time, end_time, use_cache=True, fallback=True):
+        threads["telemetry"] = threading.current_thread().name
+        time.sleep(STAGE_SECONDS)
+        timestamps = pd.date_range(end=end_time, periods=8, freq="15min")
+        return pd.DataFrame({
+            "timestamp": timestamps,
+            "energy": 10.0,
+            "temperature": 21.0,
+            "humidity": 50.0,
+            "occupancy": 0.5,
+        })
+
+    def recent_metrics(building_id):
+        threads["suggestions_query"] = threading.current_thread().name
+        time.sleep(STAGE_SECONDS)
+        return pd.DataFrame()
+
+    def suggestions(building_id, recent=None):
+        assert recent is not None
+        threads["suggestions"] = threading.current_thread().name
+        return [{"estimated_savings_kwh": 1.0}]
+
+    def building_info():
+        threads["building"] = threading.current_thread().name
+        return {"building_id": "b1", "name": "Test"}
+
+    def anomalies(building_id, base_df, display_df=None):
+        threads["anomalies"] = threading.current_thread().name
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+
+    monkeypatch.setattr(dashboard_service, "load_dashboard_frame", load_frame)
+    monkeypatch.setattr(dashboard_service.suggestion_engine, "load_recent_metrics", recent_metrics)
+    monkeypatch.setattr(dashboard_service.suggestion_engine, "generate_suggestions", suggestions)
+    monkeypatch.setattr(dashboard_service.data_service, "get_building_info", building_info)
+    monkeypatch.setattr(dashboard_service, "_build_anomalies", anomalies)
+    return threads
+
+
+def test_context_stages_overlap_the_telemetry_load(stages):
+    service = DashboardSnapshotService()
+
+    async def build():
+        start = time.perf_counter()
+        snapshot = await service._build_full("b1", datetime.now(timezone.utc))
+        return snapshot, time.perf_counter() - start
+
+    snapshot, elapsed = asyncio.run(build())
+
+    assert snapshot.payload["degraded"] == []
+    assert snapshot.payload["building"]["name"] == "Test"
+    assert snapshot.payload["kpis"]["potential_savings_kwh"] == 1.0
+    # Sequential would take two stage durations
+    assert elapsed < 1.7 * STAGE_SECONDS
+
+
+def test_only_influx_queries_run_on_the_influx_pool(stages):
+    asyncio.run(DashboardSnapshotService()._build_full("b1", datetime.now(timezone.utc)))
+
+    assert stages["telemetry"].startswith("influx-query")
+    assert stages["suggestions_query"].startswith("influx-query")
+    for name in ("suggestions", "building", "anomalies"):
+        assert stages[name].startswith("dashboard-stage")
+
+
+def test_timed_out_stage_degrades_payload(stages, monkeypatch):
+    monkeypatch.setattr(dashboard_service.settings, "dashboard_suggestions_timeout_seconds", 0.05)
+    snapshot = asyncio.run(DashboardSnapshotService()._build_full("b1", datetime.now(timezone.utc)))
+
+    assert snapshot.payload["degraded"] == ["suggestions"]
+    assert snapshot.payload["partial"] is True
+    assert snapshot.payload["suggestions"] == []
+
+
+def test_refresh_starts_context_before_the_load(stages):
+    service = DashboardSnapshotService()
+
+    async def run():
+        now = datetime.now(timezone.utc)
+        snapshot = await service._build_full("b1", now)
+        start = time.perf_counter()
+        await service._refresh(snapshot, now + timedelta(minutes=15))
+        return time.perf_counter() - start
+
+    assert asyncio.run(run()) < 1.7 * STAGE_SECONDS
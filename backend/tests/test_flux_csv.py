@@ -0,0 +1,88 @@
+"""
+Raw Flux CSV parsing into long and wide DataFrames.
+"""
+
+import csv
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.services.influxdb_service import _parse_long_format, _parse_wide_format
+
+
+# Two table blocks, as returned with RAW_CSV_DIALECT (header per table, blank line between)
+LONG_CSV = """\
+,result,table,_start,_stop,_time,_value,_field,_measurement,building_id,zone_id
+,_result,0,2024-01-01T00:00:00Z,2024-01-01T02:00:00Z,2024-01-01T00:15:00Z,21.5,value,temperature,b1,z1
+,_result,0,2024-01-01T00:00:00Z,2024-01-01T02:00:00Z,2024-01-01T00:30:00Z,21.75,value,temperature,b1,z1
+
+,result,table,_start,_stop,_time,_value,_field,_measurement,building_id,zone_id
+,_result,1,2024-01-01T00:00:00Z,2024-01-01T02:00:00Z,2024-01-01T00:15:00Z,,value,energy,b1,z2
+,_result,1,2024-01-01T00:00:00Z,2024-01-01T02:00:00Z,2024-01-01T00:30:00.5Z,3.25,value,energy,b1,z2
+"""
+
+WIDE_CSV = """\
+,result,table,_time,building_id,energy,temperature
+,_result,0,2024-01-01T01:00:00Z,b1,120.5,21.0
+,_result,0,2024-01-01T02:00:00Z,b1,,21.5
+"""
+
+ERROR_CSV = """\
+,result,table,_time,_value,_measurement,zone_id
+,_result,0,2024-01-01T00:15:00Z,1.0,energy,z1
+
+error,reference
+query terminated: memory limit exceeded,897
+"""
+
+
+def _rows(text):
+    return csv.reader(io.StringIO(text))
+
+
+def test_parse_long_format():
+    df = _parse_long_format(_rows(LONG_CSV))
+
+    assert list(df.columns) == ["timestamp", "metric", "value", "zone_id"]
+    assert df["metric"].tolist() == ["temperature", "temperature", "energy", "energy"]
+    assert df["zone_id"].tolist() == ["z1", "z1", "z2", "z2"]
+    np.testing.assert_array_equal(df["value"].to_numpy(), [21.5, 21.75, np.nan, 3.25])
+    assert df["value"].dtype == np.float64
+    assert df["timestamp"].tolist() == [
+        pd.Timestamp("2024-01-01T00:15:00Z"),
+        pd.Timestamp("2024-01-01T00:30:00Z"),
+        pd.Timestamp("2024-01-01T00:15:00Z"),
+        pd.Timestamp("2024-01-01T00:30:00.5Z"),
+    ]
+
+
+def test_parse_long_format_shares_tag_strings():
+    df = _parse_long_format(_rows(LONG_CSV))
+    assert df["metric"].iloc[0] is df["metric"].iloc[1]
+
+
+def test_parse_wide_format():
+    df = _parse_wide_format(_rows(WIDE_CSV), ["energy", "temperature", "humidity"])
+
+    assert list(df.columns) == ["timestamp", "energy", "temperature", "humidity"]
+    np.testing.assert_array_equal(df["energy"].to_numpy(), [120.5, np.nan])
+    np.testing.assert_array_equal(df["temperature"].to_numpy(), [21.0, 21.5])
+    # A metric missing from the result comes back as all-NaN
+    assert df["humidity"].isna().all()
+    assert str(df["timestamp"].dt.tz) == "UTC"
+
+
+@pytest.mark.parametrize("parse", [
+    _parse_long_format,
+    lambda rows: _parse_wide_format(rows, ["energy"]),
+])
+def test_empty_result_gives_empty_frame(parse):
+    assert parse(_rows("")).empty
+    assert parse(_rows(",result,table,_time,_value,_measurement,zone_id\n")).empty
+
+
+def test_mid_stream_error_table_raises():
+    with pytest.raises(RuntimeError, match="memory limit exceeded"):
+        _parse_long_format(_rows(ERROR_CSV))
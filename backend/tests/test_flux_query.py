@@ -0,0 +1,70 @@
+"""
+Server-side pivot/aggregation Flux query built for building-level (wide) metrics.
+"""
+
+import re
+
+import pytest
+
+from core.services.influxdb_service import _build_wide_flux_query, query_time_series_wide, settings
+
+
+START = "2024-01-01T00:00:00+00:00"
+END = "2024-01-02T00:00:00+00:00"
+
+
+def _query(zone_id=None, metrics=("energy", "temperature", "occupancy"), zone_agg=None):
+    return _build_wide_flux_query(
+        "b1", zone_id, list(metrics), START, END, 15, zone_agg if zone_agg is not None else {"energy": "sum"}
+    )
+
+
+def _compact(flux):
+    return re.sub(r"\s+", " ", flux).strip()
+
+
+def test_range_and_building_filter():
+    flux = _compact(_query())
+
+    assert f'from(bucket: "{settings.influxdb_bucket}")' in flux
+    assert f'range(start: time(v: "{START}"), stop: time(v: "{END}"))' in flux
+    assert 'filter(fn: (r) => r["building_id"] == "b1")' in flux
+    assert 'r["zone_id"]' not in flux
+    assert "aggregateWindow(every: 15m, fn: mean, createEmpty: false)" in flux
+
+
+def test_zone_filter_is_added_for_a_zone():
+    assert 'filter(fn: (r) => r["zone_id"] == "z7")' in _compact(_query(zone_id="z7"))
+
+
+def test_metrics_are_split_by_zone_aggregate_and_unioned():
+    flux = _compact(_query())
+
+    assert 'r["_measurement"] == "energy" or r["_measurement"] == "temperature" or r["_measurement"] == "occupancy"' in flux
+    assert 'sum_by_time = data |> filter(fn: (r) => r["_measurement"] == "energy") |> group(columns: ["_time", "_measurement"]) |> sum()' in flux
+    assert (
+        'mean_by_time = data |> filter(fn: (r) => r["_measurement"] == "temperature" or r["_measurement"] == "occupancy")'
+        ' |> group(columns: ["_time", "_measurement"]) |> mean()'
+    ) in flux
+    assert "union(tables: [sum_by_time, mean_by_time])" in flux
+
+
+def test_single_aggregate_unions_one_stream():
+    flux = _compact(_query(metrics=["temperature", "humidity"], zone_agg={}))
+
+    assert "sum_by_time" not in flux
+    assert "union(tables: [mean_by_time])" in flux
+
+
+def test_result_is_pivoted_to_one_row_per_timestamp():
+    flux = _compact(_query())
+
+    assert flux.endswith(
+        '|> group() |> pivot(rowKey: ["_time"], columnKey: ["_measurement"], valueColumn: "_value")'
+        ' |> sort(columns: ["_time"]) |> yield(name: "wide")'
+    )
+
+
+def test_unknown_zone_aggregate_is_rejected():
+    with pytest.raises(ValueError):
+        query_time_series_wide("b1", None, ["energy"], None, None, zone_agg={"energy": "max"})
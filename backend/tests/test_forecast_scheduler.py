@@ -0,0 +1,158 @@
+"""
+Forecast precompute: which buildings and horizons one run warms in the forecast cache.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from core.services import forecast_scheduler, forecasting_service
+from core.services.forecast_scheduler import ForecastPrecomputeService
+
+
+HOUR = datetime(2024, 3, 4, 10)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def dashboards(monkeypatch):
+    monkeypatch.setattr(forecast_scheduler.dashboard_snapshots, "buildings", lambda: ["dash"])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(forecast_scheduler, "time", SimpleNamespace(
+        monotonic=clock, perf_counter=time.perf_counter, time=time.time,
+    ))
+    return clock
+
+
+@pytest.fixture
+def models(monkeypatch):
+    """Model forecasts without Influx or the LSTMs; records what each run computes."""
+    calls = {"energy": [], "occupancy": []}
+
+    def energy(building_ids, horizon_hours, start_time, histories):
+        calls["energy"].append((list(building_ids), horizon_hours))
+        return {b: {"forecast": [], "model_available": True, "horizon_hours": horizon_hours} for b in building_ids}
+
+    def occupancy(building_id, horizon_hours, start_time):
+        calls["occupancy"].append((building_id, horizon_hours))
+        return {"forecast": [], "model_available": True, "horizon_hours": horizon_hours}
+
+    monkeypatch.setattr(forecasting_service, "current_hour_bucket", lambda: HOUR)
+    monkeypatch.setattr(forecasting_service.action_state_service, "get_version", lambda building_id: 0)
+    monkeypatch.setattr(forecasting_service, "_fetch_energy_histories", lambda ids, end_time: {})
+    monkeypatch.setattr(forecasting_service, "_compute_energy_forecasts", energy)
+    monkeypatch.setattr(forecasting_service, "_compute_occupancy_forecast", occupancy)
+    forecasting_service._forecast_cache.invalidate()
+    yield calls
+    forecasting_service._forecast_cache.invalidate()
+
+
+def _service(**kwargs):
+    options = dict(
+        buildings=["cfg"],
+        energy_horizons=[24, 48],
+        occupancy_horizons=[12],
+        batch_size=2,
+        idle_seconds=100.0,
+    )
+    options.update(kwargs)
+    return ForecastPrecomputeService(**options)
+
+
+def _warmed(buildings):
+    cache = forecasting_service._forecast_cache
+    return {
+        (kind, b, h)
+        for b in buildings
+        for kind, h, key in [
+            ("energy", 24, ("energy", b, 24, HOUR, 0)),
+            ("energy", 48, ("energy", b, 48, HOUR, 0)),
+            ("occupancy", 12, ("occupancy", b, 12, HOUR)),
+        ]
+        if cache.get(key) is not None
+    }
+
+
+def test_plan_orders_configured_dashboard_then_recent_requests(clock):
+    service = _service()
+    service.track("r1")
+    clock.now += 10
+    service.track("r2")
+    service.track("dash")
+
+    assert service._plan() == ["cfg", "dash", "r2", "r1"]
+
+
+def test_idle_requested_buildings_expire(clock):
+    service = _service()
+    service.track("r1")
+    clock.now += 60
+    service.track("r2")
+    clock.now += 50  # r1 idle for 110s, r2 for 50s
+
+    assert service._plan() == ["cfg", "dash", "r2"]
+    assert service.stats()["tracked"] == 1
+
+
+def test_tracking_is_bounded_least_recent_first(clock):
+    service = _service(max_tracked=2)
+    for building_id in ("r1", "r2", "r3"):
+        service.track(building_id)
+        clock.now += 1
+
+    assert service._plan() == ["cfg", "dash", "r3", "r2"]
+
+
+def test_one_cycle_warms_every_planned_forecast(clock, models):
+    service = _service()
+    service.track("r1")
+    service.track("r2")
+    clock.now += 150  # both idle: dropped before the run
+    service.track("r3")
+
+    summary = asyncio.run(service.precompute())
+
+    assert (summary["buildings"], summary["forecasts"], summary["model_forecasts"]) == (3, 9, 9)
+    assert summary["failed_jobs"] == 0
+    assert sorted(models["energy"]) == [(["cfg", "dash"], 24), (["cfg", "dash"], 48), (["r3"], 24), (["r3"], 48)]
+    assert sorted(models["occupancy"]) == [("cfg", 12), ("dash", 12), ("r3", 12)]
+    assert _warmed(["cfg", "dash", "r3"]) == {
+        (kind, b, h) for b in ("cfg", "dash", "r3") for kind, h in [("energy", 24), ("energy", 48), ("occupancy", 12)]
+    }
+    assert _warmed(["r1", "r2"]) == set()
+
+
+def test_run_is_truncated_to_what_the_cache_holds(clock, models):
+    service = _service(cache_capacity=7)  # 3 forecasts per building: room for 2
+    service.track("r1")
+
+    summary = asyncio.run(service.precompute())
+
+    assert (summary["buildings"], summary["forecasts"]) == (2, 6)
+    assert {b for b, _ in models["occupancy"]} == {"cfg", "dash"}
+    assert _warmed(["r1"]) == set()
+
+
+def test_second_cycle_in_the_same_hour_is_served_from_cache(clock, models):
+    service = _service()
+    asyncio.run(service.precompute())
+    computed = (len(models["energy"]), len(models["occupancy"]))
+
+    summary = asyncio.run(service.precompute())
+
+    assert (len(models["energy"]), len(models["occupancy"])) == computed
+    assert summary["model_forecasts"] == summary["forecasts"]
@@ -0,0 +1,222 @@
+"""
+Energy/occupancy forecasting: rolled-out horizons, confidence bands, synthetic
+fallbacks and the batched portfolio path.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from core.services import forecasting_service
+from core.services.forecasting_service import (
+    FORECAST_HORIZON,
+    SEQUENCE_LENGTH,
+    _energy_confidence_ratios,
+    _rollout_energy_forecast,
+)
+
+
+HOUR = datetime(2024, 3, 4, 10)
+
+
+class BlockModel:
+    """Energy model stand-in: each call predicts a fixed block and records its input window."""
+
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.windows = []
+
+    def predict(self, window, verbose=0):
+        self.windows.append(window.copy())
+        return np.tile(self.values, (window.shape[0], 1))
+
+
+def _history(n_buildings=2):
+    return np.zeros((n_buildings, SEQUENCE_LENGTH, 3))
+
+
+@pytest.mark.parametrize("horizon, calls", [(1, 1), (24, 1), (25, 2), (168, 7)])
+def test_rollout_covers_the_horizon_in_blocks(horizon, calls):
+    model = BlockModel(np.arange(FORECAST_HORIZON))
+    exog = np.zeros((2, horizon, 2))
+
+    forecast = _rollout_energy_forecast(model, _history(), exog, horizon)
+
+    assert forecast.shape == (2, horizon)
+    assert len(model.windows) == calls
+    assert all(w.shape == (2, SEQUENCE_LENGTH, 3) for w in model.windows)
+
+
+def test_rollout_feeds_clipped_blocks_back():
+    model = BlockModel(np.full(FORECAST_HORIZON, -5.0))
+    exog = np.ones((2, 48, 2))
+
+    forecast = _rollout_energy_forecast(model, _history(), exog, 48, energy_floor_scaled=-1.0)
+
+    assert (forecast == -1.0).all()
+    # The second call sees the first block at the floor, not at -5
+    np.testing.assert_array_equal(model.windows[1][:, -FORECAST_HORIZON:, 0], -1.0)
+    np.testing.assert_array_equal(model.windows[1][:, -FORECAST_HORIZON:, 1:], 1.0)
+
+
+def test_confidence_band_widens_with_each_block():
+    ratios = _energy_confidence_ratios(24 * 30)
+
+    assert ratios[0] == pytest.approx(0.10)
+    assert (ratios[:FORECAST_HORIZON] == ratios[0]).all()
+    assert (np.diff(ratios) >= 0).all()
+    assert ratios[FORECAST_HORIZON] > ratios[FORECAST_HORIZON - 1]
+    assert ratios.max() <= 1.0
+
+
+def test_week_ahead_forecast_is_non_negative_with_widening_band():
+    result = forecasting_service.forecast_energy_consumption("b-rollout", horizon_hours=168, use_cache=False)
+    if not result["model_available"]:
+        pytest.skip("energy forecaster not available")
+    points = result["forecast"]
+    values = np.array([p["energy_kwh"] for p in points])
+    lower = np.array([p["confidence_lower"] for p in points])
+    upper = np.array([p["confidence_upper"] for p in points])
+
+    assert len(points) == 168
+    assert (values >= 0).all()
+    assert ((lower <= values) & (values <= upper)).all()
+    relative_width = np.divide(upper - lower, values, out=np.zeros_like(values), where=values > 0)
+    assert (np.diff(relative_width[values > 0]) >= -1e-9).all()
+
+
+@pytest.fixture
+def no_models(monkeypatch):
+    monkeypatch.setattr(forecasting_service, "current_hour_bucket", lambda: HOUR)
+    for loader in ("_load_energy_model", "_load_occupancy_model"):
+        monkeypatch.setattr(forecasting_service, loader, lambda: None)
+
+
+def test_synthetic_energy_forecast_starts_at_the_hour_bucket(no_models):
+    result = forecasting_service.forecast_energy_consumption("b1", horizon_hours=5, use_cache=False)
+
+    assert result["model_available"] is False
+    assert [p["timestamp"] for p in result["forecast"]][:2] == ["2024-03-04T10:00:00", "2024-03-04T11:00:00"]
+
+
+def test_synthetic_occupancy_forecast_starts_at_the_hour_bucket(no_models):
+    result = forecasting_service.forecast_occupancy("b1", horizon_hours=5, use_cache=False)
+
+    assert result["model_available"] is False
+    assert result["forecast"][0]["timestamp"] == "2024-03-04T10:00:00"
+
+
+def test_batch_matches_the_single_building_path(monkeypatch):
+    monkeypatch.setattr(forecasting_service, "current_hour_bucket", lambda: HOUR)
+    histories = {}
+    for seed, building_id in enumerate(["p1", "p2", "p3"]):
+        np.random.seed(seed)
+        histories[building_id] = forecasting_service._generate_synthetic_history(SEQUENCE_LENGTH, HOUR)
+    monkeypatch.setattr(
+        forecasting_service, "_prepare_historical_data",
+        lambda building_id, hours=SEQUENCE_LENGTH, end_time=None: histories[building_id].copy(),
+    )
+
+    batch = forecasting_service.forecast_energy_batch(list(histories), horizon_hours=48, use_cache=False)
+    if not batch["p1"]["model_available"]:
+        pytest.skip("energy forecaster not available")
+
+    for building_id in histories:
+        single = forecasting_service.forecast_energy_consumption(building_id, horizon_hours=48, use_cache=False)
+        assert [p["timestamp"] for p in batch[building_id]["forecast"]] == [p["timestamp"] for p in single["forecast"]]
+        for field in ("energy_kwh", "confidence_lower", "confidence_upper"):
+            np.testing.assert_allclose(
+                [p[field] for p in batch[building_id]["forecast"]],
+                [p[field] for p in single["forecast"]],
+                rtol=1e-6,
+            )
+
+
+def test_concurrent_batches_compute_each_building_once(monkeypatch):
+    monkeypatch.setattr(forecasting_service, "current_hour_bucket", lambda: HOUR)
+    monkeypatch.setattr(forecasting_service, "_fetch_energy_histories", lambda ids, end_time: {})
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute(building_ids, horizon_hours, start_time, histories):
+        calls.append(list(building_ids))
+        started.set()
+        release.wait(timeout=5)
+        return {b: {"forecast": [], "model_available": True, "horizon_hours": horizon_hours} for b in building_ids}
+
+    monkeypatch.setattr(forecasting_service, "_compute_energy_forecasts", compute)
+    results = {}
+    first = threading.Thread(target=lambda: results.update(
+        first=forecasting_service.forecast_energy_batch(["sf-a", "sf-b"], horizon_hours=24)))
+    first.start()
+    assert started.wait(timeout=5)
+    coalesced = forecasting_service._forecast_cache.stats()["coalesced"]
+    second = threading.Thread(target=lambda: results.update(
+        second=forecasting_service.forecast_energy_batch(["sf-b", "sf-c"], horizon_hours=24)))
+    second.start()
+    deadline = time.monotonic() + 5
+    while forecasting_service._forecast_cache.stats()["coalesced"] == coalesced and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    first.join(timeout=5)
+    second.join(timeout=5)
+
+    assert calls == [["sf-a", "sf-b"], ["sf-c"]]
+    assert results["second"]["sf-b"] is results["first"]["sf-b"]
+
+
+@pytest.fixture
+def counted_forecasts(monkeypatch):
+    """Deterministic model forecasts that count computations; the clock and actions version are settable."""
+    state = {"hour": HOUR, "version": 0, "calls": []}
+    monkeypatch.setattr(forecasting_service, "current_hour_bucket", lambda: state["hour"])
+    monkeypatch.setattr(forecasting_service.action_state_service, "get_version", lambda building_id: state["version"])
+
+    def compute(building_id, horizon_hours, start_time):
+        state["calls"].append((building_id, horizon_hours, start_time))
+        return {"forecast": [{"timestamp": start_time.isoformat()}], "model_available": True, "horizon_hours": horizon_hours}
+
+    monkeypatch.setattr(forecasting_service, "_compute_energy_forecast", compute)
+    monkeypatch.setattr(forecasting_service, "_compute_occupancy_forecast", compute)
+    forecasting_service._forecast_cache.invalidate()
+    yield state
+    forecasting_service._forecast_cache.invalidate()
+
+
+def test_forecast_is_cached_per_building_horizon_and_hour(counted_forecasts):
+    first = forecasting_service.forecast_energy_consumption("ck1", horizon_hours=24)
+    assert forecasting_service.forecast_energy_consumption("ck1", horizon_hours=24) is first
+    forecasting_service.forecast_energy_consumption("ck1", horizon_hours=48)
+    forecasting_service.forecast_energy_consumption("ck2", horizon_hours=24)
+
+    assert len(counted_forecasts["calls"]) == 3
+
+
+def test_actions_version_bump_invalidates_energy_forecast(counted_forecasts):
+    forecasting_service.forecast_energy_consumption("ck1", horizon_hours=24)
+    counted_forecasts["version"] += 1
+    forecasting_service.forecast_energy_consumption("ck1", horizon_hours=24)
+
+    assert len(counted_forecasts["calls"]) == 2
+
+
+def test_hour_rollover_invalidates_forecasts(counted_forecasts):
+    forecasting_service.forecast_energy_consumption("ck1", horizon_hours=24)
+    forecasting_service.forecast_occupancy("ck1", horizon_hours=24)
+    counted_forecasts["hour"] = datetime(2024, 3, 4, 11)
+    energy = forecasting_service.forecast_energy_consumption("ck1", horizon_hours=24)
+    occupancy = forecasting_service.forecast_occupancy("ck1", horizon_hours=24)
+
+    assert len(counted_forecasts["calls"]) == 4
+    assert energy["forecast"][0]["timestamp"] == occupancy["forecast"][0]["timestamp"] == "2024-03-04T11:00:00"
+
+
+def test_batch_reads_the_single_building_cache_entry(counted_forecasts, monkeypatch):
+    cached = forecasting_service.forecast_energy_consumption("ck1", horizon_hours=24)
+    monkeypatch.setattr(forecasting_service, "_compute_energy_forecasts", lambda *args: pytest.fail("recomputed"))
+
+    assert forecasting_service.forecast_energy_batch(["ck1"], horizon_hours=24)["ck1"] is cached
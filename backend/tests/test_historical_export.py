@@ -0,0 +1,168 @@
+"""
+Chunked historical export: boundary dedup, empty chunks and failures.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routes import historical_routes
+from core.services import timeseries_service as timeseries_module
+from core.services.timeseries_service import timeseries_service
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeInflux:
+    """
+    Stands in for ``query_time_series``: one row per bucket labelled by its
+    window end, so the row at a chunk boundary comes back from both chunks.
+    """
+
+    def __init__(self, empty_chunks=(), fail_on_call=None):
+        self.calls = []
+        self.empty_chunks = set(empty_chunks)
+        self.fail_on_call = fail_on_call
+
+    def __call__(self, building_id, zone_id, metrics, start_time, end_time, resolution_minutes, raise_errors):
+        assert raise_errors is True
+        call = len(self.calls)
+        self.calls.append((start_time, end_time))
+        if call == self.fail_on_call:
+            raise ConnectionError("influx down")
+        if call in self.empty_chunks:
+            return pd.DataFrame()
+        timestamps = pd.date_range(start_time, end_time, freq=f"{resolution_minutes}min")
+        return pd.DataFrame({
+            "timestamp": timestamps,
+            "metric": "energy",
+            "value": [float(ts.hour) for ts in timestamps],
+            "zone_id": "z1",
+        })
+
+
+@pytest.fixture
+def fake_influx(monkeypatch):
+    def install(**kwargs):
+        fake = FakeInflux(**kwargs)
+        monkeypatch.setattr(timeseries_module, "query_time_series", fake)
+        return fake
+    return install
+
+
+def _collect(hours, chunk_hours, resolution_minutes=60):
+    async def run():
+        frames = []
+        async for df in timeseries_service.iter_metrics_async(
+            building_id="b1",
+            zone_id=None,
+            metrics=["energy"],
+            start_time=START,
+            end_time=START + timedelta(hours=hours),
+            resolution_minutes=resolution_minutes,
+            chunk_hours=chunk_hours,
+        ):
+            frames.append(df)
+        return frames
+    return asyncio.run(run())
+
+
+def test_chunk_boundary_rows_are_emitted_once(fake_influx):
+    fake = fake_influx()
+    frames = _collect(hours=10, chunk_hours=4)
+
+    assert fake.calls == [
+        (START, START + timedelta(hours=4)),
+        (START + timedelta(hours=4), START + timedelta(hours=8)),
+        (START + timedelta(hours=8), START + timedelta(hours=10)),
+    ]
+    timestamps = pd.concat(frames)["timestamp"]
+    assert timestamps.is_unique
+    assert timestamps.is_monotonic_increasing
+    assert len(timestamps) == 11
+
+
+def test_chunks_are_multiples_of_the_resolution(fake_influx):
+    fake = fake_influx()
+    _collect(hours=3, chunk_hours=1, resolution_minutes=25)
+
+    for start, end in fake.calls[:-1]:
+        assert (end - start) % timedelta(minutes=25) == timedelta(0)
+
+
+def test_empty_chunks_yield_nothing(fake_influx):
+    fake_influx(empty_chunks={1})
+    frames = _collect(hours=12, chunk_hours=4)
+
+    assert len(frames) == 2
+    hours = pd.concat(frames)["timestamp"].dt.hour.tolist()
+    assert hours == [0, 1, 2, 3, 4, 8, 9, 10, 11, 12]
+
+
+def test_failed_chunk_ends_iteration_with_error(fake_influx):
+    fake_influx(fail_on_call=1)
+    with pytest.raises(ConnectionError):
+        _collect(hours=12, chunk_hours=4)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(historical_routes.router)
+    return TestClient(app)
+
+
+def _export(client, export_format="ndjson", hours=72):
+    return client.post("/export", json={
+        "building_id": "b1",
+        "metrics": ["energy"],
+        "start_time": START.isoformat(),
+        "end_time": (START + timedelta(hours=hours)).isoformat(),
+        "resolution_minutes": 60,
+        "format": export_format,
+    })
+
+
+def test_export_streams_every_row_once(client, fake_influx):
+    fake_influx()
+    response = _export(client)
+
+    assert response.status_code == 200
+    points = [json.loads(line) for line in response.text.splitlines()]
+    assert len(points) == 73
+    assert len({p["timestamp"] for p in points}) == 73
+    assert "error" not in points[-1]
+
+
+def test_export_csv_has_header_and_rows(client, fake_influx):
+    fake_influx()
+    lines = _export(client, "csv", hours=2).text.splitlines()
+
+    assert lines[0] == "timestamp,metric,value,zone_id"
+    assert len(lines) == 1 + 3
+
+
+def test_export_fails_with_503_when_first_chunk_fails(client, fake_influx):
+    fake_influx(fail_on_call=0)
+    assert _export(client).status_code == 503
+
+
+def test_export_ends_with_error_record_when_a_later_chunk_fails(client, fake_influx):
+    fake_influx(fail_on_call=1)
+    lines = _export(client).text.splitlines()
+
+    assert json.loads(lines[-1]) == {"error": "influx down", "complete": False}
+    assert len(lines) == 25 + 1
+
+
+def test_export_csv_error_is_a_comment_line(client, fake_influx):
+    fake_influx(fail_on_call=2)
+    lines = _export(client, "csv").text.splitlines()
+
+    assert lines[-1] == "# error: influx down"
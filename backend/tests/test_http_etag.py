@@ -0,0 +1,157 @@
+"""
+ETag / If-None-Match on the forecast, suggestions and dashboard routes.
+"""
+
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routes import dashboard_routes, forecasting_routes, suggestions_routes
+from core.services import dashboard_service
+from core.services import timeseries_service as timeseries_module
+from core.services.action_state_service import action_state_service
+from core.services.dashboard_service import ANOMALY_COLUMNS, dashboard_snapshots
+
+
+class Inputs:
+    """What the tags are derived from; tests move these forward."""
+
+    def __init__(self):
+        self.version = 0
+        self.watermark = pd.Timestamp("2024-01-01T10:45:00Z")
+        self.hour = datetime(2024, 1, 1, 10)
+        self.model_available = True
+
+
+@pytest.fixture
+def inputs(monkeypatch):
+    inputs = Inputs()
+    monkeypatch.setattr(action_state_service, "get_version", lambda building_id: inputs.version)
+    monkeypatch.setattr(dashboard_snapshots, "data_watermark", lambda building_id: inputs.watermark)
+    monkeypatch.setattr(forecasting_routes, "current_hour_bucket", lambda: inputs.hour)
+    monkeypatch.setattr(forecasting_routes.forecast_precompute, "track", lambda building_id: None)
+    monkeypatch.setattr(forecasting_routes, "forecast_energy_consumption", lambda building_id, horizon_hours: {
+        "forecast": [{
+            "timestamp": inputs.hour.isoformat(),
+            "energy_kwh": 100.0,
+            "confidence_lower": 90.0,
+            "confidence_upper": 110.0,
+        }],
+        "model_available": inputs.model_available,
+        "horizon_hours": horizon_hours,
+    })
+    monkeypatch.setattr(suggestions_routes.suggestion_engine, "generate_suggestions", lambda building_id, horizon_hours: [{
+        "id": "s1",
+        "type": "hvac_schedule",
+        "description": "Shift HVAC start",
+        "estimated_savings_kwh": 12.0,
+        "comfort_risk": "low",
+    }])
+    return inputs
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(forecasting_routes.router, prefix="/forecast")
+    app.include_router(suggestions_routes.router, prefix="/suggestions")
+    app.include_router(dashboard_routes.router, prefix="/dashboard")
+    return TestClient(app)
+
+
+def _forecast(client, etag=None):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.post("/forecast/energy", json={"building_id": "b1", "horizon_hours": 24}, headers=headers)
+
+
+def _suggestions(client, etag=None):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.post("/suggestions/recommend", json={"building_id": "b1"}, headers=headers)
+
+
+@pytest.mark.parametrize("request_fn", [_forecast, _suggestions])
+def test_matching_weak_tag_returns_empty_304(client, inputs, request_fn):
+    first = request_fn(client)
+    etag = first.headers["ETag"]
+
+    assert first.status_code == 200
+    assert etag.startswith('W/"')
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    again = request_fn(client, etag)
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == etag
+    # Weak comparison: the strong form of the same tag matches too
+    assert request_fn(client, etag[2:]).status_code == 304
+
+
+@pytest.mark.parametrize("request_fn", [_forecast, _suggestions])
+@pytest.mark.parametrize("change", ["version", "watermark"])
+def test_new_actions_version_or_data_changes_the_tag(client, inputs, request_fn, change):
+    etag = request_fn(client).headers["ETag"]
+    if change == "version":
+        inputs.version += 1
+    else:
+        inputs.watermark += pd.Timedelta(minutes=15)
+
+    response = request_fn(client, etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_forecast_tag_changes_with_the_hour_bucket(client, inputs):
+    etag = _forecast(client).headers["ETag"]
+    inputs.hour = datetime(2024, 1, 1, 11)
+
+    response = _forecast(client, etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_synthetic_forecast_has_no_etag(client, inputs):
+    inputs.model_available = False
+    response = _forecast(client)
+
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+
+@pytest.fixture
+def dashboard_data(monkeypatch):
+    def query_wide(building_id, zone_id, metrics, start_time, end_time, resolution_minutes, zone_agg, raise_errors):
+        frame = pd.DataFrame({"timestamp": pd.date_range(start_time, end_time, freq=f"{resolution_minutes}min")})
+        for metric in metrics:
+            frame[metric] = 1.0
+        return frame
+
+    monkeypatch.setattr(timeseries_module, "query_time_series_wide", query_wide)
+    monkeypatch.setattr(dashboard_service, "_load_suggestions", lambda building_id: [])
+    monkeypatch.setattr(dashboard_service.data_service, "get_building_info", lambda: {"building_id": "b1"})
+    monkeypatch.setattr(
+        dashboard_service, "_build_anomalies",
+        lambda building_id, base_df, display_df=None: pd.DataFrame(columns=ANOMALY_COLUMNS),
+    )
+    versions = {"etag-b1": 0}
+    monkeypatch.setattr(action_state_service, "get_version", lambda building_id: versions.get(building_id, 0))
+    yield versions
+    dashboard_snapshots.invalidate("etag-b1")
+
+
+def test_dashboard_snapshot_tag_and_version_bump(client, dashboard_data):
+    first = client.get("/dashboard/overview/etag-b1")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+
+    again = client.get("/dashboard/overview/etag-b1", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+
+    dashboard_data["etag-b1"] += 1
+    bumped = client.get("/dashboard/overview/etag-b1", headers={"If-None-Match": etag})
+    assert bumped.status_code == 200
+    assert bumped.headers["ETag"] != etag
+    assert bumped.json()["actions_version"] == 1
@@ -0,0 +1,85 @@
+"""
+Model warmup readiness: required vs optional models.
+"""
+
+import pytest
+
+from core.services.model_warmup import ModelWarmupService
+
+
+class FakeModel:
+    def predict(self, x, verbose=0):
+        return x
+
+
+def _registry(**outcomes):
+    """outcome per model: "ok", "missing" (loader returns None) or "broken" (probe raises)."""
+    def probe(model):
+        if model == "broken":
+            raise RuntimeError("bad weights")
+
+    registry = {}
+    for name, outcome in outcomes.items():
+        model = None if outcome == "missing" else ("broken" if outcome == "broken" else FakeModel())
+        registry[name] = (lambda model=model: model, lambda: None, probe)
+    return registry
+
+
+def test_not_ready_before_warmup():
+    service = ModelWarmupService(_registry(a="ok"))
+    assert service.report()["ready"] is False
+
+
+def test_ready_when_all_models_load():
+    service = ModelWarmupService(_registry(a="ok", b="ok"))
+    report = service.warm_up()
+
+    assert report["ready"] is True
+    assert report["degraded"] is False
+    assert {m["status"] for m in report["models"].values()} == {"ready"}
+
+
+@pytest.mark.parametrize("outcome, status", [("missing", "unavailable"), ("broken", "failed")])
+def test_failed_required_model_is_not_ready(outcome, status):
+    service = ModelWarmupService(_registry(a="ok", b=outcome))
+    report = service.warm_up()
+
+    assert report["models"]["b"]["status"] == status
+    assert report["ready"] is False
+    assert report["failed_required"] == ["b"]
+    assert service.is_ready is False
+
+
+def test_failed_optional_model_only_degrades():
+    service = ModelWarmupService(_registry(a="ok", b="broken"), required=["a"])
+    report = service.warm_up()
+
+    assert report["ready"] is True
+    assert report["degraded"] is True
+    assert report["failed_required"] == []
+
+
+def test_disabled_warmup_is_ready():
+    service = ModelWarmupService(_registry(a="ok"))
+    service.disable()
+    assert service.report()["ready"] is True
+
+
+def test_unknown_required_model_is_rejected():
+    with pytest.raises(ValueError):
+        ModelWarmupService(_registry(a="ok"), required=["a", "typo"])
+
+
+def test_second_warm_up_returns_the_report():
+    calls = []
+    registry = _registry(a="ok")
+    load_model, load_scaler, probe = registry["a"]
+    registry["a"] = (lambda: calls.append("a") or load_model(), load_scaler, probe)
+    service = ModelWarmupService(registry)
+
+    first = service.warm_up()
+    second = service.warm_up()
+
+    assert calls == ["a"]
+    assert second["ready"] is True
+    assert second["elapsed_seconds"] == first["elapsed_seconds"]
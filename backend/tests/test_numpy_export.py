@@ -0,0 +1,82 @@
+"""
+NumPy exports of the forecasting LSTMs: parity with Keras and staleness against the H5 model.
+"""
+
+import shutil
+
+import numpy as np
+import pytest
+
+from core.services import forecasting_service
+from core.utils import model_loader
+from core.utils.model_loader import get_model_path, load_keras_model, load_numpy_export
+from core.utils.numpy_inference import LSTMNetwork, file_sha256
+
+FORECASTERS = ["lstm_energy", "lstm_occupancy"]
+
+
+def _shipped_export(name):
+    if not get_model_path("forecasting", f"{name}.npz").exists():
+        pytest.skip(f"{name}.npz not available")
+    network = load_numpy_export(LSTMNetwork.load, "forecasting", name)
+    assert network is not None, f"{name}.npz is stale against {name}.h5"
+    return network
+
+
+@pytest.mark.parametrize("name", FORECASTERS)
+def test_shipped_export_matches_its_h5(name):
+    network = _shipped_export(name)
+
+    assert network.source_sha256 == file_sha256(get_model_path("forecasting", f"{name}.h5"))
+
+
+@pytest.mark.parametrize("name", FORECASTERS)
+def test_shipped_export_predicts_like_keras(name):
+    pytest.importorskip("tensorflow")
+    network = _shipped_export(name)
+    model = load_keras_model("forecasting", f"{name}.h5")
+    if model is None:
+        pytest.skip(f"{name}.h5 not loadable")
+
+    x = np.random.default_rng(0).uniform(0.0, 1.0, size=(16, *model.input_shape[1:])).astype(np.float32)
+    np.testing.assert_allclose(network.predict(x), model.predict(x, verbose=0), atol=1e-4, rtol=1e-4)
+
+
+@pytest.fixture
+def models_dir(tmp_path, monkeypatch):
+    """Copy of the energy forecaster's H5 and NumPy export in a temporary models dir."""
+    folder = tmp_path / "forecasting"
+    folder.mkdir()
+    for suffix in ("h5", "npz"):
+        source = get_model_path("forecasting", f"lstm_energy.{suffix}")
+        if not source.exists():
+            pytest.skip(f"lstm_energy.{suffix} not available")
+        shutil.copy(source, folder)
+    monkeypatch.setattr(model_loader, "BASE_MODELS_DIR", tmp_path)
+    return folder
+
+
+def _rewrite_source(folder, source_sha256):
+    network = LSTMNetwork.load(folder / "lstm_energy.npz")
+    network.source_sha256 = source_sha256
+    network.save(folder / "lstm_energy.npz")
+
+
+def test_matching_export_is_used(models_dir):
+    assert isinstance(load_numpy_export(LSTMNetwork.load, "forecasting", "lstm_energy"), LSTMNetwork)
+
+
+@pytest.mark.parametrize("source_sha256", ["0" * 64, None])
+def test_stale_or_unstamped_export_is_skipped(models_dir, source_sha256):
+    _rewrite_source(models_dir, source_sha256)
+
+    assert load_numpy_export(LSTMNetwork.load, "forecasting", "lstm_energy") is None
+
+
+def test_stale_export_falls_back_to_keras(models_dir, monkeypatch):
+    _rewrite_source(models_dir, "0" * 64)
+    keras_loads = []
+    monkeypatch.setattr(forecasting_service, "load_keras_model", lambda *parts: keras_loads.append(parts) or "keras")
+
+    assert forecasting_service._load_lstm("lstm_energy") == "keras"
+    assert keras_loads == [("forecasting", "lstm_energy.h5")]
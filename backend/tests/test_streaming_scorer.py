@@ -0,0 +1,172 @@
+"""
+IncrementalAnomalyScorer: row caching, rescoring and per-(building, source) state.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.anomaly_engine import streaming_scorer
+from core.anomaly_engine.streaming_scorer import (
+    FEATURE_COLS,
+    IncrementalAnomalyScorer,
+    _RunningRange,
+)
+
+
+@pytest.fixture
+def model_calls(monkeypatch):
+    """Replace both models with deterministic scores; records the rows each call saw."""
+    calls = []
+
+    def fake_autoencoder(df, feature_cols):
+        calls.append(len(df))
+        return pd.Series(df["energy"].to_numpy(dtype=np.float64), index=df.index)
+
+    def fake_isolation_forest(df, feature_cols):
+        return pd.Series(df["temperature"].to_numpy(dtype=np.float64), index=df.index)
+
+    monkeypatch.setattr(streaming_scorer, "autoencoder_reconstruction_error", fake_autoencoder)
+    monkeypatch.setattr(streaming_scorer, "isolation_forest_scores", fake_isolation_forest)
+    return calls
+
+
+def _frame(energy, start="2024-01-01", freq="15min"):
+    index = pd.date_range(start, periods=len(energy), freq=freq, tz="UTC")
+    df = pd.DataFrame(0.0, index=index, columns=FEATURE_COLS)
+    df["energy"] = np.asarray(energy, dtype=np.float64)
+    df["temperature"] = np.asarray(energy, dtype=np.float64) * 2
+    return df
+
+
+def test_repeat_request_reuses_cached_rows(model_calls):
+    scorer = IncrementalAnomalyScorer()
+    df = _frame([1.0, 2.0, 3.0, 4.0])
+
+    first = scorer.score("b1", df)
+    second = scorer.score("b1", df)
+
+    assert model_calls == [4]
+    pd.testing.assert_frame_equal(first, second)
+    stats = scorer.stats()["b1/default"]
+    assert (stats["rows_scored"], stats["rows_reused"]) == (4, 4)
+
+
+def test_only_new_rows_are_scored(model_calls):
+    scorer = IncrementalAnomalyScorer()
+    scorer.score("b1", _frame([1.0, 2.0, 3.0]))
+    result = scorer.score("b1", _frame([1.0, 2.0, 3.0, 4.0, 5.0]))
+
+    assert model_calls == [3, 2]
+    assert result["ae_score"].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_changed_feature_values_are_rescored(model_calls):
+    scorer = IncrementalAnomalyScorer()
+    scorer.score("b1", _frame([1.0, 2.0, 3.0]))
+    result = scorer.score("b1", _frame([1.0, 9.0, 3.0]))
+
+    assert model_calls == [3, 1]
+    assert result["ae_score"].tolist() == [1.0, 9.0, 3.0]
+
+
+def test_scores_normalize_over_running_range(model_calls):
+    scorer = IncrementalAnomalyScorer(threshold=0.85)
+    result = scorer.score("b1", _frame([0.0, 5.0, 10.0]))
+
+    np.testing.assert_allclose(result["score"], [0.0, 0.5, 1.0])
+    assert result["is_anomaly"].tolist() == [False, False, True]
+
+    # A later, larger value rescales earlier rows on read instead of freezing them
+    result = scorer.score("b1", _frame([0.0, 5.0, 10.0, 20.0]))
+    np.testing.assert_allclose(result["score"], [0.0, 0.25, 0.5, 1.0])
+
+
+def test_calibration_fixes_the_scale(model_calls):
+    calibration = {"ae_score": _RunningRange(0.0, 100.0), "if_score": _RunningRange(0.0, 200.0)}
+    scorer = IncrementalAnomalyScorer(calibration=calibration)
+
+    first = scorer.score("b1", _frame([10.0, 50.0]))
+    scorer.score("b1", _frame([10.0, 50.0, 1000.0]))
+    again = scorer.score("b1", _frame([10.0, 50.0]))
+
+    np.testing.assert_allclose(first["score"], [0.1, 0.5])
+    pd.testing.assert_frame_equal(first, again)
+
+
+def test_sources_do_not_share_state(model_calls):
+    scorer = IncrementalAnomalyScorer()
+    df = _frame([1.0, 2.0])
+    scorer.score("b1", df, source="dashboard")
+    scorer.score("b1", df, source="detect")
+
+    assert model_calls == [2, 2]
+    assert set(scorer.stats()) == {"b1/dashboard", "b1/detect"}
+
+
+def test_stateless_source_keeps_no_state(model_calls):
+    scorer = IncrementalAnomalyScorer()
+    df = _frame([1.0, 2.0, 3.0])
+    scorer.score("b1", df, source=None)
+    result = scorer.score("b1", df, source=None)
+
+    assert model_calls == [3, 3]
+    assert scorer.stats() == {}
+    np.testing.assert_allclose(result["score"], [0.0, 0.5, 1.0])
+
+
+def test_batch_scores_all_buildings_in_one_model_call(model_calls):
+    scorer = IncrementalAnomalyScorer()
+    results = scorer.score_batch({
+        "b1": _frame([1.0, 2.0]),
+        "b2": _frame([10.0, 20.0, 30.0]),
+    })
+
+    assert model_calls == [5]
+    assert results["b1"]["ae_score"].tolist() == [1.0, 2.0]
+    assert results["b2"]["ae_score"].tolist() == [10.0, 20.0, 30.0]
+
+
+def test_least_recently_used_state_is_evicted(model_calls):
+    scorer = IncrementalAnomalyScorer(max_states=2)
+    for building_id in ("b1", "b2"):
+        scorer.score(building_id, _frame([1.0]))
+    scorer.score("b1", _frame([1.0]))  # b2 is now least recently used
+    scorer.score("b3", _frame([1.0]))
+
+    assert set(scorer.stats()) == {"b1/default", "b3/default"}
+
+
+def test_idle_state_is_dropped(model_calls):
+    scorer = IncrementalAnomalyScorer(idle_seconds=0.0)
+    scorer.score("b1", _frame([1.0]))
+    scorer.score("b2", _frame([1.0]))
+
+    assert set(scorer.stats()) == {"b2/default"}
+
+
+def test_naive_and_utc_timestamps_share_cache(model_calls):
+    scorer = IncrementalAnomalyScorer()
+    df = _frame([1.0, 2.0])
+    scorer.score("b1", df)
+    result = scorer.score("b1", df.tz_localize(None))
+
+    assert model_calls == [2]
+    assert result.index.tz is None
+
+
+def test_stateless_batch_scores_all_buildings_in_one_model_call(model_calls):
+    scorer = IncrementalAnomalyScorer()
+    results = scorer.score_batch({
+        "b1": _frame([0.0, 5.0, 10.0]),
+        "b2": _frame([100.0, 300.0]),
+        "b3": _frame([]),
+    }, source=None)
+
+    assert model_calls == [5]
+    assert results["b2"]["ae_score"].tolist() == [100.0, 300.0]
+    # Each building is normalized over its own rows only
+    np.testing.assert_allclose(results["b1"]["score"], [0.0, 0.5, 1.0])
+    np.testing.assert_allclose(results["b2"]["score"], [0.0, 1.0])
+    assert results["b3"].empty
+    assert scorer.stats() == {}
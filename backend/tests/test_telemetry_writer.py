@@ -0,0 +1,159 @@
+"""
+Telemetry write-behind buffer: batching, retry, overflow and close/reopen.
+"""
+
+import threading
+import time
+
+from core.services.telemetry_writer import TelemetryWriteBuffer
+
+
+class RecordingWriter:
+    """write_fn that records batches and can fail the first N calls."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, lines):
+        with self.lock:
+            self.calls += 1
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("influx down")
+            self.batches.append(list(lines))
+
+
+def _buffer(writer, **kwargs):
+    options = dict(batch_size=3, flush_interval_seconds=60, retry_backoff_seconds=0, write_fn=writer)
+    options.update(kwargs)
+    return TelemetryWriteBuffer(**options)
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_full_batch_is_written_by_flusher():
+    writer = RecordingWriter()
+    buffer = _buffer(writer)
+    buffer.enqueue_many(["a", "b", "c", "d"])
+
+    assert _wait_for(lambda: writer.batches)
+    assert writer.batches[0] == ["a", "b", "c"]
+    assert buffer.stats()["buffered"] == 1
+    buffer.close()
+    assert writer.batches == [["a", "b", "c"], ["d"]]
+
+
+def test_partial_batch_is_written_after_flush_interval():
+    writer = RecordingWriter()
+    buffer = _buffer(writer, batch_size=100, flush_interval_seconds=0.05)
+    buffer.enqueue("a")
+
+    assert _wait_for(lambda: writer.batches == [["a"]])
+    buffer.close()
+
+
+def test_failed_batch_is_retried():
+    writer = RecordingWriter(failures=2)
+    buffer = _buffer(writer, max_retries=3)
+    buffer.enqueue_many(["a", "b"])
+
+    assert buffer.flush() == 2
+    assert writer.batches == [["a", "b"]]
+    stats = buffer.stats()
+    assert (stats["written"], stats["retried"], stats["dropped"]) == (2, 2, 0)
+    assert stats["last_error"] == "influx down"
+    buffer.close()
+
+
+def test_batch_is_dropped_after_max_retries():
+    writer = RecordingWriter(failures=10)
+    buffer = _buffer(writer, max_retries=2)
+    buffer.enqueue_many(["a", "b"])
+    buffer.flush()
+
+    assert writer.calls == 3
+    stats = buffer.stats()
+    assert (stats["written"], stats["dropped"]) == (0, 2)
+    buffer.close()
+
+
+def test_overflow_drops_oldest_records():
+    writer = RecordingWriter()
+    buffer = _buffer(writer, batch_size=100, max_buffer_size=3)
+    buffer.enqueue_many(["a", "b", "c", "d", "e"])
+
+    assert buffer.stats()["dropped"] == 2
+    buffer.close()
+    assert writer.batches == [["c", "d", "e"]]
+
+
+def test_close_flushes_and_stops_flusher():
+    writer = RecordingWriter()
+    buffer = _buffer(writer, batch_size=100)
+    buffer.enqueue_many(["a", "b"])
+    buffer.close()
+
+    assert writer.batches == [["a", "b"]]
+    assert buffer.stats()["closed"] is True
+    assert not buffer._thread.is_alive()
+
+
+def test_enqueue_after_close_writes_directly():
+    writer = RecordingWriter()
+    buffer = _buffer(writer)
+    buffer.close()
+    buffer.enqueue_many(["a", "b", "c", "d"])
+
+    assert writer.batches == [["a", "b", "c"], ["d"]]
+    assert buffer.stats()["buffered"] == 0
+
+
+def test_start_reopens_closed_buffer():
+    writer = RecordingWriter()
+    buffer = _buffer(writer, flush_interval_seconds=0.05)
+    buffer.enqueue("a")
+    buffer.close()
+
+    buffer.start()
+    assert buffer.stats()["closed"] is False
+    buffer.enqueue("b")
+    assert _wait_for(lambda: writer.batches == [["a"], ["b"]])
+    buffer.close()
+
+
+def test_close_does_not_retry_past_its_timeout():
+    writer = RecordingWriter(failures=100)
+    buffer = _buffer(writer, batch_size=100, max_retries=5, retry_backoff_seconds=0.2)
+    buffer.enqueue_many(["a", "b"])
+
+    start = time.monotonic()
+    buffer.close(timeout=0.5)
+
+    # Unbounded, the backoff alone would take 0.2 + 0.4 + ... + 3.2 = 6.2s
+    assert time.monotonic() - start < 1.0
+    assert buffer.stats()["dropped"] == 2
+
+
+def test_records_left_at_the_close_deadline_are_dropped():
+    def slow_write(lines):
+        time.sleep(0.1)
+
+    buffer = _buffer(slow_write, batch_size=2)
+    buffer.enqueue_many([str(i) for i in range(20)])
+
+    start = time.monotonic()
+    buffer.close(timeout=0.25)
+
+    assert time.monotonic() - start < 0.5
+    stats = buffer.stats()
+    assert stats["dropped"] > 0
+    assert stats["written"] + stats["dropped"] == 20
+    assert stats["buffered"] == 0
@@ -3,6 +3,26 @@ const rawBase = import.meta.env.VITE_API_URL || "/api";
 // Remove trailing slash for consistent URL joining
 const BASE = rawBase.replace(/\/$/, "");
 
+// Last body and ETag per polled request; revalidated with If-None-Match so an
+// unchanged payload comes back as an empty 304.
+const etagCache = new Map();
+
+async function fetchJsonWithETag(url, options = {}, errorMessage = "Request failed") {
+  const key = `${options.method || "GET"} ${url} ${options.body || ""}`;
+  const cached = etagCache.get(key);
+  const headers = { ...(options.headers || {}) };
+  if (cached) headers["If-None-Match"] = cached.etag;
+
+  const res = await fetch(url, { ...options, headers });
+  if (res.status === 304 && cached) return cached.data;
+  if (!res.ok) throw new Error(errorMessage);
+
+  const data = await res.json();
+  const etag = res.headers.get("ETag");
+  if (etag) etagCache.set(key, { etag, data });
+  return data;
+}
+
 export async function runSimulation(buildingId, startTime, endTime, resolutionMinutes = 60) {
   const res = await fetch(`${BASE}/simulation/run`, {
     method: "POST",
@@ -43,16 +63,18 @@ export async function fetchAnomalies(buildingId, metric) {
 }
 
 export async function fetchSuggestions(buildingId, horizonHours = 24) {
-  const res = await fetch(`${BASE}/suggestions/recommend`, {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({
-      building_id: buildingId,
-      horizon_hours: horizonHours,
-    }),
-  });
-  if (!res.ok) throw new Error("Failed to fetch suggestions");
-  return res.json();
+  return fetchJsonWithETag(
+    `${BASE}/suggestions/recommend`,
+    {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        building_id: buildingId,
+        horizon_hours: horizonHours,
+      }),
+    },
+    "Failed to fetch suggestions"
+  );
 }
 
 export async function applySuggestion(buildingId, suggestion) {
@@ -89,9 +111,11 @@ export async function fetchAppliedActions(buildingId) {
 }
 
 export async function fetchDashboardOverview(buildingId) {
-  const res = await fetch(`${BASE}/dashboard/overview/${buildingId}`);
-  if (!res.ok) throw new Error("Failed to fetch dashboard overview");
-  return res.json();
+  return fetchJsonWithETag(
+    `${BASE}/dashboard/overview/${buildingId}`,
+    {},
+    "Failed to fetch dashboard overview"
+  );
 }
 
 // Chat API functions
@@ -124,16 +148,18 @@ export async function fetchLatestMetrics(buildingId) {
 }
 
 export async function fetchEnergyForecast(buildingId, horizonHours = 24) {
-  const res = await fetch(`${BASE}/forecast/energy`, {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({
-      building_id: buildingId,
-      horizon_hours: horizonHours,
-    }),
-  });
-  if (!res.ok) throw new Error("Failed to fetch energy forecast");
-  return res.json();
+  return fetchJsonWithETag(
+    `${BASE}/forecast/energy`,
+    {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        building_id: buildingId,
+        horizon_hours: horizonHours,
+      }),
+    },
+    "Failed to fetch energy forecast"
+  );
 }
 
 export async function fetchOccupancyForecast(buildingId, horizonHours = 12) {
@@ -0,0 +1,203 @@
+"""
+Export trained Keras models to NumPy weight files for TensorFlow-free inference.
+
+Models exported:
+1. Autoencoder - Dense + BatchNorm stack, BN folded into the next Dense layer
+   (models/anomaly/autoencoder.npz)
+2. Energy forecaster - LSTM(64) -> LSTM(32) -> Dense head
+   (models/forecasting/lstm_energy.npz)
+3. Occupancy forecaster - same architecture
+   (models/forecasting/lstm_occupancy.npz)
+
+Each export is checked against the Keras model on random inputs before it is
+written, and records the SHA-256 of its .h5 file; the API ignores an export
+whose .h5 has changed since. Re-run after retraining:
+    python scripts/export_numpy_models.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# TensorFlow imports
+from tensorflow import keras
+
+# Paths
+PROJECT_ROOT = Path(__file__).parent.parent
+MODEL_DIR = PROJECT_ROOT / "backend" / "models"
+
+sys.path.insert(0, str(PROJECT_ROOT / "backend"))
+from core.utils.numpy_inference import DenseNetwork, LSTMNetwork, file_sha256  # noqa: E402
+
+
+def fold_dense_stack(model: keras.Model) -> DenseNetwork:
+    """
+    Convert a Dense/BatchNormalization stack into a DenseNetwork.
+
+    At inference BN is the affine map y = g * a + c with
+    g = gamma / sqrt(var + eps) and c = beta - mean * g. Feeding that into the
+    next Dense (z = y @ W + b) gives z = a @ (g[:, None] * W) + (c @ W + b),
+    so each BN disappears into the layer after it.
+    """
+    layers = []
+    scale = shift = None  # Pending BN affine map
+
+    for layer in model.layers:
+        if isinstance(layer, keras.layers.InputLayer):
+            continue
+
+        if isinstance(layer, keras.layers.BatchNormalization):
+            if layer.axis not in (-1, [-1], 1, [1]):
+                raise ValueError(f"{layer.name}: only last-axis BatchNormalization can be folded")
+            gamma = np.asarray(layer.gamma, dtype=np.float64) if layer.scale else 1.0
+            beta = np.asarray(layer.beta, dtype=np.float64) if layer.center else 0.0
+            mean = np.asarray(layer.moving_mean, dtype=np.float64)
+            var = np.asarray(layer.moving_variance, dtype=np.float64)
+            g = gamma / np.sqrt(var + layer.epsilon)
+            c = beta - mean * g
+            if scale is None:
+                scale, shift = g, c
+            else:
+                # BN after BN: compose the two affine maps
+                scale, shift = scale * g, shift * g + c
+            continue
+
+        if isinstance(layer, keras.layers.Dense):
+            W = np.asarray(layer.kernel, dtype=np.float64)
+            b = np.asarray(layer.bias, dtype=np.float64) if layer.use_bias else np.zeros(W.shape[1])
+            if scale is not None:
+                W, b = scale[:, None] * W, shift @ W + b
+                scale = shift = None
+            layers.append((W, b, layer.activation.__name__))
+            continue
+
+        if isinstance(layer, keras.layers.Dropout):
+            continue  # No-op at inference
+
+        raise ValueError(f"Unsupported layer for NumPy export: {layer.name} ({type(layer).__name__})")
+
+    if scale is not None:
+        raise ValueError("Trailing BatchNormalization has no Dense layer to fold into")
+    return DenseNetwork(layers)
+
+
+def verify(network: DenseNetwork, model: keras.Model, n_samples: int = 2048, atol: float = 1e-4) -> float:
+    """Compare NumPy and Keras outputs on standard-normal inputs; returns the max abs difference."""
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((n_samples, network.input_dim)).astype(np.float32)
+    expected = model.predict(x, verbose=0)
+    actual = network.predict(x)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    if not np.allclose(expected, actual, atol=atol, rtol=1e-4):
+        raise AssertionError(f"NumPy export diverges from Keras (max abs diff {max_diff:.2e})")
+
+    # Reconstruction error is what the API consumes; check it directly as well
+    err_keras = np.mean((x - expected) ** 2, axis=1)
+    err_numpy = np.mean((x - actual) ** 2, axis=1)
+    if not np.allclose(err_keras, err_numpy, atol=atol, rtol=1e-4):
+        raise AssertionError("NumPy reconstruction error diverges from Keras")
+    return max_diff
+
+
+def convert_lstm_stack(model: keras.Model) -> LSTMNetwork:
+    """
+    Convert an LSTM/Dropout/Dense stack (train_forecasting.build_lstm_model)
+    into an LSTMNetwork.
+
+    Keras stores each LSTM as kernel (input, 4u), recurrent_kernel (u, 4u)
+    and bias (4u,), gates ordered i, f, c, o; those are copied as-is. Only
+    the default activations are supported (sigmoid gates, tanh cell).
+    """
+    lstm_layers = []
+    dense_layers = []
+
+    for layer in model.layers:
+        if isinstance(layer, (keras.layers.InputLayer, keras.layers.Dropout)):
+            continue
+
+        if isinstance(layer, keras.layers.LSTM):
+            if dense_layers:
+                raise ValueError(f"{layer.name}: LSTM after a Dense layer is not supported")
+            if layer.activation.__name__ != "tanh" or layer.recurrent_activation.__name__ != "sigmoid":
+                raise ValueError(f"{layer.name}: only tanh/sigmoid LSTM activations are supported")
+            if layer.go_backwards or layer.stateful or not layer.use_bias:
+                raise ValueError(f"{layer.name}: go_backwards, stateful and bias-free LSTMs are not supported")
+            kernel, recurrent_kernel, bias = (np.asarray(w) for w in layer.get_weights())
+            lstm_layers.append((kernel, recurrent_kernel, bias, layer.return_sequences))
+            continue
+
+        if isinstance(layer, keras.layers.Dense):
+            W = np.asarray(layer.kernel, dtype=np.float64)
+            b = np.asarray(layer.bias, dtype=np.float64) if layer.use_bias else np.zeros(W.shape[1])
+            dense_layers.append((W, b, layer.activation.__name__))
+            continue
+
+        raise ValueError(f"Unsupported layer for NumPy export: {layer.name} ({type(layer).__name__})")
+
+    return LSTMNetwork(lstm_layers, DenseNetwork(dense_layers), timesteps=model.input_shape[1])
+
+
+def verify_lstm(network: LSTMNetwork, model: keras.Model, n_samples: int = 512, atol: float = 1e-4) -> float:
+    """
+    Compare NumPy and Keras forecasts on uniform [0, 1] sequences (the
+    MinMax-scaled input range); returns the max abs difference.
+    """
+    rng = np.random.default_rng(0)
+    x = rng.uniform(0.0, 1.0, (n_samples, network.timesteps, network.input_dim)).astype(np.float32)
+    expected = model.predict(x, verbose=0)
+    actual = network.predict(x)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    if not np.allclose(expected, actual, atol=atol, rtol=1e-4):
+        raise AssertionError(f"NumPy export diverges from Keras (max abs diff {max_diff:.2e})")
+    return max_diff
+
+
+def export_autoencoder() -> None:
+    h5_path = MODEL_DIR / "anomaly" / "autoencoder.h5"
+    npz_path = MODEL_DIR / "anomaly" / "autoencoder.npz"
+
+    model = keras.models.load_model(h5_path, compile=False)
+    network = fold_dense_stack(model)
+    max_diff = verify(network, model)
+    network.source_sha256 = file_sha256(h5_path)
+    network.save(npz_path)
+
+    print(f"Saved Autoencoder: {npz_path}")
+    print(f"  Layers: {len(network.layers)} Dense (BatchNorm folded)")
+    print(f"  Max abs diff vs Keras: {max_diff:.2e}")
+
+
+def export_forecaster(name: str, label: str) -> None:
+    h5_path = MODEL_DIR / "forecasting" / f"{name}.h5"
+    npz_path = MODEL_DIR / "forecasting" / f"{name}.npz"
+
+    model = keras.models.load_model(h5_path, compile=False)
+    network = convert_lstm_stack(model)
+    max_diff = verify_lstm(network, model)
+    network.source_sha256 = file_sha256(h5_path)
+    network.save(npz_path)
+
+    units = " -> ".join(str(layer[1].shape[0]) for layer in network.lstm_layers)
+    print(f"Saved {label}: {npz_path}")
+    print(f"  LSTM units: {units}, Dense head: {len(network.head.layers)} layers")
+    print(f"  Max abs diff vs Keras: {max_diff:.2e}")
+
+
+def main():
+    """Export all supported models."""
+    print("=" * 60)
+    print("NumPy Model Export")
+    print("=" * 60)
+
+    export_autoencoder()
+    export_forecaster("lstm_energy", "Energy Forecaster")
+    export_forecaster("lstm_occupancy", "Occupancy Forecaster")
+
+    print("\n" + "=" * 60)
+    print("Export complete!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ Models trained:
 """
 
 import os
+import json
 import joblib
 import numpy as np
 import pandas as pd
@@ -204,6 +205,29 @@ def save_models(
     print(f"Saved Scaler: {scaler_path}")
 
 
+def save_score_calibration(
+    isolation_forest: IsolationForest,
+    autoencoder: keras.Model,
+    X: np.ndarray
+) -> None:
+    """
+    Save the raw-score ranges the API normalizes anomaly scores with.
+
+    Uses the 0.5th/99.5th percentiles of the training-set scores, computed the
+    same way as at inference: mean squared reconstruction error for the
+    autoencoder and negated score_samples for the IsolationForest.
+    """
+    ae_scores = np.mean(np.square(X - autoencoder.predict(X, verbose=0)), axis=1)
+    if_scores = -isolation_forest.score_samples(X)
+    calibration = {
+        name: {"lo": float(np.percentile(scores, 0.5)), "hi": float(np.percentile(scores, 99.5))}
+        for name, scores in (("ae_score", ae_scores), ("if_score", if_scores))
+    }
+    calibration_path = MODEL_DIR / "score_calibration.json"
+    calibration_path.write_text(json.dumps(calibration, indent=2))
+    print(f"Saved Score Calibration: {calibration_path}")
+
+
 def main():
     """Main training pipeline."""
     print("=" * 60)
@@ -225,6 +249,7 @@ def main():
     
     # Save models
     save_models(isolation_forest, autoencoder, scaler)
+    save_score_calibration(isolation_forest, autoencoder, X)
     
     print("\n" + "=" * 60)
     print("Anomaly detection training complete!")